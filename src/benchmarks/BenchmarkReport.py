@@ -0,0 +1,152 @@
+import json, os, platform, subprocess, sys
+import numpy as np
+
+from datetime import datetime, timezone
+
+# Result fields that are measurements; every other field identifies the benchmark case
+lower_is_better = ('select_us', 'update_us', 'import_ms', 'wall_ms')
+higher_is_better = ('iterations_per_sec', 'runs_per_sec')
+
+def environment_metadata() -> dict:
+    """
+    Describes the machine and software the benchmarks ran on, so results from different environments are not mistaken for regressions.
+
+    Returns:
+        dict: The environment metadata
+    """
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'commit': commit,
+    }
+
+class BenchmarkReport:
+    """
+    The results of a benchmark session together with the environment they were measured in. Reports are saved as JSON and can be
+    compared against a stored baseline report to catch performance regressions.
+
+    Attributes:
+        environment (dict): The environment metadata (see environment_metadata)
+        results (list): One result record per benchmark case
+    """
+
+    def __init__(self, results: list, environment: dict = None):
+        """
+        Initializes the report.
+
+        Args:
+            results (list): One result record per benchmark case
+            environment (dict): The environment metadata. Describes the current environment if not given.
+        """
+
+        self.results = results
+        self.environment = environment if environment is not None else environment_metadata()
+
+    def save(self, path: str):
+        """
+        Writes the report to a JSON file.
+
+        Args:
+            path (str): The path of the JSON file
+        """
+
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+            file.write('\n')
+
+    def to_dict(self) -> dict:
+        """
+        Converts the report to a JSON-serializable dictionary.
+
+        Returns:
+            dict: The environment metadata and results
+        """
+
+        return {'environment': self.environment, 'results': self.results}
+
+    @staticmethod
+    def load(path: str) -> 'BenchmarkReport':
+        """
+        Reads a report from a JSON file.
+
+        Args:
+            path (str): The path of the JSON file
+
+        Returns:
+            BenchmarkReport: The report
+        """
+
+        with open(path) as file:
+            data = json.load(file)
+
+        return BenchmarkReport(data['results'], data.get('environment', dict()))
+
+    def compare(self, baseline: 'BenchmarkReport', tolerance: float = 0.25) -> list:
+        """
+        Compares every measurement against the same benchmark case of a baseline report. Cases missing from either report are skipped.
+
+        Args:
+            baseline (BenchmarkReport): The report to compare against
+            tolerance (float): The fraction a measurement may be slower than the baseline before it counts as a regression
+
+        Returns:
+            list: One record per measurement with the baseline value, current value, the ratio of current to baseline speed, and
+                whether it regressed
+        """
+
+        baseline_results = {case_key(result): result for result in baseline.results}
+
+        comparisons = list()
+        for result in self.results:
+            key = case_key(result)
+            if key not in baseline_results:
+                continue
+
+            for (metric, value) in result.items():
+                if metric not in lower_is_better + higher_is_better or metric not in baseline_results[key]:
+                    continue
+
+                baseline_value = baseline_results[key][metric]
+
+                # Speedup over the baseline, so a value below 1 is always slower
+                if metric in lower_is_better:
+                    speedup = baseline_value / value if value > 0 else float('inf')
+                else:
+                    speedup = value / baseline_value if baseline_value > 0 else float('inf')
+
+                comparison = dict(key)
+                comparison.update({
+                    'metric': metric,
+                    'baseline': baseline_value,
+                    'current': value,
+                    'speedup': speedup,
+                    'regression': speedup < 1 / (1 + tolerance),
+                })
+                comparisons.append(comparison)
+
+        return comparisons
+
+def case_key(result: dict) -> tuple:
+    """
+    Gets the fields that identify the benchmark case of a result record.
+
+    Args:
+        result (dict): The result record
+
+    Returns:
+        tuple: Sorted (field, value) pairs of every non-measurement field
+    """
+
+    return tuple(sorted((field, value) for (field, value) in result.items() if field not in lower_is_better + higher_is_better))
@@ -0,0 +1,151 @@
+import time
+import numpy as np
+
+import main
+
+from ml_models.BootstrappedUCB import BootstrappedUCB
+
+from config import Config
+
+class ModelBenchmark:
+    """
+    Microbenchmarks of the per-iteration calls of every MAB model: the time of a single select_arm and of a single update, across
+    numbers of arms, context dimensions and bootstrap replicates.
+
+    BootstrappedUCB is the only model with bootstrap replicates and takes scalar contexts, so it is measured across n_bootstrap with
+    d = 1. Every other model is measured across d with the first n_bootstrap value.
+
+    Attributes:
+        config (Config): The base config the models are created from
+        n_arms_values (list): The numbers of arms to measure
+        d_values (list): The context dimensions to measure
+        n_bootstrap_values (list): The numbers of bootstrap replicates to measure
+        number (int): The number of calls timed together in one measurement
+        repeats (int): The number of measurements, of which the fastest is kept
+        warmup (int): The number of updates each model is trained on before it is measured
+        models (list): The (name, model class) pairs to measure
+    """
+
+    def __init__(self, config: Config, n_arms_values: list, d_values: list, n_bootstrap_values: list, number: int = 200, repeats: int = 5,
+            warmup: int = 50, models: list = None):
+        """
+        Initializes the model benchmark.
+
+        Args:
+            config (Config): The base config the models are created from
+            n_arms_values (list): The numbers of arms to measure
+            d_values (list): The context dimensions to measure
+            n_bootstrap_values (list): The numbers of bootstrap replicates to measure
+            number (int): The number of calls timed together in one measurement
+            repeats (int): The number of measurements, of which the fastest is kept
+            warmup (int): The number of updates each model is trained on before it is measured
+            models (list): The (name, model class) pairs to measure. Defaults to main.model_options.
+        """
+
+        self.config = config
+        self.n_arms_values = n_arms_values
+        self.d_values = d_values
+        self.n_bootstrap_values = n_bootstrap_values
+        self.number = number
+        self.repeats = repeats
+        self.warmup = warmup
+        self.models = models if models is not None else main.model_options
+
+    def cases(self) -> list:
+        """
+        Lists the (model name, model class, n_arms, d, n_bootstrap) combinations to measure.
+
+        Returns:
+            list: The benchmark cases
+        """
+
+        cases = list()
+        for (name, model) in self.models:
+            for n_arms in self.n_arms_values:
+                if (model is BootstrappedUCB):
+                    cases.extend((name, model, n_arms, 1, n_bootstrap) for n_bootstrap in self.n_bootstrap_values)
+                else:
+                    cases.extend((name, model, n_arms, d, self.n_bootstrap_values[0]) for d in self.d_values)
+
+        return cases
+
+    def run(self) -> list:
+        """
+        Measures every benchmark case.
+
+        Returns:
+            list: One result record per case, with the per-call select and update times in microseconds
+        """
+
+        return [self.measure(*case) for case in self.cases()]
+
+    def measure(self, name: str, model: type, n_arms: int, d: int, n_bootstrap: int) -> dict:
+        """
+        Measures the select_arm and update calls of one model.
+
+        Args:
+            name (str): The name of the model in main.model_options
+            model (type): The MAB model class
+            n_arms (int): The number of arms
+            d (int): The context dimension
+            n_bootstrap (int): The number of bootstrap replicates
+
+        Returns:
+            dict: The result record of the case
+        """
+
+        config = self.config.override('acvs', 'num_acvs', n_arms + 1)
+        config = config.override('mab', 'd', d).override('mab', 'n_bootstrap', n_bootstrap)
+
+        rng = np.random.default_rng(0)
+        instance = main.create_model(model, config, rng)
+
+        # Contexts and penalties are drawn up front so only the model calls are timed
+        samples = self.number + self.warmup
+        contexts = rng.uniform(0, config.acvs.ideal_distance, (samples, n_arms, d))
+        arms = rng.integers(0, n_arms, samples)
+        penalties = rng.uniform(0, 10, samples)
+
+        for i in range(self.warmup):
+            instance.update(arm=arms[i], x=contexts[i, arms[i]], penalty=penalties[i])
+
+        contexts = contexts[self.warmup:]
+        arms = arms[self.warmup:]
+        penalties = penalties[self.warmup:]
+
+        def select():
+            for context in contexts:
+                instance.select_arm(variations=context)
+
+        def update():
+            for i in range(self.number):
+                instance.update(arm=arms[i], x=contexts[i, arms[i]], penalty=penalties[i])
+
+        return {
+            'benchmark': 'model',
+            'model': name,
+            'n_arms': n_arms,
+            'd': d,
+            'n_bootstrap': n_bootstrap,
+            'select_us': self.best_time(select) * 1e6 / self.number,
+            'update_us': self.best_time(update) * 1e6 / self.number,
+        }
+
+    def best_time(self, function) -> float:
+        """
+        Times a function several times.
+
+        Args:
+            function (callable): The function to time
+
+        Returns:
+            float: The fastest time in seconds
+        """
+
+        times = list()
+        for _ in range(self.repeats):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+
+        return min(times)
@@ -0,0 +1,116 @@
+import time
+import numpy as np
+
+import main
+
+from config import Config
+
+def platoon_start_data(num_acvs: int, ideal_distance: float, lead_speed: float) -> np.ndarray:
+    """
+    Builds starting data for a platoon of any size, laid out like the starting data file: ACVs at the ideal distance from each other,
+    with only the lead ACV moving.
+
+    Args:
+        num_acvs (int): The number of ACVs, including the lead ACV
+        ideal_distance (float): The distance between neighbouring ACVs
+        lead_speed (float): The starting speed of the lead ACV
+
+    Returns:
+        np.ndarray: Structured array with one row per ACV and 'start_location' and 'start_speed' fields, lead ACV first (see read_start_data)
+    """
+
+    speeds = np.zeros(num_acvs)
+    speeds[0] = lead_speed
+
+    data = np.zeros(num_acvs, dtype=[('start_location', float), ('start_speed', float)])
+    data['start_location'] = ideal_distance * np.arange(num_acvs - 1, -1, -1, dtype=float)
+    data['start_speed'] = speeds
+
+    return data
+
+class SimulationBenchmark:
+    """
+    End-to-end benchmarks of complete simulation runs (ACVUpdater.run_update_loop through the MAPE-K loop) for every MAB model,
+    across platoon sizes and run lengths. Reports iterations per second and runs per second, including the setup of each run.
+
+    Attributes:
+        config (Config): The base config of the runs, which should have every output disabled
+        num_acvs_values (list): The platoon sizes to measure, including the lead ACV
+        iterations_values (list): The numbers of iterations per run to measure
+        runs (int): The number of runs timed together in one measurement
+        repeats (int): The number of measurements, of which the fastest is kept
+        models (list): The (name, model class) pairs to measure
+    """
+
+    def __init__(self, config: Config, num_acvs_values: list, iterations_values: list, runs: int = 5, repeats: int = 3, models: list = None):
+        """
+        Initializes the simulation benchmark.
+
+        Args:
+            config (Config): The base config of the runs, which should have every output disabled
+            num_acvs_values (list): The platoon sizes to measure, including the lead ACV
+            iterations_values (list): The numbers of iterations per run to measure
+            runs (int): The number of runs timed together in one measurement
+            repeats (int): The number of measurements, of which the fastest is kept
+            models (list): The (name, model class) pairs to measure. Defaults to main.model_options.
+        """
+
+        self.config = config
+        self.num_acvs_values = num_acvs_values
+        self.iterations_values = iterations_values
+        self.runs = runs
+        self.repeats = repeats
+        self.models = models if models is not None else main.model_options
+
+    def run(self) -> list:
+        """
+        Measures every model for every platoon size and run length.
+
+        Returns:
+            list: One result record per case, with the iterations and runs per second
+        """
+
+        return [
+            self.measure(name, model, num_acvs, iterations)
+            for (name, model) in self.models
+            for num_acvs in self.num_acvs_values
+            for iterations in self.iterations_values
+        ]
+
+    def measure(self, name: str, model: type, num_acvs: int, iterations: int) -> dict:
+        """
+        Times complete simulation runs of one model.
+
+        Args:
+            name (str): The name of the model in main.model_options
+            model (type): The MAB model class
+            num_acvs (int): The number of ACVs, including the lead ACV
+            iterations (int): The number of iterations per run
+
+        Returns:
+            dict: The result record of the case
+        """
+
+        config = self.config.override('acvs', 'num_acvs', num_acvs).override('simulation', 'iterations', iterations)
+        start_data = platoon_start_data(num_acvs, config.acvs.ideal_distance, config.acvs.max_speed / 2)
+
+        # Every measurement replays the same seeds, so each one does the same work
+        seeds = np.random.SeedSequence(0).spawn(self.runs)
+
+        times = list()
+        for _ in range(self.repeats):
+            start = time.perf_counter()
+            for seed in seeds:
+                main.build_simulation(config, model, np.random.default_rng(seed), start_data=start_data).run_update_loop()
+            times.append(time.perf_counter() - start)
+
+        elapsed = min(times)
+
+        return {
+            'benchmark': 'simulation',
+            'model': name,
+            'num_acvs': num_acvs,
+            'iterations': iterations,
+            'iterations_per_sec': self.runs * iterations / elapsed,
+            'runs_per_sec': self.runs / elapsed,
+        }
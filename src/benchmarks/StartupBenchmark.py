@@ -0,0 +1,92 @@
+import os, subprocess, sys, time
+
+import main
+
+source_dir = os.path.dirname(os.path.abspath(main.__file__))
+repository_dir = os.path.dirname(source_dir)
+
+def import_times(module: str) -> dict:
+    """
+    Imports a module in a fresh interpreter with -X importtime and reads back how long each module took to import.
+
+    Args:
+        module (str): The module to import, importable from the source directory
+
+    Returns:
+        dict: The cumulative import time of every module imported, in microseconds, by module name
+    """
+
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=source_dir, capture_output=True, text=True,
+        check=True)
+
+    times = dict()
+    for line in process.stderr.splitlines():
+        # Lines read 'import time: <self us> | <cumulative us> | <indented module name>' after a header line
+        parts = line.split('|')
+        if (len(parts) != 3) or (not parts[1].strip().isdigit()):
+            continue
+        times[parts[2].strip()] = int(parts[1])
+
+    return times
+
+class StartupBenchmark:
+    """
+    Cold-start benchmarks. Each measurement starts a fresh interpreter: the import time of the entry points, as reported by -X importtime,
+    and the wall time of a headless run of a single iteration, which is what short runs and spawned worker processes pay before doing
+    any work.
+
+    Attributes:
+        modules (list): The modules whose import time is measured
+        model (str): The name of the model of the headless run, in main.model_options
+        repeats (int): The number of measurements, of which the fastest is kept
+    """
+
+    def __init__(self, modules: list = ('main', 'mabel'), model: str = 'UCB1', repeats: int = 5):
+        """
+        Initializes the startup benchmark.
+
+        Args:
+            modules (list): The modules whose import time is measured
+            model (str): The name of the model of the headless run, in main.model_options
+            repeats (int): The number of measurements, of which the fastest is kept
+        """
+
+        self.modules = list(modules)
+        self.model = model
+        self.repeats = repeats
+
+    def run(self) -> list:
+        """
+        Measures the import time of every module and the wall time of a headless run.
+
+        Returns:
+            list: One result record per module, with its import time, and one for the headless run, with its wall time
+        """
+
+        results = [
+            {'benchmark': 'startup', 'target': f'import {module}', 'import_ms': min(import_times(module)[module] for _ in range(self.repeats)) / 1000}
+            for module in self.modules
+        ]
+
+        results.append({'benchmark': 'startup', 'target': f'mabel run --model {self.model}', 'wall_ms': self.measure_run()})
+
+        return results
+
+    def measure_run(self) -> float:
+        """
+        Times a headless run of a single iteration from the command line, from interpreter start to exit.
+
+        Returns:
+            float: The fastest wall time, in milliseconds
+        """
+
+        command = [sys.executable, os.path.join(source_dir, 'mabel.py'), 'run', '--model', self.model,
+            '--set', 'simulation.iterations=1', '--set', 'simulation.training_iterations=0']
+
+        times = list()
+        for _ in range(self.repeats):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=repository_dir, capture_output=True, check=True)
+            times.append(time.perf_counter() - start)
+
+        return min(times) * 1000
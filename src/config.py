@@ -1,31 +1,211 @@
+import numbers
+
 from configparser import ConfigParser
 from ast import literal_eval
-   
-file = 'config.ini'
-config = ConfigParser()
-config.read(file)
+from dataclasses import dataclass, fields, replace, MISSING
 
-config_map = config._sections
+file = 'config.ini'
 
-def get_config(section, key):
+def convert_value(name: str, value, value_type: type):
     """
-    Gets the value of a key in a section of the config file.
+    Converts a config value to the type of its key, checking the type of the value rather than converting it blindly.
 
     Args:
-        section (str): The section of the config file.
-        key (str): The key in the section of the config file.
+        name (str): The 'section.key' name of the key, for error messages.
+        value (any): The value, as read from the file or given as an override.
+        value_type (type): The type of the key.
+
+    Returns:
+        any: The converted value.
+
+    Raises:
+        TypeError: If the value does not have the type of the key.
+    """
+
+    if (value_type is tuple) and isinstance(value, str):
+        return (value,)     # A lone string is a 1-tuple, not a tuple of characters
+    if (value_type is tuple) and isinstance(value, (tuple, list)):
+        return tuple(value)
+    if (value_type is bool) and isinstance(value, bool):
+        return value
+    if (value_type is int) and isinstance(value, numbers.Integral) and not isinstance(value, bool):
+        return int(value)
+    if (value_type is float) and isinstance(value, numbers.Real) and not isinstance(value, bool):
+        return float(value)
+    if (value_type not in (tuple, bool, int, float)) and isinstance(value, value_type):
+        return value
+
+    raise TypeError(f"Config key '{name}' expects a value of type {value_type.__name__}, got {value!r}")
+
+@dataclass(frozen=True)
+class ACVSettings:
+    """Settings from the [acvs] section of the config file."""
+
+    ideal_distance: float
+    max_speed: float
+    easing: float
+    num_acvs: int
+
+@dataclass(frozen=True)
+class MABSettings:
+    """Settings from the [mab] section of the config file."""
+
+    d: int
+    alpha: float
+    epsilon: float
+    n_bootstrap: int
+    residual_threshold: float
+    crash_penalty: float
+
+@dataclass(frozen=True)
+class SimulationSettings:
+    """
+    Settings from the [simulation] section of the config file. The fault settings default to the multiplier faults of older files, and
+    are checked whenever the settings are created, so a bad file or override is reported before any run starts.
+    """
+
+    num_simulation_runs: int
+    iterations: int
+    training_iterations: int
+    percent_modified: float
+    mod_range: tuple
+    fault_models: tuple = ('multiply',)
+    fault_duration: tuple = (1, 1)
+    stuck_range: tuple = (0, 10)
+    drift_range: tuple = (-0.5, 0.5)
+    noise_range: tuple = (0.5, 2)
+
+    def __post_init__(self):
+        # Imported here since the fault schedule module reads this config
+        from subject.FaultSchedule import fault_models
+
+        if (len(self.fault_models) == 0):
+            raise ValueError(f"simulation.fault_models needs at least one fault model. Options are: {', '.join(fault_models)}")
+
+        unknown = set(self.fault_models) - set(fault_models)
+        if unknown:
+            raise ValueError(f"Unknown fault models: {', '.join(sorted(unknown))}. Options are: {', '.join(fault_models)}")
+
+        for name in ('fault_duration', 'stuck_range', 'drift_range', 'noise_range'):
+            pair = getattr(self, name)
+            if (len(pair) != 2) or not (pair[0] <= pair[1]):
+                raise ValueError(f"simulation.{name} must be an ordered (low, high) pair, got {pair}")
+
+        if not all(isinstance(value, numbers.Integral) for value in self.fault_duration) or (self.fault_duration[0] < 1):
+            raise ValueError(f"simulation.fault_duration must be whole numbers of iterations of at least 1, got {self.fault_duration}")
+
+        if (self.noise_range[0] < 0):
+            raise ValueError(f"simulation.noise_range is a standard deviation, so it cannot go below 0, got {self.noise_range}")
+
+@dataclass(frozen=True)
+class OutputSettings:
+    """Settings from the [output] section of the config file. Final metrics are shown unless the file turns them off, as in older files."""
+
+    automatic_output: bool
+    show_output_table: bool
+    prompt_visualization: bool
+    major_divider: str
+    minor_divider: str
+    show_final_metrics: bool = True
+
+@dataclass(frozen=True)
+class Config:
     """
-    return literal_eval(config_map[section][key])
+    A resolved, typed snapshot of the config file. Parsed once and passed to the components that need it, so reading a
+    setting is a plain attribute lookup. Overrides produce a new snapshot and never touch the file on disk.
 
-def write_config(section, key, value):
+    Attributes:
+        acvs (ACVSettings): The [acvs] section
+        mab (MABSettings): The [mab] section
+        simulation (SimulationSettings): The [simulation] section
+        output (OutputSettings): The [output] section
     """
-    Writes a value to a key in a section of the config file.
+
+    acvs: ACVSettings
+    mab: MABSettings
+    simulation: SimulationSettings
+    output: OutputSettings
+
+    def get(self, section: str, key: str):
+        """
+        Gets the value of a key in a section of the config.
+
+        Args:
+            section (str): The section of the config.
+            key (str): The key in the section of the config.
+        """
+        return getattr(getattr(self, section), key)
+
+    def override(self, section: str, key: str, value) -> 'Config':
+        """
+        Returns a copy of the config with a key in a section replaced by the given value.
+
+        Args:
+            section (str): The section of the config.
+            key (str): The key in the section of the config.
+            value (any): The new value, converted to the type of the key (see convert_value).
+
+        Returns:
+            Config: The overridden config.
+
+        Raises:
+            KeyError: If the key does not exist.
+            TypeError: If the value does not have the type of the key.
+        """
+
+        settings = getattr(self, section)
+        types = {field.name: field.type for field in fields(settings)}
+        if key not in types:
+            raise KeyError(f"Unknown config key '{section}.{key}'")
+
+        return replace(self, **{section: replace(settings, **{key: convert_value(f'{section}.{key}', value, types[key])})})
+
+    def with_overrides(self, overrides: dict) -> 'Config':
+        """
+        Returns a copy of the config with every given override applied.
+
+        Args:
+            overrides (dict): A dictionary of 'section.key' strings to their new values.
+
+        Returns:
+            Config: The overridden config.
+        """
+
+        config = self
+        for (name, value) in overrides.items():
+            (section, key) = name.split('.', 1)
+            config = config.override(section, key, value)
+
+        return config
+
+def load_config(path: str = file, overrides: dict = None) -> Config:
+    """
+    Parses a config file into a typed config snapshot.
 
     Args:
-        section (str): The section of the config file.
-        key (str): The key in the section of the config file.
-        value (any): The value to write to the key.
+        path (str): The path of the config file.
+        overrides (dict): A dictionary of 'section.key' strings to values that take precedence over the file.
+
+    Returns:
+        Config: The parsed config.
     """
-    config_map[section][key] = str(value)
-    with open(file, 'w') as configfile:
-        config.write(configfile)
\ No newline at end of file
+
+    parser = ConfigParser()
+    parser.read(path)
+
+    def parse_section(section: str, settings_class: type):
+        # Keys missing from the file take their default, if they have one
+        return settings_class(**{
+            field.name: convert_value(f'{section}.{field.name}', literal_eval(parser[section][field.name]), field.type)
+            for field in fields(settings_class)
+            if (field.name in parser[section]) or (field.default is MISSING)
+        })
+
+    config = Config(
+        acvs=parse_section('acvs', ACVSettings),
+        mab=parse_section('mab', MABSettings),
+        simulation=parse_section('simulation', SimulationSettings),
+        output=parse_section('output', OutputSettings),
+    )
+
+    return config.with_overrides(overrides or {})
@@ -0,0 +1,324 @@
+"""
+Non-interactive command line entry point for MABEL. Run from the repository root so the config file and starting data are found:
+
+    python src/mabel.py run --model LinearUCB --runs 500 --seed 1 --set mab.alpha=0.2
+
+Every prompt and table is suppressed and one JSON object of metrics is written per simulation run.
+
+Benchmarks of the models and of complete runs are written as JSON and can be compared against a stored baseline:
+
+    python src/mabel.py bench --output bench.json --baseline baseline.json
+
+Recorded runs can be browsed later, on any machine, without simulating them again:
+
+    python src/mabel.py visualize records/run-0.npz
+"""
+
+import argparse, configparser, json, os, sys, time, zipfile
+from ast import literal_eval
+
+import main
+
+from benchmarks.BenchmarkReport import BenchmarkReport
+from benchmarks.ModelBenchmark import ModelBenchmark
+from benchmarks.SimulationBenchmark import SimulationBenchmark
+from benchmarks.StartupBenchmark import StartupBenchmark
+from mapek.StageProfiler import StageProfiler
+from config import Config, file as default_config_file, load_config
+
+# Settings that would print to the console or wait for a keypress
+headless_overrides = {
+    'output.automatic_output': True,
+    'output.show_output_table': False,
+    'output.show_final_metrics': False,
+    'output.prompt_visualization': False,
+}
+
+def parse_override(text: str) -> tuple:
+    """
+    Parses a 'section.key=value' override. The value is read as a Python literal, falling back to a plain string.
+
+    Args:
+        text (str): The override text
+
+    Returns:
+        tuple: The 'section.key' name and the parsed value
+    """
+
+    if '=' not in text or '.' not in text.split('=', 1)[0]:
+        raise argparse.ArgumentTypeError(f"Expected section.key=value, got '{text}'")
+
+    (name, raw_value) = text.split('=', 1)
+    try:
+        value = literal_eval(raw_value)
+    except (ValueError, SyntaxError):
+        value = raw_value
+
+    return (name.strip(), value)
+
+def read_config(path: str, overrides: dict) -> Config:
+    """
+    Loads the config file and applies the overrides. Exits with an error message naming the file or the override if either is invalid.
+
+    Args:
+        path (str): The path of the config file
+        overrides (dict): A dictionary of 'section.key' strings to values that take precedence over the file
+
+    Returns:
+        Config: The parsed config
+    """
+
+    # ConfigParser silently skips files it cannot open
+    if not os.path.isfile(path):
+        sys.exit(f"Cannot read config file {path}")
+
+    try:
+        config = load_config(path)
+    except KeyError as error:
+        sys.exit(f"Invalid config file {path}: missing {error}")
+    except (configparser.Error, TypeError, ValueError, SyntaxError) as error:
+        sys.exit(f"Invalid config file {path}: {error}")
+
+    try:
+        return config.with_overrides(overrides)
+    except (KeyError, TypeError, ValueError) as error:
+        sys.exit(f"Invalid --set: {error.args[0]}")
+
+def run(args: argparse.Namespace):
+    """
+    Runs simulations headlessly and writes the metrics of each run as a line of JSON, or a single merged summary.
+
+    Args:
+        args (argparse.Namespace): The parsed 'run' arguments
+    """
+
+    overrides = dict(args.set)
+    overrides.update(headless_overrides)
+
+    config = read_config(args.config, overrides)
+
+    model = main.get_model(args.model)
+
+    # Workers as run_parallel_simulations resolves them
+    workers = min(args.workers or os.cpu_count() or 1, args.runs)
+
+    if args.lockstep and args.record_dir:
+        raise SystemExit('--record-dir is not supported with --lockstep')
+    if args.live and (args.lockstep or args.workers != 1):
+        raise SystemExit('--live needs --workers 1 and is not supported with --lockstep')
+    if args.timings and (not args.lockstep) and (workers > 1) and (args.executor == 'process'):
+        raise SystemExit('--timings needs one worker or --executor thread')
+
+    # Checked once here, so a bad checkpoint is reported before any run or worker process starts
+    if args.warm_start:
+        try:
+            main.create_model(model, config.override('acvs', 'num_acvs', len(main.read_start_data())), warm_start=args.warm_start)
+        except (OSError, KeyError, ValueError) as error:
+            sys.exit(f"Cannot warm-start from {args.warm_start}: {error}")
+
+    profiler = StageProfiler() if args.timings else None
+    for directory in (args.profile_dir, args.record_dir):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    record_policy = None
+    if args.record_every is not None:
+        record_policy = {'window': args.record_window, 'every': args.record_every, 'events': tuple(args.record_events)}
+
+    live_feed = None
+    if args.live:
+        from subject.LiveDashboard import serve_live_dashboard
+
+        live_feed = main.LiveFeed()
+        serve_live_dashboard(live_feed, args.live_host, args.live_port, open_in_browser=not args.no_browser)
+
+    if args.lockstep:
+        profile_path = os.path.join(args.profile_dir, 'lockstep.prof') if args.profile_dir else None
+        results = main.run_lockstep_simulations(config, model, args.runs, args.seed, args.warm_start, args.save_state, profiler, profile_path)
+    else:
+        results = main.run_parallel_simulations(config, model, args.runs, args.seed, args.workers, args.executor, args.warm_start, args.save_state,
+            profiler, args.profile_dir, args.record_dir, args.record_format, record_policy, live_feed)
+
+    if profiler is not None:
+        with open(args.timings, 'w') as file:
+            json.dump(profiler.summary(), file, indent=2)
+            file.write('\n')
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        if args.summary:
+            record = {'model': args.model, 'seed': args.seed}
+            record.update(main.summarize_metrics(results))
+            output.write(json.dumps(record) + '\n')
+            return
+
+        for (index, metrics) in enumerate(results):
+            record = {'run': index, 'model': args.model, 'seed': args.seed}
+            record.update(metrics)
+            output.write(json.dumps(record) + '\n')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if live_feed is not None:
+            wait_for_interrupt(f"Runs finished. Still serving the live dashboard at http://{args.live_host}:{args.live_port}/ - press Ctrl+C to stop.")
+
+def wait_for_interrupt(message: str):
+    """Keeps serving background threads until Ctrl+C is pressed."""
+
+    sys.stderr.write(message + '\n')
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+# Benchmark grids as (n_arms, d, n_bootstrap, num_acvs, iterations) values, with a smaller grid for quick checks
+benchmark_grids = {
+    'full': ([3, 10, 50], [1, 4, 16], [100, 1000], [4, 11, 51], [200, 1000]),
+    'quick': ([3, 10], [1, 4], [100, 1000], [4, 11], [200]),
+}
+
+def bench(args: argparse.Namespace):
+    """
+    Runs the model and simulation benchmarks, writes the report as JSON and compares it against a baseline report if one is given.
+    Exits with status 1 if any measurement regressed beyond the tolerance.
+
+    Args:
+        args (argparse.Namespace): The parsed 'bench' arguments
+    """
+
+    config = read_config(args.config, headless_overrides)
+    (n_arms_values, d_values, n_bootstrap_values, num_acvs_values, iterations_values) = benchmark_grids['quick' if args.quick else 'full']
+
+    models = main.model_options
+    if args.model:
+        models = [(name, model) for (name, model) in models if name in args.model]
+
+    results = list()
+    if not args.skip_models:
+        results.extend(ModelBenchmark(config, n_arms_values, d_values, n_bootstrap_values, models=models).run())
+    if not args.skip_simulation:
+        results.extend(SimulationBenchmark(config, num_acvs_values, iterations_values, models=models).run())
+    if not args.skip_startup:
+        results.extend(StartupBenchmark().run())
+
+    report = BenchmarkReport(results)
+    if args.output:
+        report.save(args.output)
+    else:
+        sys.stdout.write(json.dumps(report.to_dict(), indent=2) + '\n')
+
+    if not args.baseline:
+        return
+
+    baseline = BenchmarkReport.load(args.baseline)
+    for field in ('platform', 'machine', 'python', 'numpy', 'cpu_count'):
+        if baseline.environment.get(field) != report.environment.get(field):
+            sys.stderr.write(f"Warning: baseline {field} differs ({baseline.environment.get(field)} vs {report.environment.get(field)})\n")
+
+    regressions = [comparison for comparison in report.compare(baseline, args.tolerance) if comparison['regression']]
+    for regression in regressions:
+        case = ', '.join(f'{field}={value}' for (field, value) in regression.items()
+            if field not in ('metric', 'baseline', 'current', 'speedup', 'regression'))
+        sys.stderr.write(f"Regression in {regression['metric']} ({case}): {regression['baseline']:.4g} -> {regression['current']:.4g}\n")
+
+    if regressions:
+        sys.exit(1)
+
+def visualize(args: argparse.Namespace):
+    """
+    Serves the playback of a recorded run. The run is opened lazily and read a chunk at a time as it is played.
+
+    Args:
+        args (argparse.Namespace): The parsed 'visualize' arguments
+    """
+
+    try:
+        run = main.open_run(args.run_file)
+    except (OSError, KeyError, zipfile.BadZipFile) as error:
+        sys.exit(f"Cannot open the recorded run {args.run_file}: {error}")
+
+    if not run.header.get('finished', True):
+        sys.stderr.write(f"Warning: {args.run_file} was not finished; showing the {len(run)} iterations recorded\n")
+    if (len(run) == 0):
+        sys.exit(f"{args.run_file} has no recorded iterations")
+
+    # Dash and Plotly are slow to import, so only the commands that serve a dashboard import them
+    from subject.Visualization import start_visualizer
+
+    (locations, speeds, distances, ignores, crashes, iterations) = run.visualizer_records()
+    start_visualizer(locations, speeds, distances, ignores, run.faults, crashes, run.header['model'], iterations,
+        host=args.host, port=args.port, open_in_browser=not args.no_browser)
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the command line argument parser."""
+
+    parser = argparse.ArgumentParser(prog='mabel', description='Multi-Armed Bandit EvaLuator')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run simulations without any prompts and print per-run metrics as JSON lines')
+    run_parser.add_argument('--model', required=True, choices=[name for (name, _) in main.model_options], help='The MAB model to use')
+    run_parser.add_argument('--runs', type=int, default=1, help='The number of simulation runs')
+    run_parser.add_argument('--seed', type=int, default=None, help='Seed for reproducible runs')
+    run_parser.add_argument('--workers', type=int, default=1, help='Worker processes to spread runs over (0 for one per CPU). Results do not depend on it.')
+    run_parser.add_argument('--executor', choices=list(main.executors), default='process',
+        help='Spread runs over worker processes or over threads in this process')
+    run_parser.add_argument('--lockstep', action='store_true',
+        help='Advance every run together in one process, with one model learning from all of them. Ignores --workers and --executor.')
+    run_parser.add_argument('--warm-start', default=None, metavar='STATE_FILE',
+        help='Start every model from a saved model state instead of untrained')
+    run_parser.add_argument('--save-state', default=None, metavar='STATE_FILE',
+        help='Save the model of the last run (or the shared lockstep model) to this .npz file')
+    run_parser.add_argument('--summary', action='store_true', help='Print only the merged metrics of all runs')
+    run_parser.add_argument('--timings', default=None, metavar='TIMINGS_FILE',
+        help='Time every MAPE-K stage and model call, and write their p50/p95/p99 latencies to this JSON file. Needs one worker or the thread executor.')
+    run_parser.add_argument('--profile-dir', default=None, metavar='DIRECTORY',
+        help='Dump a cProfile of each run (or of the lockstep simulation) to this directory')
+    run_parser.add_argument('--set', type=parse_override, action='append', default=[], metavar='SECTION.KEY=VALUE',
+        help='Override a config value, e.g. mab.alpha=0.2. May be repeated.')
+    run_parser.add_argument('--config', default=default_config_file, help='The config file to read')
+    run_parser.add_argument('--output', default=None, help='Write the JSON lines to this file instead of stdout')
+    run_parser.add_argument('--record-dir', default=None, metavar='DIRECTORY',
+        help='Record every iteration of each run to a file in this directory. Not supported with --lockstep.')
+    run_parser.add_argument('--record-format', choices=list(main.recorders), default='npz', help='The format of the record files')
+    run_parser.add_argument('--record-every', type=int, default=None, metavar='K',
+        help='Record every iteration only around events, and every K-th iteration otherwise. Running totals stay exact.')
+    run_parser.add_argument('--record-window', type=int, default=10, metavar='W',
+        help='With --record-every, the number of iterations recorded before and after each event')
+    run_parser.add_argument('--record-events', nargs='+', choices=['faults', 'crashes', 'ignores'], default=['faults', 'crashes', 'ignores'],
+        help='With --record-every, the kinds of event recorded at full resolution')
+    run_parser.add_argument('--live', action='store_true',
+        help='Stream every run to a live dashboard in the browser while it runs. Needs --workers 1.')
+    run_parser.add_argument('--live-host', default='127.0.0.1', help='The address to serve the live dashboard on')
+    run_parser.add_argument('--live-port', type=int, default=8050, help='The port to serve the live dashboard on')
+    run_parser.add_argument('--no-browser', action='store_true', help='With --live, serve the dashboard without opening a browser')
+    run_parser.set_defaults(handler=run)
+
+    bench_parser = commands.add_parser('bench', help='Benchmark the models and complete runs, and compare against a baseline')
+    bench_parser.add_argument('--model', action='append', choices=[name for (name, _) in main.model_options],
+        help='Only benchmark this model. May be repeated.')
+    bench_parser.add_argument('--quick', action='store_true', help='Measure a smaller grid of sizes')
+    bench_parser.add_argument('--skip-models', action='store_true', help='Skip the select_arm/update microbenchmarks')
+    bench_parser.add_argument('--skip-simulation', action='store_true', help='Skip the end-to-end run benchmarks')
+    bench_parser.add_argument('--skip-startup', action='store_true', help='Skip the import time and cold-start run benchmarks')
+    bench_parser.add_argument('--baseline', default=None, metavar='REPORT_FILE',
+        help='A report from an earlier bench run to compare against. Exits with status 1 on a regression.')
+    bench_parser.add_argument('--tolerance', type=float, default=0.25,
+        help='The fraction a measurement may be slower than the baseline before it counts as a regression')
+    bench_parser.add_argument('--config', default=default_config_file, help='The config file to read')
+    bench_parser.add_argument('--output', default=None, help='Write the JSON report to this file instead of stdout')
+    bench_parser.set_defaults(handler=bench)
+
+    visualize_parser = commands.add_parser('visualize', help='Play back a run recorded with --record-dir in the browser')
+    visualize_parser.add_argument('run_file', help='The recorded run: an .npz file, or a run directory of the memmap format')
+    visualize_parser.add_argument('--host', default='127.0.0.1', help='The address to serve the playback on')
+    visualize_parser.add_argument('--port', type=int, default=8050, help='The port to serve the playback on')
+    visualize_parser.add_argument('--no-browser', action='store_true', help='Serve the playback without opening a browser')
+    visualize_parser.set_defaults(handler=visualize)
+
+    return parser
+
+if __name__ == '__main__':
+    arguments = build_parser().parse_args()
+    arguments.handler(arguments)
@@ -1,14 +1,29 @@
-import subject
+import subject, os
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 
 from mapek.Knowledge import Knowledge
 from mapek.Monitor import Monitor
 from mapek.Analyzer import Analyzer
 from mapek.Planner import Planner
 from mapek.Executer import Executer
+from mapek.StageProfiler import StageProfiler, profile_call
 
-from subject.ACVUpdater import ACVUpdater
+from subject.ACVUpdater import ACVUpdater, read_start_data
+from subject.LockstepSimulator import LockstepSimulator
 from subject.Logger import Logger
 
+from recording.RecordSink import RecordSink
+from recording.ColumnarFileSink import ColumnarFileSink
+from recording.MemmapSink import MemmapSink
+from recording.EventTriggeredSink import EventTriggeredSink
+from recording.LiveDashboardSink import LiveDashboardSink
+from recording.LiveFeed import LiveFeed
+from recording.Trajectory import Trajectory
+from recording.ColumnarRun import ColumnarRun
+
 from ml_models.LinearUCB import LinearUCB
 from ml_models.LinearTS import LinearThompsonSampling
 from ml_models.EpsilonGreedy import EpsilonGreedy
@@ -16,7 +31,7 @@ from ml_models.UCB1 import UCB1_Normal_Penalized
 from ml_models.BootstrappedUCB import BootstrappedUCB
 from ml_models.SoftmaxExplorer import SoftmaxExplorer
 
-from config import get_config 
+from config import Config, load_config
 
 model_options = [
     ('LinearUCB', LinearUCB),
@@ -27,46 +42,364 @@ model_options = [
     ('SoftmaxExplorer', SoftmaxExplorer),
 ]
 
-def run_simulation():
-    """Runs the ACV simulation."""
-    
-    model = select_model()
+executors = {
+    'process': ProcessPoolExecutor,
+    'thread': ThreadPoolExecutor,
+}
 
-    d = get_config('mab', 'd')
-    alpha = get_config('mab', 'alpha')
-    epsilon = get_config('mab', 'epsilon')
-    n_arms = get_config('acvs', 'num_acvs') - 1
-    n_bootstrap = get_config('mab', 'n_bootstrap')
-    ideal_distance = get_config('acvs', 'ideal_distance') 
+# Recording sinks that write each run to a file or directory, by format name. Each is created from the path to write to.
+recorders = {
+    'npz': ColumnarFileSink,
+    'memmap': MemmapSink,
+}
 
-    knowledge = Knowledge()
-    
-    knowledge.ideal_distance = ideal_distance
-    knowledge.mab_model = model(
-        d = d,
-        n_arms = n_arms, 
-        ideal_distance = ideal_distance,
-        alpha = alpha, 
-        epsilon = epsilon, 
-        n_bootstrap = n_bootstrap,
+def run_simulation(config: Config = None, model: type = None, rng: np.random.Generator = None, warm_start: str = None, save_state: str = None,
+        profiler: StageProfiler = None, profile_path: str = None, record_path: str = None, record_format: str = 'npz',
+        record_policy: dict = None, live_feed: LiveFeed = None) -> list:
+    """
+    Runs the ACV simulation.
+
+    Args:
+        config (Config): The simulation config. Read from the config file if not given.
+        model (type): The MAB model class to use. The user is prompted to select one if not given.
+        rng (np.random.Generator): The random number generator used by the simulation and the model. Freshly seeded if not given.
+        warm_start (str): A model state file (see MABModel.save_state) every run's model starts from. Untrained if not given.
+        save_state (str): A file to save the model of the last run to once it has finished
+        profiler (StageProfiler): Records the latency of each stage of every run. Stages are not timed if not given.
+        profile_path (str): A file to dump a cProfile of each run to, with '{run}' replaced by the run index
+        record_path (str): A file to record each run to, with '{run}' replaced by the run index. Recorded as the Logger chooses if not given.
+        record_format (str): The format of the record files, one of the recorders
+        record_policy (dict): The arguments of an EventTriggeredSink that decides which iterations are recorded. Every iteration is
+            recorded if not given.
+        live_feed (LiveFeed): A feed to publish every iteration of each run to as it happens, for the live dashboard
+
+    Returns:
+        list: The final metrics of each simulation run (see Logger.calculate_metrics)
+    """
+
+    # Config is parsed once; the ACV count always comes from the starting data rather than the file
+    if config is None:
+        config = load_config()
+    config = config.override('acvs', 'num_acvs', len(read_start_data()))
+
+    if model is None:
+        model = select_model(config)
+
+    results = list()
+
+    # Each run gets its own knowledge and a fresh model, so no state carries over from one run to the next
+    num_sim_runs = config.simulation.num_simulation_runs
+    for run in range(num_sim_runs):
+        sink = create_sink(record_path.format(run=run), record_format, record_policy) if record_path is not None else None
+        if (live_feed is not None):
+            sink = LiveDashboardSink(live_feed, sink)
+        updater = build_simulation(config, model, rng, warm_start, profiler=profiler, sink=sink)
+        if (profile_path is not None):
+            results.append(profile_call(profile_path.format(run=run), updater.run_update_loop))
+        else:
+            results.append(updater.run_update_loop())
+
+    if (save_state is not None) and (num_sim_runs > 0):
+        updater.knowledge.mab_model.save_state(save_state)
+
+    return results
+
+def create_sink(path: str, record_format: str = 'npz', record_policy: dict = None) -> RecordSink:
+    """
+    Creates the sink that records a run to a file.
+
+    Args:
+        path (str): The file or directory to record to
+        record_format (str): The format of the record, one of the recorders
+        record_policy (dict): The arguments of an EventTriggeredSink that decides which iterations are recorded. Every iteration is
+            recorded if not given.
+
+    Returns:
+        RecordSink: The sink
+    """
+
+    sink = recorders[record_format](path)
+    if (record_policy is not None):
+        sink = EventTriggeredSink(sink, **record_policy)
+
+    return sink
+
+def open_run(path: str) -> Trajectory:
+    """
+    Opens a recorded run lazily, whichever of the recorders wrote it.
+
+    Args:
+        path (str): The run directory written by MemmapSink, or the NPZ file written by ColumnarFileSink
+
+    Returns:
+        Trajectory: The run
+    """
+
+    if os.path.isdir(path):
+        return Trajectory(path)
+
+    return ColumnarRun(path)
+
+def create_model(model: type, config: Config, rng: np.random.Generator = None, warm_start: str = None):
+    """
+    Creates a MAB model instance with one arm per trailing ACV.
+
+    Args:
+        model (type): The MAB model class to use
+        config (Config): The simulation config, with num_acvs set from the starting data
+        rng (np.random.Generator): The random number generator used by the model
+        warm_start (str): A model state file (see MABModel.save_state) to start from. Untrained if not given.
+
+    Returns:
+        MABModel: The model instance
+    """
+
+    instance = model(
+        d = config.mab.d,
+        n_arms = config.acvs.num_acvs - 1,
+        ideal_distance = config.acvs.ideal_distance,
+        alpha = config.mab.alpha,
+        epsilon = config.mab.epsilon,
+        n_bootstrap = config.mab.n_bootstrap,
+        rng = rng,
     )
 
-    num_sim_runs = get_config('simulation', 'num_simulation_runs')
-    for _ in range(num_sim_runs):
-        updater = ACVUpdater()
-        executer = Executer(updater)
-        planner = Planner(executer)
-        analyzer = Analyzer(planner)
-        monitor = Monitor(analyzer)
+    if (warm_start is not None):
+        instance.load_state(warm_start)
+
+    return instance
+
+def build_simulation(config: Config, model: type, rng: np.random.Generator = None, warm_start: str = None, start_data=None,
+        profiler: StageProfiler = None, sink: RecordSink = None) -> ACVUpdater:
+    """
+    Wires up a single simulation run: a fresh knowledge context and model shared by the ACVs and the MAPE-K loop of this run only.
+    Simulations built this way share no state, so any number of them can run side by side in one process.
+
+    Args:
+        config (Config): The simulation config, with num_acvs set from the starting data
+        model (type): The MAB model class to use
+        rng (np.random.Generator): The random number generator used by the simulation and the model. Freshly seeded if not given.
+        warm_start (str): A model state file (see MABModel.save_state) the model starts from. Untrained if not given.
+        start_data (np.ndarray): The starting location and speed of each ACV (see read_start_data). Read from the CSV file if not
+            given. The config's num_acvs must match it.
+        profiler (StageProfiler): Records the latency of each MAPE-K stage and model call. Nothing is timed if not given.
+        sink (RecordSink): Where the record of each iteration goes. The Logger chooses if not given.
+
+    Returns:
+        ACVUpdater: The distance sensor of the run, ready for run_update_loop
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    knowledge = Knowledge(config, create_model(model, config, rng, warm_start), rng, profiler)
+
+    updater = ACVUpdater(knowledge, start_data, sink)
+    executer = Executer(updater, knowledge)
+    planner = Planner(executer, knowledge)
+    analyzer = Analyzer(planner, knowledge)
+    monitor = Monitor(analyzer, knowledge)
+
+    updater.register(monitor)
+
+    if (profiler is not None):
+        for (instance, method) in [(updater, 'update_distances'), (monitor, 'execute'), (analyzer, 'execute'), (analyzer, 'handle_bad_sensor_detection'),
+                (planner, 'execute'), (executer, 'execute'), (knowledge.mab_model, 'select_arm'), (knowledge.mab_model, 'update')]:
+            profiler.instrument(instance, method)
+
+    return updater
+
+def run_seeded_simulation(config: Config, model: type, seed: np.random.SeedSequence, warm_start: str = None, save_state: str = None,
+        profiler: StageProfiler = None, profile_path: str = None, record_path: str = None, record_format: str = 'npz',
+        record_policy: dict = None, live_feed: LiveFeed = None) -> dict:
+    """
+    Runs a single simulation with a fresh model instance and its own random number stream.
+
+    Args:
+        config (Config): The simulation config
+        model (type): The MAB model class to use
+        seed (np.random.SeedSequence): The seed of the run's random number stream
+        warm_start (str): A model state file the model starts from. Untrained if not given.
+        save_state (str): A file to save the model to once the run has finished
+        profiler (StageProfiler): Records the latency of each stage of the run. Stages are not timed if not given.
+        profile_path (str): A file to dump a cProfile of the run to
+        record_path (str): A file to record the run to
+        record_format (str): The format of the record file, one of the recorders
+        record_policy (dict): The arguments of an EventTriggeredSink that decides which iterations are recorded
+        live_feed (LiveFeed): A feed to publish every iteration of the run to as it happens
+
+    Returns:
+        dict: The final metrics of the run (see Logger.calculate_metrics)
+    """
+
+    config = config.override('simulation', 'num_simulation_runs', 1)
+    return run_simulation(config, model, np.random.default_rng(seed), warm_start, save_state, profiler, profile_path, record_path, record_format,
+        record_policy, live_feed)[0]
+
+def run_parallel_simulations(config: Config, model: type, runs: int, seed: int = None, workers: int = None, executor: str = 'process',
+        warm_start: str = None, save_state: str = None, profiler: StageProfiler = None, profile_dir: str = None, record_dir: str = None,
+        record_format: str = 'npz', record_policy: dict = None, live_feed: LiveFeed = None) -> list:
+    """
+    Runs independent simulations spread over a pool of workers. Each run gets a fresh model and a random number stream
+    spawned from the seed by its run index, so the results do not depend on the number or kind of workers.
+
+    Args:
+        config (Config): The simulation config
+        model (type): The MAB model class to use
+        runs (int): The number of simulation runs
+        seed (int): The seed all run seeds are spawned from. Random if not given.
+        workers (int): The number of workers. Defaults to the number of CPUs; 1 runs everything in this process.
+        executor (str): 'process' to spread runs over worker processes, or 'thread' to multiplex them over threads in this process
+        warm_start (str): A model state file every run's model starts from. Untrained if not given.
+        save_state (str): A file to save the model of the last run to once it has finished
+        profiler (StageProfiler): Collects the latency of each stage of every run. Stages are not timed if not given. Timings are
+            only collected from runs in this process, so it cannot be used with more than one worker process.
+        profile_dir (str): A directory to dump a cProfile of each run to, as run-<index>.prof. Not supported with more than one thread worker.
+        record_dir (str): A directory to record each run to, as run-<index>.<format>
+        record_format (str): The format of the record files, one of the recorders
+        record_policy (dict): The arguments of an EventTriggeredSink that decides which iterations are recorded. Every iteration is
+            recorded if not given.
+        live_feed (LiveFeed): A feed to publish every iteration of each run to as it happens, for the live dashboard. Runs are
+            watched one at a time, so it needs one worker.
+
+    Returns:
+        list: The final metrics of each run, in run order (see Logger.calculate_metrics)
+    """
+
+    if executor not in executors:
+        raise ValueError(f"Unknown executor '{executor}'. Options are: {', '.join(executors)}")
+    if record_format not in recorders:
+        raise ValueError(f"Unknown record format '{record_format}'. Options are: {', '.join(recorders)}")
+
+    seeds = np.random.SeedSequence(seed).spawn(runs)
+    workers = min(workers or os.cpu_count() or 1, runs)
+
+    # Callers check this first (see mabel.run); timings of other processes would be silently lost
+    assert (profiler is None) or (workers == 1) or (executor == 'thread'), 'Stage timings need one worker process or thread workers'
+
+    # cProfile can only profile one thread of a process at a time
+    if (profile_dir is not None) and (workers > 1) and (executor == 'thread'):
+        raise ValueError('Runs can only be profiled in worker processes or with one worker')
+
+    if (live_feed is not None) and (workers > 1):
+        raise ValueError('Runs can only be watched live with one worker')
+
+    # Only the last run saves its model
+    save_states = [None] * (runs - 1) + [save_state]
+
+    # Each run records into its own profiler, so concurrent runs never share a histogram
+    run_profilers = [StageProfiler() if profiler is not None else None for _ in range(runs)]
+    profile_paths = [os.path.join(profile_dir, f'run-{run}.prof') if profile_dir is not None else None for run in range(runs)]
+    record_paths = [os.path.join(record_dir, f'run-{run}.{record_format}') if record_dir is not None else None for run in range(runs)]
+
+    if workers <= 1:
+        results = list(map(run_seeded_simulation, repeat(config), repeat(model), seeds, repeat(warm_start), save_states, run_profilers, profile_paths,
+            record_paths, repeat(record_format), repeat(record_policy), repeat(live_feed)))
+    else:
+        # Runs are short, so hand them out in chunks to keep inter-process overhead down
+        chunksize = max(1, runs // (workers * 4))
+        with executors[executor](max_workers=workers) as pool:
+            results = list(pool.map(run_seeded_simulation, repeat(config), repeat(model), seeds, repeat(warm_start), save_states, run_profilers,
+                profile_paths, record_paths, repeat(record_format), repeat(record_policy), chunksize=chunksize))
+
+    if (profiler is not None):
+        for run_profiler in run_profilers:
+            profiler.merge(run_profiler)
+
+    return results
+
+def run_lockstep_simulations(config: Config, model: type, runs: int, seed: int = None, warm_start: str = None, save_state: str = None,
+        profiler: StageProfiler = None, profile_path: str = None) -> list:
+    """
+    Runs many platoons in lockstep in this process (see LockstepSimulator). Each platoon gets a fault schedule from a random number
+    stream spawned from the seed by its run index, as in run_parallel_simulations, but all platoons share one model. A single platoon
+    reproduces run_parallel_simulations exactly.
+
+    Args:
+        config (Config): The simulation config
+        model (type): The MAB model class to use
+        runs (int): The number of platoons
+        seed (int): The seed all platoon seeds are spawned from. Random if not given.
+        warm_start (str): A model state file the shared model starts from. Untrained if not given.
+        save_state (str): A file to save the shared model to once every platoon has finished
+        profiler (StageProfiler): Records the latency of each batched stage and model call. Stages are not timed if not given.
+        profile_path (str): A file to dump a cProfile of the simulation to
+
+    Returns:
+        list: The final metrics of each platoon, in run order (see Logger.calculate_metrics)
+    """
+
+    config = config.override('acvs', 'num_acvs', len(read_start_data()))
+    rngs = [np.random.default_rng(run_seed) for run_seed in np.random.SeedSequence(seed).spawn(runs)]
+
+    # The model draws from the first platoon's stream, after that platoon's fault schedule, just as a single run does
+    knowledge = Knowledge(config, create_model(model, config, rngs[0], warm_start), rngs[0], profiler)
+    simulator = LockstepSimulator(knowledge, rngs)
+
+    if (profiler is not None):
+        for (instance, method) in [(simulator, 'update_distances'), (simulator, 'analyze'), (simulator, 'handle_bad_sensor_detection'),
+                (knowledge.mab_model, 'select_arms'), (knowledge.mab_model, 'update_batch')]:
+            profiler.instrument(instance, method)
+
+    if (profile_path is not None):
+        results = profile_call(profile_path, simulator.run_update_loop)
+    else:
+        results = simulator.run_update_loop()
+
+    if (save_state is not None):
+        knowledge.mab_model.save_state(save_state)
+
+    return results
+
+def summarize_metrics(results: list) -> dict:
+    """
+    Merges the metrics of many runs into totals and averages.
+
+    Args:
+        results (list): The final metrics of each run (see Logger.calculate_metrics)
+
+    Returns:
+        dict: The number of runs, total crashes, and the mean penalty and regret improvements over the runs where they are defined
+    """
+
+    def mean(key: str):
+        values = [metrics[key] for metrics in results if metrics[key] is not None]
+        return sum(values) / len(values) if values else None
+
+    return {
+        'runs': len(results),
+        'crashes': sum(metrics['crashes'] for metrics in results),
+        'mean_penalty_improvement': mean('penalty_improvement'),
+        'mean_regret_improvement': mean('regret_improvement'),
+    }
+
+def get_model(name: str) -> type:
+    """
+    Gets a model class from the available model options by its name.
+
+    Args:
+        name (str): The name of the model, e.g. 'LinearUCB'
+
+    Returns:
+        type: The model class
+    """
+
+    models = dict(model_options)
+    if name not in models:
+        raise ValueError(f"Unknown model '{name}'. Options are: {', '.join(models)}")
+
+    return models[name]
 
-        updater.register(monitor)
-        updater.run_update_loop()
+def select_model(config: Config):
+    """
+    Selects the model to use for the simulation.
 
-def select_model():
-    """Selects the model to use for the simulation."""
+    Args:
+        config (Config): The simulation config
+    """
 
     print("\nSelect a model:")
-    print(get_config('output', 'minor_divider'))
+    print(config.output.minor_divider)
     
     for i, model in enumerate(model_options):
         print(f"{i + 1}. {model[0]}")
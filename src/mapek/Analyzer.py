@@ -1,9 +1,11 @@
+import numpy as np
+
 from mapek.Component import Component
 from mapek.Knowledge import Knowledge
 from mapek.Planner import Planner
-from copy import deepcopy
+from mapek.PenaltyEvaluator import PenaltyEvaluator
 
-from config import get_config
+from subject.FleetSnapshot import FleetSnapshot
 
 class Analyzer(Component):
     """
@@ -11,156 +13,112 @@ class Analyzer(Component):
 
     Attributes:
         planner (Planner): The planner component of the MAPE-K loop
-        distances (list): List of distances from each trailing ACV
-        locations (list): List of locations of each ACV
-        acvs (list): List of all ACVs
+        knowledge (Knowledge): The knowledge of the simulation run
+        config (Config): The simulation config
+        penalty_evaluator (PenaltyEvaluator): Computes the counterfactual penalty of a trailing ACV perceiving a given distance
+        distances (np.ndarray): Array of shape (n - 1, 2) of (sensor reading, ground truth) distances from each trailing ACV
+        locations (np.ndarray): Location of each ACV
+        acvs (FleetSnapshot): Read-only view of all ACVs for the current iteration
+        penalties (np.ndarray): Array of shape (n - 1, 2) of (sensor penalty, ground truth penalty) for each trailing ACV
         bad_sensor (int): The index of the trailing ACV with the bad sensor reading (index of 0 will correspond to ACV1)
     """
 
-    def __init__(self, planner: Planner):
+    def __init__(self, planner: Planner, knowledge: Knowledge):
         """
         Initializes the MAPE-K loop analyzer with the planner.
-        
+
         Args:
             planner (Planner): The planner component of the MAPE-K loop
+            knowledge (Knowledge): The knowledge of the simulation run
         """
 
         self.planner = planner
-
-        self.distances = list()
-        self.locations = list()
-        self.acvs = list()
-        self.trailing_acvs = list()
+        self.knowledge = knowledge
+        self.config = knowledge.config
+        self.penalty_evaluator = PenaltyEvaluator(self.config)
+
+        self.distances = None
+        self.locations = None
+        self.acvs = None
+        self.penalties = None
         self.bad_sensor = None
 
-    def execute(self, acvs: list):
+    def execute(self, acvs: FleetSnapshot):
         """
-        Calculates the new speed and penalty incurred by each trailing ACV, as well as whether or not there is a bad sensor this 
+        Calculates the new speed and penalty incurred by each trailing ACV, as well as whether or not there is a bad sensor this
         iteration, and sends all information to the planner
-        
+
         Args:
-            acvs (list): List of all ACVs
+            acvs (FleetSnapshot): Read-only view of all ACVs for the current iteration
         """
 
-        knowledge = Knowledge()
+        knowledge = self.knowledge
         ideal_distance = knowledge.ideal_distance
         target_speed = knowledge.target_speed
 
         self.acvs = acvs
-        self.trailing_acvs = acvs[1:]
-
-        # List of tuple of distances (sensor reading, ground truth)
-        self.distances = [(acv.distance, knowledge.actual_distances[i]) for (i, acv) in enumerate(self.trailing_acvs)]
-        self.locations = [acv.location for acv in acvs]
-
-        self.handle_bad_sensor_detection()
-
-        new_speeds = list()
-        penalties = list()
 
-        index = 0
-        for (index, acv) in enumerate(self.trailing_acvs):
-            sensor_distance = acv.distance
-            ground_truth_distance = knowledge.actual_distances[index]
+        # Columns of distances (sensor reading, ground truth)
+        self.distances = np.column_stack([acvs.distances[1:], acvs.actual_distances])
+        self.locations = acvs.locations
 
-            # Speed (S) = target speed (T) + (distance (D) - ideal distance (I)) → S = T + (D - I)
-            new_speed = target_speed + (sensor_distance - ideal_distance)
-            ground_truth_speed = target_speed + (ground_truth_distance - ideal_distance)
+        # Separate penalties for the potential bad sensor reading and the ground truth of every trailing ACV
+        self.penalties = self.penalty_evaluator.penalty_matrix(
+            acvs.locations, acvs.speeds, acvs.target_speeds, target_speed, self.distances[:, 0], self.distances[:, 1])
 
-            # Separate penalties for the potential bad sensor reading and the ground truth
-            sensor_penalty = self.calculate_penalty(sensor_distance, index)
-            ground_truth_penalty = self.calculate_penalty(ground_truth_distance, index)
+        self.handle_bad_sensor_detection()
 
-            # Tuples of (new value, ground truth value) to be decided by the planner
-            new_speeds.append((new_speed, ground_truth_speed))
-            penalties.append((sensor_penalty, ground_truth_penalty)) 
+        # Speed (S) = target speed (T) + (distance (D) - ideal distance (I)) → S = T + (D - I)
+        # Columns of (new value, ground truth value) to be decided by the planner
+        new_speeds = target_speed + (self.distances - ideal_distance)
 
-            index += 1
+        self.planner.execute(new_speeds, self.penalties, self.bad_sensor, acvs.target_speeds[1:])
 
-        self.planner.execute(new_speeds, penalties, self.bad_sensor, self.trailing_acvs)
-        
     def handle_bad_sensor_detection(self):
         """Finds if there is a bad sensor reading using the chosen MAB model and updates the model's parameters"""
-        
-        knowledge = Knowledge()
+
+        knowledge = self.knowledge
         model = knowledge.mab_model
-        
+
         self.bad_sensor = None
 
-        readings = [acv.distance for acv in self.trailing_acvs]        
-        variations = [abs(knowledge.ideal_distance - reading) for reading in readings]
+        readings = self.distances[:, 0]
+        variations = np.abs(knowledge.ideal_distance - readings).tolist()
 
         arm = model.select_arm(variations=variations)
 
         # Calculate the residual between the predicted penalty and the actual penalty
-        penalty = self.calculate_penalty(readings[arm], arm)
+        penalty = self.penalties[arm, 0]
         predicted_penalty = model.theta[arm]
         residual = abs(penalty - predicted_penalty)
 
-        if residual > get_config('mab', 'residual_threshold'):
+        if residual > self.config.mab.residual_threshold:
             self.bad_sensor = arm
 
+            # Only the ignored ACV's row of penalties is re-evaluated, with every ACV in it steered by that ACV's actual distance
+            self.penalties[arm] = self.calculate_penalties([arm, arm], self.distances[arm], ignoring=[True, True])
+
             # New penalty with actual, unmodified distance to reward model for selecting correctly
-            penalty = self.calculate_penalty(self.distances[arm][1], arm)
+            penalty = self.penalties[arm, 1]
 
         model.update(arm=arm, x=variations[arm], penalty=penalty)
 
-    def calculate_penalty(self, distance, index) -> float:
+    def calculate_penalties(self, indices, distances, ignoring=None) -> np.ndarray:
         """
-        Calculates what the penalty would be for an ACV with a given distance value by using the formula Penalty (P) = variation (V) from desired ^2 → P = V^2 and 
+        Calculates what the penalties would be for trailing ACVs with given distance values by using the formula Penalty (P) = variation (V) from desired ^2 → P = V^2 and
         by predicting if a crash would occur
-        
+
         Args:
-            distance (float): What the distance sensor percieves is the distance between the given ACV and the one in front of it
-            index (int): The index of the ACV in the given list of ACV distances and locations (0 is ACV1, 1 is ACV2, etc.)            
+            indices (array_like): The indexes of the ACVs in the given list of ACV distances (0 is ACV1, 1 is ACV2, etc.)
+            distances (array_like): What the distance sensor percieves is the distance between each given ACV and the one in front of it
+            ignoring (array_like): Whether each given ACV is ignoring its distance sensor in favor of the ground truth
 
         Returns:
-            float: The penalty for the ACV
+            np.ndarray: The penalty for each ACV
         """
 
-        knowledge = Knowledge()
-        ideal_distance = knowledge.ideal_distance
-        target_speed = knowledge.target_speed
-        
-        acvs = deepcopy(self.acvs)
-
-        # Penalty (P) = variation (V) from desired ^2 → P = V^2
-        penalty = pow(distance - ideal_distance, 2)
-
-        acv_index = index + 1
-
-        # Crash penalty calculation
-        for (i, acv) in enumerate(acvs):
-            if (i == 0):
-                acv.update(0)
-                continue
-
-            sensor_distance = acv.distance
-
-            # Use regular sensor distances for all ACVs except the one at the specified index, in which case use the distance value passed in as a parameter
-            dist = sensor_distance if acv_index != i else distance
-            
-            # Speed (S) = target speed (T) + (distance (D) - ideal distance (I)) → S = T + (D - I)
-            if self.bad_sensor != None and index == self.bad_sensor:
-                new_speed = target_speed + (knowledge.actual_distances[index] - ideal_distance)
-            else:
-                new_speed = target_speed + (dist - ideal_distance)
-            
-            # Update (copy of) ACVs to see what would happen in this scenario
-            modifier = new_speed - acv.target_speed
-            acv.update(modifier)
-
-        locations = [acv.location for acv in acvs]
-
-        crash_front = False if (acv_index == 0) else (locations[acv_index - 1] - locations[acv_index] < 0)
-        crash_back = False if (acv_index >= len(locations) - 1) else (locations[acv_index] - locations[acv_index + 1] < 0)
-
-        # We know the sensor was altered if the sensor distance and the actual distance are different
-        sensor_altered = (self.distances[index][0] != self.distances[index][1])
-
-        # Did the ACV crash into another ACV, and was it at fault? I.e. did it crash because of a bad sensor reading or because another ACV crashed into it?
-        # A very large penalty is incurred to the ACV with the altered sensor if it crashes into another ACV 
-        if ((crash_front or crash_back) and (sensor_altered)):
-            penalty = get_config('mab', 'crash_penalty') 
+        knowledge = self.knowledge
 
-        return penalty
\ No newline at end of file
+        return self.penalty_evaluator.evaluate(
+            self.acvs.locations, self.acvs.speeds, self.acvs.target_speeds, knowledge.target_speed,
+            self.distances[:, 0], self.distances[:, 1], indices, distances, ignoring)
@@ -0,0 +1,11 @@
+import numpy as np
+
+# One record per trailing ACV (index 0 is ACV1), produced by the planner and applied by the ACVUpdater in a single call
+DECISION_DTYPE = np.dtype([
+    ('speed_modifier', float),      # Added to the ACV's target speed
+    ('penalty', float),             # Penalty incurred this iteration
+    ('regret', float),              # Regret incurred this iteration
+    ('baseline_penalty', float),    # Penalty had the distance sensor reading always been used
+    ('baseline_regret', float),     # Regret had the distance sensor reading always been used
+    ('ignoring_sensor', bool),      # Whether the ACV ignored its distance sensor reading in favor of the predicted value
+])
@@ -1,3 +1,5 @@
+import numpy as np
+
 from mapek.Component import Component
 from mapek.Knowledge import Knowledge
 
@@ -9,29 +11,28 @@ class Executer(Component):
 
     Attributes:
         sensor (ACVUpdater): The distance sensor to send adaptation information back to.
+        knowledge (Knowledge): The knowledge of the simulation run
     """
 
-    def __init__(self, sensor: ACVUpdater):
+    def __init__(self, sensor: ACVUpdater, knowledge: Knowledge):
         """
         Initializes the MAPE-K loop executer with the distance sensor.
-        
+
         Args:
             sensor (ACVUpdater): The distance sensor to send adaptation information back to.
+            knowledge (Knowledge): The knowledge of the simulation run
         """
 
         self.sensor = sensor
+        self.knowledge = knowledge
 
-    def execute(self, speed_modifiers: list, penalties: list, regrets: list, baseline_penalties: list, baseline_regrets: list, acvs_ignoring_sensor: list):
+    def execute(self, decisions: np.ndarray):
         """
-        Sends the speed modifiers back to the distance sensor to then be sent to the ACVs
+        Sends the decision record back to the distance sensor to then be applied to the ACVs
 
         Args:
-            speed_modifiers (list): List of speed modifiers for each ACV
-            penalties (list): List of penalties for each ACV
-            regrets (list): List of regrets for each ACV
-            baseline_penalties (list): List of baseline penalties for each ACV
-            baseline_regrets (list): List of baseline regrets for each ACV
-            acvs_ignoring_sensor (list): List of ACVs who have ignored their distance sensor reading in favor of the predicted value. Used for visual purposes.
+            decisions (np.ndarray): Structured array of DECISION_DTYPE with the speed modifier, penalty, regret, baseline penalty, baseline regret
+                and whether the sensor is being ignored for each trailing ACV
         """
 
-        self.sensor.recieve_speed_modifications(speed_modifiers, penalties, regrets, baseline_penalties, baseline_regrets, acvs_ignoring_sensor)
\ No newline at end of file
+        self.sensor.recieve_speed_modifications(decisions)
@@ -1,24 +1,39 @@
+import numpy as np
+
+from config import Config
+
 class Knowledge:
     """
-    The knowledge component of the MAPE-K loop.
-    
+    The knowledge component of the MAPE-K loop. One instance is created for each simulation run and given to every component of
+    that run, so any number of simulations can run side by side in the same process without sharing state.
+
     Attributes:
+        config (Config): The simulation config
         target_speed (int): The target speed for all ACVs
         ideal_distance (int): The ideal distance for all ACVs
         actual_distances (list): List of unmodified distance for each trailing ACV
         mab_model (MABModel): The MAB model used to determine bad sensor readings
+        rng (np.random.Generator): The random number generator of the simulation run
+        profiler (StageProfiler): Records the latency of each stage of the run. None if the run is not timed.
     """
 
-    __instance = None
+    def __init__(self, config: Config, mab_model=None, rng: np.random.Generator = None, profiler=None):
+        """
+        Initializes the knowledge of a single simulation run.
+
+        Args:
+            config (Config): The simulation config
+            mab_model (MABModel): The MAB model used to determine bad sensor readings
+            rng (np.random.Generator): The random number generator of the simulation run. Freshly seeded if not given.
+            profiler (StageProfiler): Records the latency of each stage of the run. None if the run is not timed.
+        """
+
+        self.config = config
 
-    target_speed = None
-    ideal_distance = None
-    actual_distances = None
-    
-    mab_model = None
+        self.target_speed = None
+        self.ideal_distance = config.acvs.ideal_distance
+        self.actual_distances = None
 
-    def __new__(cls, *args):
-        """Creates a singleton instance of the Knowledge class."""
-        if cls.__instance is None:
-            cls.__instance = object.__new__(cls, *args)
-        return cls.__instance
+        self.mab_model = mab_model
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.profiler = profiler
@@ -0,0 +1,111 @@
+import math
+import numpy as np
+
+class LatencyHistogram:
+    """
+    A fixed-size histogram of latencies with logarithmically spaced bins, so recording a latency costs the same whatever the number
+    of samples and percentiles are accurate to the bin width (about 5% with the default resolution).
+
+    Bin 0 holds latencies below min_seconds and the last bin holds latencies above max_seconds. Bin i in between holds latencies in
+    [min_seconds * 10^((i - 1) / bins_per_decade), min_seconds * 10^(i / bins_per_decade)).
+
+    Attributes:
+        min_seconds (float): The smallest latency resolved
+        bins_per_decade (int): The number of bins per factor of 10
+        counts (list): The number of latencies in each bin
+        count (int): The number of latencies recorded
+        total (float): The sum of all latencies recorded, in seconds
+        max (float): The largest latency recorded, in seconds
+    """
+
+    def __init__(self, min_seconds: float = 1e-7, max_seconds: float = 10.0, bins_per_decade: int = 50):
+        """
+        Initializes an empty histogram.
+
+        Args:
+            min_seconds (float): The smallest latency resolved
+            max_seconds (float): The largest latency resolved
+            bins_per_decade (int): The number of bins per factor of 10
+        """
+
+        self.min_seconds = min_seconds
+        self.bins_per_decade = bins_per_decade
+        self.counts = [0] * (math.ceil(math.log10(max_seconds / min_seconds) * bins_per_decade) + 2)
+
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        """
+        Records a latency.
+
+        Args:
+            seconds (float): The latency in seconds
+        """
+
+        if (seconds < self.min_seconds):
+            index = 0
+        else:
+            index = min(int(math.log10(seconds / self.min_seconds) * self.bins_per_decade) + 1, len(self.counts) - 1)
+
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if (seconds > self.max):
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimates a percentile of the recorded latencies as the upper edge of the bin it falls in, capped at the largest latency.
+
+        Args:
+            q (float): The percentile, between 0 and 100
+
+        Returns:
+            float: The latency in seconds, or None if nothing was recorded
+        """
+
+        if (self.count == 0):
+            return None
+
+        rank = max(1, math.ceil(q / 100 * self.count))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+
+        return min(self.min_seconds * 10 ** (index / self.bins_per_decade), self.max)
+
+    def merge(self, other: 'LatencyHistogram'):
+        """
+        Adds the latencies of another histogram with the same bins to this one.
+
+        Args:
+            other (LatencyHistogram): The histogram to add
+        """
+
+        if (len(other.counts) != len(self.counts)) or (other.min_seconds != self.min_seconds) or (other.bins_per_decade != self.bins_per_decade):
+            raise ValueError('Only histograms with the same bins can be merged')
+
+        self.counts = [a + b for (a, b) in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def summary(self) -> dict:
+        """
+        Summarizes the recorded latencies.
+
+        Returns:
+            dict: The number of latencies and the mean, p50, p95, p99 and max latency in microseconds
+        """
+
+        def microseconds(seconds):
+            return seconds * 1e6 if seconds is not None else None
+
+        return {
+            'count': self.count,
+            'mean_us': microseconds(self.total / self.count if self.count else None),
+            'p50_us': microseconds(self.percentile(50)),
+            'p95_us': microseconds(self.percentile(95)),
+            'p99_us': microseconds(self.percentile(99)),
+            'max_us': microseconds(self.max if self.count else None),
+        }
@@ -3,49 +3,48 @@ from mapek.Analyzer import Analyzer
 from mapek.Observer import Observer
 from mapek.Component import Component
 
-from copy import deepcopy
+from subject.FleetSnapshot import FleetSnapshot
 
 class Monitor(Observer, Component):
     """
     The MAPE-K loop monitor component.
-    
+
     Attributes:
         analyzer (Analyzer): The analyzer component of the MAPE-K loop
+        knowledge (Knowledge): The knowledge of the simulation run
     """
 
-    def __init__(self, analyzer: Analyzer):
+    def __init__(self, analyzer: Analyzer, knowledge: Knowledge):
         """
         Initializes the MAPE-K loop monitor with the analyzer.
-        
+
         Args:
             analyzer (Analyzer): The analyzer component of the MAPE-K loop
+            knowledge (Knowledge): The knowledge of the simulation run
         """
 
         self.analyzer = analyzer
+        self.knowledge = knowledge
 
-    def update(self, acvs: list, actual_distances: list):
+    def update(self, snapshot: FleetSnapshot):
         """
-        Sends a copy of the distances and speeds to be executed on
-        
+        Sends the read-only snapshot of the distances and speeds to be executed on
+
         Args:
-            acvs (list): List of all ACVs
-            actual_distances (list): List of unmodified distance for each trailing ACV
+            snapshot (FleetSnapshot): Read-only view of all ACVs and their unmodified distances for this iteration
         """
 
-        acvs_copy = deepcopy(acvs)
-        self.execute(acvs_copy, actual_distances.copy())
+        self.execute(snapshot)
 
-    def execute(self, acvs: list, actual_distances: list):
+    def execute(self, snapshot: FleetSnapshot):
         """
         Updates knowledge with speeds and sends the distances and speeds to the analyzer
-        
+
         Args:
-            acvs (list): List of all ACVs
-            actual_distances (list): List of unmodified distance for each trailing ACV
+            snapshot (FleetSnapshot): Read-only view of all ACVs and their unmodified distances for this iteration
         """
 
-        knowledge = Knowledge()
-        knowledge.actual_distances = actual_distances
+        knowledge = self.knowledge
+        knowledge.actual_distances = snapshot.actual_distances
 
-        self.analyzer.execute(acvs)
-        
\ No newline at end of file
+        self.analyzer.execute(snapshot)
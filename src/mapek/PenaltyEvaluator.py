@@ -0,0 +1,128 @@
+import numpy as np
+
+from config import Config
+
+class PenaltyEvaluator:
+    """
+    Computes counterfactual penalties for the analyzer: "what penalty would this ACV incur if it believed the distance in
+    front of it was d?". Rather than copying and stepping the whole platoon, the one-step kinematics (easing, speed clamping
+    and movement) are evaluated in closed form for the ACV in question and its two neighbours, which are the only ACVs a
+    crash check needs. Every hypothesis is evaluated at once with array operations.
+
+    All fleet arrays may carry leading batch dimensions (e.g. one row per environment), in which case the hypotheses carry
+    the same leading dimensions.
+
+    Attributes:
+        ideal_distance (float): The ideal distance between ACVs
+        max_speed (float): The maximum speed (in either direction) of any ACV
+        easing (float): The fraction of the gap to its target speed an ACV closes each iteration
+        crash_penalty (float): The penalty incurred by an ACV with an altered sensor that would crash
+    """
+
+    def __init__(self, config: Config):
+        """
+        Initializes the evaluator with the kinematic and penalty settings of the config.
+
+        Args:
+            config (Config): The simulation config
+        """
+
+        self.ideal_distance = config.acvs.ideal_distance
+        self.max_speed = config.acvs.max_speed
+        self.easing = config.acvs.easing
+        self.crash_penalty = config.mab.crash_penalty
+
+    def evaluate(self, locations, speeds, target_speeds, lead_speed, sensor_distances, actual_distances, indices, distances, ignoring=None) -> np.ndarray:
+        """
+        Calculates the penalty for each hypothesis using the formula Penalty (P) = variation (V) from desired ^2 → P = V^2, replaced by the
+        crash penalty if the ACV has an altered sensor and would crash into the ACV in front of or behind it after one iteration.
+
+        Args:
+            locations (np.ndarray): The location of each ACV, shape (..., n)
+            speeds (np.ndarray): The speed of each ACV, shape (..., n)
+            target_speeds (np.ndarray): The target speed of each ACV, shape (..., n)
+            lead_speed (float or np.ndarray): The speed of the lead ACV, shape (...)
+            sensor_distances (np.ndarray): The distance sensor reading of each trailing ACV, shape (..., n - 1)
+            actual_distances (np.ndarray): The unmodified distance of each trailing ACV, shape (..., n - 1)
+            indices (np.ndarray): The trailing ACV each hypothesis is about (0 is ACV1), shape (..., H)
+            distances (np.ndarray): The distance the ACV is assumed to perceive in each hypothesis, shape (..., H)
+            ignoring (np.ndarray): Whether the ACV of each hypothesis is ignoring its sensor, shape (..., H). If so, every trailing ACV
+                in that hypothesis is steered with the ACV's unmodified distance, as the planner will do.
+
+        Returns:
+            np.ndarray: The penalty of each hypothesis, shape (..., H)
+        """
+
+        indices = np.asarray(indices)
+        distances = np.asarray(distances, dtype=float)
+        lead_speed = np.asarray(lead_speed, dtype=float)
+
+        num_acvs = locations.shape[-1]
+        acv_indices = indices + 1
+
+        # The ACV in front of, the ACV itself, and the ACV behind (clamped for the last ACV, masked out below)
+        positions = np.stack([acv_indices - 1, acv_indices, np.minimum(acv_indices + 1, num_acvs - 1)], axis=-1)
+        is_self = (positions == acv_indices[..., None])
+        is_lead = (positions == 0)
+
+        def gather(values, where):
+            return np.take_along_axis(values[..., None, :], where, axis=-1)
+
+        # Pad with the lead ACV (which has no distance) so distances can be indexed by ACV index
+        padding = np.zeros(sensor_distances.shape[:-1] + (1,))
+        sensor_by_acv = np.concatenate([padding, sensor_distances], axis=-1)
+        actual_by_acv = np.concatenate([padding, actual_distances], axis=-1)
+
+        # Use regular sensor distances for all ACVs except the one in question, in which case use the hypothesized distance
+        perceived = np.where(is_self, distances[..., None], gather(sensor_by_acv, positions))
+        if ignoring is not None:
+            own_actual = gather(actual_by_acv, acv_indices[..., None])
+            perceived = np.where(np.asarray(ignoring)[..., None], own_actual, perceived)
+
+        # Speed (S) = target speed (T) + (distance (D) - ideal distance (I)) → S = T + (D - I)
+        new_speeds = lead_speed[..., None, None] + (perceived - self.ideal_distance)
+
+        # One iteration of ACV.update with modifier = new speed - target speed. The lead ACV is never modified.
+        current_targets = gather(target_speeds, positions)
+        new_targets = np.where(is_lead, current_targets, current_targets + (new_speeds - current_targets))
+        new_targets = np.clip(new_targets, -self.max_speed, self.max_speed)
+
+        current_speeds = gather(speeds, positions)
+        eased_speeds = current_speeds + (new_targets - current_speeds) * self.easing
+        new_locations = gather(locations, positions) + eased_speeds
+
+        crash_front = (new_locations[..., 0] - new_locations[..., 1] < 0)
+        crash_back = (acv_indices < num_acvs - 1) & (new_locations[..., 1] - new_locations[..., 2] < 0)
+
+        # We know the sensor was altered if the sensor distance and the actual distance are different
+        sensor_altered = (gather(sensor_by_acv, acv_indices[..., None]) != gather(actual_by_acv, acv_indices[..., None]))[..., 0]
+
+        # A very large penalty is incurred to the ACV with the altered sensor if it crashes into another ACV
+        penalties = (distances - self.ideal_distance) ** 2
+        return np.where((crash_front | crash_back) & sensor_altered, float(self.crash_penalty), penalties)
+
+    def penalty_matrix(self, locations, speeds, target_speeds, lead_speed, sensor_distances, actual_distances) -> np.ndarray:
+        """
+        Calculates the penalty of every trailing ACV for both its sensor reading and its ground truth distance in a single pass.
+
+        Args:
+            locations (np.ndarray): The location of each ACV, shape (..., n)
+            speeds (np.ndarray): The speed of each ACV, shape (..., n)
+            target_speeds (np.ndarray): The target speed of each ACV, shape (..., n)
+            lead_speed (float or np.ndarray): The speed of the lead ACV, shape (...)
+            sensor_distances (np.ndarray): The distance sensor reading of each trailing ACV, shape (..., n - 1)
+            actual_distances (np.ndarray): The unmodified distance of each trailing ACV, shape (..., n - 1)
+
+        Returns:
+            np.ndarray: Array of shape (..., n - 1, 2) holding the (sensor penalty, ground truth penalty) of each trailing ACV
+        """
+
+        num_trailing = sensor_distances.shape[-1]
+        indices = np.broadcast_to(np.arange(num_trailing), sensor_distances.shape)
+
+        penalties = self.evaluate(
+            locations, speeds, target_speeds, lead_speed, sensor_distances, actual_distances,
+            np.concatenate([indices, indices], axis=-1),
+            np.concatenate([sensor_distances, actual_distances], axis=-1))
+
+        return np.stack([penalties[..., :num_trailing], penalties[..., num_trailing:]], axis=-1)
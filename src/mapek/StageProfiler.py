@@ -0,0 +1,93 @@
+import copy, cProfile, time
+
+from functools import wraps
+
+from mapek.LatencyHistogram import LatencyHistogram
+
+class StageProfiler:
+    """
+    Records the latency of every call to the instrumented stages of a simulation into a histogram per stage.
+
+    Stages are instrumented by wrapping the bound method of a single instance, so the classes themselves are untouched and a run
+    without a profiler has no overhead at all. Latencies are inclusive: Monitor.execute contains the whole analyze, plan and execute
+    chain it calls.
+
+    Attributes:
+        histograms (dict): The LatencyHistogram of each stage, by stage name
+    """
+
+    def __init__(self):
+        """Initializes a profiler with no stages recorded."""
+
+        self.histograms = dict()
+
+    def instrument(self, instance, method: str, stage: str = None):
+        """
+        Times every call to a method of one instance.
+
+        Args:
+            instance (object): The instance whose method is timed
+            method (str): The name of the method
+            stage (str): The name the latencies are recorded under. Defaults to 'ClassName.method'.
+        """
+
+        if stage is None:
+            stage = f'{type(instance).__name__}.{method}'
+
+        histogram = self.histograms.setdefault(stage, LatencyHistogram())
+        function = getattr(instance, method)
+        clock = time.perf_counter
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.record(clock() - start)
+
+        setattr(instance, method, timed)
+
+    def merge(self, other: 'StageProfiler'):
+        """
+        Adds the latencies recorded by another profiler to this one, e.g. of another run.
+
+        Args:
+            other (StageProfiler): The profiler to add
+        """
+
+        for (stage, histogram) in other.histograms.items():
+            if stage in self.histograms:
+                self.histograms[stage].merge(histogram)
+            else:
+                self.histograms[stage] = copy.deepcopy(histogram)
+
+    def summary(self) -> dict:
+        """
+        Summarizes the latencies of every stage.
+
+        Returns:
+            dict: The summary of each stage's histogram (see LatencyHistogram.summary), by stage name
+        """
+
+        return {stage: histogram.summary() for (stage, histogram) in self.histograms.items()}
+
+def profile_call(path: str, function, *args, **kwargs):
+    """
+    Calls a function under cProfile and dumps the profile to a file, for pstats, snakeviz or flameprof.
+
+    Args:
+        path (str): The file to dump the profile to
+        function (callable): The function to call
+        args: The positional arguments of the call
+        kwargs: The keyword arguments of the call
+
+    Returns:
+        any: The return value of the function
+    """
+
+    profile = cProfile.Profile()
+    try:
+        return profile.runcall(function, *args, **kwargs)
+    finally:
+        profile.dump_stats(path)
@@ -0,0 +1,123 @@
+import numpy as np
+from ml_models.MABModel import MABModel, sum_by_arm
+
+class BootstrappedUCB(MABModel):
+    """
+    Upper confidence bound model with a bootstrapped bonus. The bootstrap is online: every replicate keeps a running Poisson(1)-weighted
+    mean of the penalties of its arm, so an update costs O(n_bootstrap) and memory stays constant however long the run.
+
+    Attributes:
+        sums (np.ndarray): Sum of the penalties of each arm, including the zero each arm starts with
+        counts (np.ndarray): Number of penalties of each arm, including the zero each arm starts with
+        replicate_sums (np.ndarray): Weighted penalty sum of each bootstrap replicate of each arm, shape (n_arms, n_bootstrap)
+        replicate_weights (np.ndarray): Total weight of each bootstrap replicate of each arm, shape (n_arms, n_bootstrap)
+        bootstrap_means (np.ndarray): Mean of each bootstrap replicate of each arm, shape (n_arms, n_bootstrap)
+    """
+
+    STATE_ATTRIBUTES = ('t', 'sums', 'counts', 'replicate_sums', 'replicate_weights', 'means', 'theta', 'n_pulls', 'bootstrap_means')
+
+    def __init__(self, **kwargs):
+        self.n_arms = kwargs.get('n_arms')
+        self.n_bootstrap = kwargs.get('n_bootstrap')
+        self.alpha = kwargs.get('alpha')
+        self.rng = kwargs.get('rng') or np.random.default_rng()
+
+        self.reset()
+
+    def reset(self):
+        self.t = 0
+
+        # Every arm starts out with a single penalty of 0, weighted once in every replicate
+        self.sums = np.zeros(self.n_arms)
+        self.counts = np.ones(self.n_arms)
+        self.replicate_sums = np.zeros((self.n_arms, self.n_bootstrap))
+        self.replicate_weights = np.ones((self.n_arms, self.n_bootstrap))
+
+        self.means = np.zeros(self.n_arms)
+        self.theta = np.zeros(self.n_arms)
+        self.n_pulls = np.zeros(self.n_arms)
+        self.bootstrap_means = np.zeros((self.n_arms, self.n_bootstrap))
+
+    def upper_quantile(self, q: float) -> np.ndarray:
+        """
+        Looks up the q-th quantile of the bootstrap means of every arm as an order statistic, partitioning rather than sorting.
+
+        Args:
+            q (float): The quantile, between 0 and 1
+
+        Returns:
+            np.ndarray: The quantile of each arm
+        """
+
+        k = min(self.n_bootstrap - 1, max(0, int(np.ceil(q * self.n_bootstrap)) - 1))
+        if (k == self.n_bootstrap - 1):
+            return self.bootstrap_means.max(axis=1)
+
+        return np.partition(self.bootstrap_means, k, axis=1)[:, k]
+
+    def select_arm(self, **kwargs):
+        if self.t < self.n_arms:
+            arm = self.t
+        else:
+            x = np.asarray(kwargs.get('variations'), dtype=float).reshape(self.n_arms)
+
+            upper_confidence_bounds = self.means * x + np.sqrt(self.alpha * np.log(self.t + 1) / self.n_pulls)
+            upper_confidence_bounds += self.upper_quantile(1 - 1 / (self.t + 1))
+
+            arm = np.argmax(upper_confidence_bounds)
+
+        self.t += 1
+        return arm
+
+    def select_arms(self, contexts):
+        x = np.asarray(contexts, dtype=float).reshape(-1, self.n_arms)
+        t = self.t + np.arange(len(x))
+
+        # Selections made in order, so the first arms are tried round robin and the bonus grows with each selection
+        with np.errstate(divide='ignore', invalid='ignore'):
+            upper_confidence_bounds = self.means * x + np.sqrt(self.alpha * np.log(t + 1)[:, None] / self.n_pulls)
+
+        # One partition finds the order statistic of every selection's quantile
+        ks = np.clip(np.ceil((1 - 1 / (t + 1)) * self.n_bootstrap).astype(int) - 1, 0, self.n_bootstrap - 1)
+        quantiles = np.partition(self.bootstrap_means, np.unique(ks), axis=1)[:, ks].T
+        upper_confidence_bounds += quantiles
+
+        arms = np.where(t < self.n_arms, t, upper_confidence_bounds.argmax(axis=1))
+
+        self.t += len(x)
+        return arms
+
+    def update(self, **kwargs):
+        arm = kwargs.get('arm')
+        penaltyVal = kwargs.get('penalty')
+
+        self.n_pulls[arm] += 1
+        self.sums[arm] += penaltyVal
+        self.counts[arm] += 1
+        self.means[arm] = self.sums[arm] / self.counts[arm]
+
+        # Online bootstrap: each replicate sees the new penalty a Poisson(1) number of times
+        weights = self.rng.poisson(1.0, self.n_bootstrap)
+        self.replicate_sums[arm] += weights * penaltyVal
+        self.replicate_weights[arm] += weights
+        self.bootstrap_means[arm] = self.replicate_sums[arm] / self.replicate_weights[arm]
+
+        self.theta[arm] = self.means[arm]
+
+    def update_batch(self, arms, x, penalties):
+        arms = np.asarray(arms, dtype=int)
+        penalties = np.asarray(penalties, dtype=float)
+        updated = np.unique(arms)
+
+        pulls = np.bincount(arms, minlength=self.n_arms)
+        self.n_pulls += pulls
+        self.sums += sum_by_arm(arms, penalties, self.n_arms)
+        self.counts += pulls
+        self.means[updated] = self.sums[updated] / self.counts[updated]
+
+        weights = self.rng.poisson(1.0, (len(arms), self.n_bootstrap))
+        self.replicate_sums += sum_by_arm(arms, weights * penalties[:, None], self.n_arms)
+        self.replicate_weights += sum_by_arm(arms, weights, self.n_arms)
+        self.bootstrap_means[updated] = self.replicate_sums[updated] / self.replicate_weights[updated]
+
+        self.theta[updated] = self.means[updated]
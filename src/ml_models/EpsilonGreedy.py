@@ -1,45 +1,59 @@
 import numpy as np
-import random
 
-from ml_models.MABModel import MABModel
+from ml_models.MABModel import MABModel, apply_affine_updates
+from ml_models.RandomBlock import RandomBlock
 
 
 class EpsilonGreedy(MABModel):
-    # theta = penalty calculator
+    STATE_ATTRIBUTES = ('theta',)
+
+    # theta = penalty calculator, one row of length d per arm
     def __init__(self, **kwargs):
         self.n_arms = kwargs.get('n_arms')
 
         # Epsilon is the probability with which an arm is selected.
         self.epsilon = kwargs.get('epsilon')
         self.d = kwargs.get('d')
+        self.rng = kwargs.get('rng') or np.random.default_rng()
+        self.random = RandomBlock(self.rng)
 
         # Intially all arms have the same penalties.
-        self.theta = [np.identity(self.d)] * self.n_arms
+        self.theta = np.ones((self.n_arms, self.d))
 
     # Selection of the arm happens using epsilon-greedy strategy
     def select_arm(self, **kwargs):
-        variations = kwargs.get('variations')
+        # Both numbers are always drawn so single and batched selections consume the random stream alike
+        explore = self.random.uniform() < self.epsilon
+        pick = self.random.uniform()
 
-        rand_val = random.uniform(0, 1)
-        if rand_val < self.epsilon:
+        if explore:
             # Explore: Choose a random arm with probability epsilon
-            return np.random.randint(0, len(self.theta))
-        else:
-            # Exploit: Choose the arm with the highest estimated value
-            theta = [0] * self.n_arms
-            for i in range(self.n_arms):
-                x = np.array(variations[i]).reshape(-1, 1)
-                theta[i] = np.dot(self.theta[i].T, x)
-            
-            return np.argmax(theta)
+            return int(pick * self.n_arms)
+
+        # Exploit: Choose the arm with the highest estimated value
+        x = np.asarray(kwargs.get('variations'), dtype=float).reshape(self.n_arms, self.d)
+        return np.einsum('ad,ad->a', self.theta, x).argmax()
 
     # Updating of values happens using penalty values
-    # 
     def update(self, **kwargs):
         """
         Method takes as input the index of the arm that was played and the observed penalty, and updates the estimated value of that arm using the formula for a sample mean."""
         arm = kwargs.get('arm')
         penalty = kwargs.get('penalty')
 
-        self.theta[arm] = self.theta[arm] + \
-            ((penalty - self.theta[arm]) / (penalty + 1))
+        self.theta[arm] += (penalty - self.theta[arm]) / (penalty + 1)
+
+    def select_arms(self, contexts):
+        x = np.asarray(contexts, dtype=float).reshape(-1, self.n_arms, self.d)
+
+        (explore, pick) = self.random.uniforms(2 * len(x)).reshape(len(x), 2).T
+        random_arms = (pick * self.n_arms).astype(int)
+
+        return np.where(explore < self.epsilon, random_arms, np.einsum('ad,bad->ba', self.theta, x).argmax(axis=1))
+
+    def update_batch(self, arms, x, penalties):
+        penalties = np.asarray(penalties, dtype=float)
+
+        # theta + (penalty - theta) / (penalty + 1) is theta * penalty / (penalty + 1) + penalty / (penalty + 1)
+        weights = penalties / (penalties + 1)
+        apply_affine_updates(self.theta, np.asarray(arms, dtype=int), weights, weights)
@@ -0,0 +1,127 @@
+import numpy as np
+
+from ml_models.MABModel import MABModel, sum_by_arm
+
+def _cholesky_update(L: np.ndarray, x: np.ndarray):
+    """
+    Updates the lower Cholesky factor L of B in place so that it becomes the factor of B + xxᵀ, in O(d²).
+
+    Args:
+        L (np.ndarray): Lower triangular factor of shape (d, d)
+        x (np.ndarray): The rank-one update vector of shape (d,)
+    """
+
+    x = x.copy()
+    for k in range(len(x)):
+        r = np.hypot(L[k, k], x[k])
+        (c, s) = (r / L[k, k], x[k] / L[k, k])
+        L[k, k] = r
+        L[k + 1:, k] = (L[k + 1:, k] + s * x[k + 1:]) / c
+        x[k + 1:] = c * x[k + 1:] - s * L[k + 1:, k]
+
+def _solve_lower(L: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Solves L z = y by forward substitution for a stack of lower triangular matrices at once.
+
+    Args:
+        L (np.ndarray): Lower triangular matrices of shape (..., d, d)
+        y (np.ndarray): Right hand sides of shape (..., d)
+
+    Returns:
+        np.ndarray: The solutions z of shape (..., d)
+    """
+
+    z = np.empty_like(y)
+    for k in range(y.shape[-1]):
+        z[..., k] = (y[..., k] - np.einsum('...j,...j->...', L[..., k, :k], z[..., :k])) / L[..., k, k]
+
+    return z
+
+def _solve_upper_transposed(L: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Solves Lᵀ z = y by back substitution for a stack of lower triangular matrices at once.
+
+    Args:
+        L (np.ndarray): Lower triangular matrices of shape (..., d, d)
+        y (np.ndarray): Right hand sides of shape (..., d)
+
+    Returns:
+        np.ndarray: The solutions z of shape (..., d)
+    """
+
+    z = np.empty_like(y)
+    for k in reversed(range(y.shape[-1])):
+        z[..., k] = (y[..., k] - np.einsum('...j,...j->...', L[..., k + 1:, k], z[..., k + 1:])) / L[..., k, k]
+
+    return z
+
+class LinearThompsonSampling(MABModel):
+    """
+    Linear Thompson sampling model with a Gaussian posterior over the penalty coefficients of each arm. The posterior precision of
+    every arm is held as a stacked Cholesky factor that is updated in rank one, and the samples of all arms are drawn together with one
+    batched triangular solve.
+
+    Attributes:
+        L (np.ndarray): Lower Cholesky factor of the posterior precision I + Σxxᵀ of each arm, shape (n_arms, d, d)
+        b (np.ndarray): Negated penalty-weighted sum of the contexts of each arm, as in the original model, shape (n_arms, d)
+        theta (np.ndarray): Posterior mean penalty coefficients of each arm, shape (n_arms, d)
+        rng (np.random.Generator): The default random number generator used for posterior samples
+    """
+
+    STATE_ATTRIBUTES = ('L', 'b', 'theta')
+
+    def __init__(self, **kwargs):
+        self.n_arms = kwargs.get('n_arms')
+        self.d = kwargs.get('d')
+        self.ideal_distance = kwargs.get('ideal_distance')
+        self.rng = kwargs.get('rng') or np.random.default_rng()
+
+        self.L = np.tile(np.identity(self.d), (self.n_arms, 1, 1))
+        self.b = np.zeros((self.n_arms, self.d))
+        self.theta = np.zeros((self.n_arms, self.d))
+
+    def select_arm(self, **kwargs):
+        # One context row of length d per arm. A generator passed here takes the place of the model's own.
+        x = np.asarray(kwargs.get('variations'), dtype=float).reshape(self.n_arms, self.d)
+        rng = kwargs.get('rng') or self.rng
+
+        # theta ~ N(mean, B⁻¹) with B = L Lᵀ is mean + L⁻ᵀ z for standard normal z
+        z = rng.standard_normal((self.n_arms, self.d))
+        theta = self.theta + _solve_upper_transposed(self.L, z)
+
+        # Select the arm with the largest sampled penalty magnitude
+        return np.argmax(np.abs(np.einsum('ad,ad->a', theta, x)))
+
+    def update(self, **kwargs):
+        arm = kwargs.get('arm')
+        x = np.asarray(kwargs.get('x'), dtype=float).reshape(self.d)
+        penalty = kwargs.get('penalty')
+
+        _cholesky_update(self.L[arm], x)
+        self.b[arm] -= penalty * x
+
+        # Posterior mean B⁻¹b from two triangular solves
+        self.theta[arm] = _solve_upper_transposed(self.L[arm], _solve_lower(self.L[arm], self.b[arm]))
+
+    def select_arms(self, contexts, rng: np.random.Generator = None):
+        x = np.asarray(contexts, dtype=float).reshape(-1, self.n_arms, self.d)
+        rng = rng or self.rng
+
+        # An independent posterior sample of every arm for every context
+        z = rng.standard_normal(x.shape)
+        theta = self.theta + _solve_upper_transposed(self.L, z)
+
+        return np.abs(np.einsum('bad,bad->ba', theta, x)).argmax(axis=1)
+
+    def update_batch(self, arms, x, penalties):
+        arms = np.asarray(arms, dtype=int)
+        x = np.asarray(x, dtype=float).reshape(len(arms), self.d)
+        penalties = np.asarray(penalties, dtype=float)
+
+        # Add every observation to the precision of its arm, then refactor the updated arms in one batched call
+        updated = np.unique(arms)
+        precision = self.L @ self.L.transpose(0, 2, 1) + sum_by_arm(arms, np.einsum('bd,be->bde', x, x), self.n_arms)
+        self.L[updated] = np.linalg.cholesky(precision[updated])
+
+        self.b -= sum_by_arm(arms, penalties[:, None] * x, self.n_arms)
+        self.theta[updated] = _solve_upper_transposed(self.L[updated], _solve_lower(self.L[updated], self.b[updated]))
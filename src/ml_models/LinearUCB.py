@@ -0,0 +1,76 @@
+import numpy as np
+
+from ml_models.MABModel import MABModel, sum_by_arm
+
+class LinearUCB(MABModel):
+    """
+    Linear upper confidence bound model. The per-arm state is stacked into arrays so every arm is scored at once, and the inverse
+    design matrix of each arm is kept up to date with rank-one Sherman–Morrison updates instead of being inverted every step.
+
+    Attributes:
+        A (np.ndarray): Design matrix I + Σxxᵀ of each arm, shape (n_arms, d, d)
+        A_inv (np.ndarray): Inverse design matrix of each arm, shape (n_arms, d, d)
+        b (np.ndarray): Penalty-weighted sum of the contexts of each arm, shape (n_arms, d)
+        theta (np.ndarray): Estimated penalty coefficients of each arm, shape (n_arms, d)
+    """
+
+    STATE_ATTRIBUTES = ('A', 'A_inv', 'b', 'theta')
+
+    def __init__(self, **kwargs):
+        self.n_arms = kwargs.get('n_arms')
+        self.d = kwargs.get('d')
+        self.alpha = kwargs.get('alpha')
+        self.ideal_distance = kwargs.get('ideal_distance')
+
+        self.A = np.tile(np.identity(self.d), (self.n_arms, 1, 1))
+        self.A_inv = np.tile(np.identity(self.d), (self.n_arms, 1, 1))
+        self.b = np.zeros((self.n_arms, self.d))
+        self.theta = np.zeros((self.n_arms, self.d))
+
+    def select_arm(self, **kwargs):
+        # One context row of length d per arm
+        x = np.asarray(kwargs.get('variations'), dtype=float).reshape(self.n_arms, self.d)
+
+        # Upper confidence bound of each arm: theta·x + alpha * sqrt(xᵀ A⁻¹ x)
+        estimates = np.einsum('ad,ad->a', self.theta, x)
+        widths = np.sqrt(np.einsum('ad,ade,ae->a', x, self.A_inv, x))
+        ucb = estimates + self.alpha * widths
+
+        # Select the arm with the highest upper confidence bound
+        return np.argmax(ucb)
+
+    def update(self, **kwargs):
+        arm = kwargs.get('arm')
+        x = np.asarray(kwargs.get('x'), dtype=float).reshape(self.d)
+        penalty = kwargs.get('penalty')
+
+        self.A[arm] += np.outer(x, x)
+
+        # Sherman–Morrison: (A + xxᵀ)⁻¹ = A⁻¹ - (A⁻¹x)(A⁻¹x)ᵀ / (1 + xᵀA⁻¹x), A⁻¹ being symmetric
+        A_inv = self.A_inv[arm]
+        A_inv_x = A_inv @ x
+        A_inv -= np.outer(A_inv_x, A_inv_x) / (1.0 + x @ A_inv_x)
+
+        self.b[arm] += penalty * x # Subtraction changed to addition
+        self.theta[arm] = A_inv @ self.b[arm]
+
+    def select_arms(self, contexts):
+        x = np.asarray(contexts, dtype=float).reshape(-1, self.n_arms, self.d)
+
+        estimates = np.einsum('ad,bad->ba', self.theta, x)
+        widths = np.sqrt(np.einsum('bad,ade,bae->ba', x, self.A_inv, x))
+
+        return (estimates + self.alpha * widths).argmax(axis=1)
+
+    def update_batch(self, arms, x, penalties):
+        arms = np.asarray(arms, dtype=int)
+        x = np.asarray(x, dtype=float).reshape(len(arms), self.d)
+        penalties = np.asarray(penalties, dtype=float)
+
+        self.A += sum_by_arm(arms, np.einsum('bd,be->bde', x, x), self.n_arms)
+        self.b += sum_by_arm(arms, penalties[:, None] * x, self.n_arms)
+
+        # A whole batch can hold far more rows than d, so each updated arm's inverse is recomputed once in a batched call
+        updated = np.unique(arms)
+        self.A_inv[updated] = np.linalg.inv(self.A[updated])
+        self.theta[updated] = np.einsum('ade,ae->ad', self.A_inv[updated], self.b[updated])
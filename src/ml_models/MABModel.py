@@ -1,7 +1,60 @@
+import numpy as np
+
 from abc import ABC, abstractmethod
 
+def apply_affine_updates(values: np.ndarray, arms: np.ndarray, scales: np.ndarray, offsets: np.ndarray):
+    """
+    Applies a sequence of per-arm updates of the form value[arm] = scale * value[arm] + offset in place, with the same result as applying
+    them one at a time in order. The updates of each arm are composed with a reversed cumulative product rather than a loop.
+
+    Args:
+        values (np.ndarray): The per-arm values of shape (n_arms, ...)
+        arms (np.ndarray): The arm of each update, shape (B,)
+        scales (np.ndarray): The scale of each update, shape (B,)
+        offsets (np.ndarray): The offset of each update, shape (B,)
+    """
+
+    for arm in np.unique(arms):
+        rows = (arms == arm)
+        (scale, offset) = (scales[rows], offsets[rows])
+
+        # Product of the scales of every later update to the same arm
+        later_scales = np.append(np.cumprod(scale[::-1])[::-1][1:], 1.0)
+
+        values[arm] = values[arm] * np.prod(scale) + np.dot(offset, later_scales)
+
+def sum_by_arm(arms: np.ndarray, values: np.ndarray, n_arms: int) -> np.ndarray:
+    """
+    Sums the rows of values that belong to each arm with a single matrix product, which unlike np.add.at stays fast for large batches.
+
+    Args:
+        arms (np.ndarray): The arm of each row, shape (B,)
+        values (np.ndarray): The values to sum, shape (B, ...)
+        n_arms (int): The number of arms
+
+    Returns:
+        np.ndarray: The sum of the rows of each arm, shape (n_arms, ...)
+    """
+
+    values = np.asarray(values, dtype=float)
+    one_hot = (arms[None, :] == np.arange(n_arms)[:, None]).astype(float)
+
+    return (one_hot @ values.reshape(len(arms), -1)).reshape((n_arms,) + values.shape[1:])
+
 class MABModel(ABC):
-    
+    """
+    Base class of the MAB models.
+
+    Attributes:
+        STATE_FORMAT (str): Identifies a model state file
+        STATE_VERSION (int): The version of the model state file layout. Files of any other version are rejected.
+        STATE_ATTRIBUTES (tuple): The names of the attributes holding everything a model has learned, saved by save_state
+    """
+
+    STATE_FORMAT = 'mabel-model-state'
+    STATE_VERSION = 1
+    STATE_ATTRIBUTES = ()
+
     @abstractmethod
     def select_arm(**kwargs):
         """
@@ -20,4 +73,88 @@ class MABModel(ABC):
         Args:
             **kwargs: The information given to the model to update itself. May include the arm that was selected, the reading of the sensor whose arm was selected, and the penalty incurred by the selected arm
         """
-        pass
\ No newline at end of file
+        pass
+
+    def select_arms(self, contexts: np.ndarray) -> np.ndarray:
+        """
+        Selects an arm for each of a batch of contexts, all against the current state of the model. Implementations override this with
+        array operations; the default calls select_arm once per context.
+
+        Args:
+            contexts (np.ndarray): The context of every arm for each selection, shape (B, n_arms, d) or (B, n_arms) when d is 1
+
+        Returns:
+            np.ndarray: The selected arm for each context, shape (B,)
+        """
+
+        return np.array([self.select_arm(variations=context) for context in np.asarray(contexts)], dtype=int)
+
+    def update_batch(self, arms: np.ndarray, x: np.ndarray, penalties: np.ndarray):
+        """
+        Updates the model with a batch of observations, with the same result as calling update for each of them in order.
+        Implementations override this with array operations; the default calls update once per observation.
+
+        Args:
+            arms (np.ndarray): The selected arm of each observation, shape (B,)
+            x (np.ndarray): The context of the selected arm of each observation, shape (B, d) or (B,) when d is 1
+            penalties (np.ndarray): The penalty incurred by each observation, shape (B,)
+        """
+
+        for (arm, context, penalty) in zip(arms, x, penalties):
+            self.update(arm=arm, x=context, penalty=penalty)
+
+    def save_state(self, path: str):
+        """
+        Saves everything the model has learned to a compressed .npz file, headed by the format, version and model class.
+
+        Args:
+            path (str): The file to write
+        """
+
+        state = {name: np.asarray(getattr(self, name)) for name in self.STATE_ATTRIBUTES}
+
+        with open(path, 'wb') as file:
+            np.savez_compressed(
+                file,
+                __format__=MABModel.STATE_FORMAT,
+                __version__=MABModel.STATE_VERSION,
+                __model__=self.__class__.__name__,
+                **state)
+
+    def load_state(self, path: str):
+        """
+        Restores what the model has learned from a file written by save_state. The model must be of the same class and have the
+        same number of arms and dimensions as the one that was saved.
+
+        Args:
+            path (str): The file to read
+
+        Returns:
+            MABModel: The model itself
+        """
+
+        with np.load(path, allow_pickle=False) as data:
+            if ('__format__' not in data) or (str(data['__format__']) != MABModel.STATE_FORMAT):
+                raise ValueError(f"'{path}' is not a model state file")
+
+            if (int(data['__version__']) != MABModel.STATE_VERSION):
+                raise ValueError(f"'{path}' has state version {int(data['__version__'])}, expected {MABModel.STATE_VERSION}")
+
+            if (str(data['__model__']) != self.__class__.__name__):
+                raise ValueError(f"'{path}' holds the state of {data['__model__']}, not {self.__class__.__name__}")
+
+            for name in self.STATE_ATTRIBUTES:
+                current = getattr(self, name)
+                value = data[name]
+
+                if (not isinstance(current, np.ndarray)):
+                    setattr(self, name, type(current)(value))
+                    continue
+
+                if (value.shape != current.shape):
+                    raise ValueError(f"'{path}' has {name} of shape {value.shape}, expected {current.shape}")
+
+                # Copied in place so attributes sharing an array stay shared
+                current[...] = value
+
+        return self
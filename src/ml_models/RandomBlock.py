@@ -0,0 +1,67 @@
+import numpy as np
+
+class RandomBlock:
+    """
+    Hands out uniform random numbers one at a time from blocks drawn ahead from a generator, so models that need a number or two per
+    step don't pay for a generator call each time. Blocks are drawn lazily on first use.
+
+    Attributes:
+        rng (np.random.Generator): The generator the blocks are drawn from
+        size (int): The number of values drawn per block
+        values (np.ndarray): The current block
+        position (int): The index of the next unused value in the block
+    """
+
+    def __init__(self, rng: np.random.Generator, size: int = 1024):
+        """
+        Initializes the random block.
+
+        Args:
+            rng (np.random.Generator): The generator the blocks are drawn from
+            size (int): The number of values drawn per block
+        """
+
+        self.rng = rng
+        self.size = size
+        self.values = np.empty(0)
+        self.position = 0
+
+    def uniform(self) -> float:
+        """
+        Gets the next uniform random number in [0, 1).
+
+        Returns:
+            float: The random number
+        """
+
+        if (self.position >= len(self.values)):
+            self.values = self.rng.random(self.size)
+            self.position = 0
+
+        value = self.values[self.position]
+        self.position += 1
+        return value
+
+    def uniforms(self, n: int) -> np.ndarray:
+        """
+        Gets the next n uniform random numbers in [0, 1), in the same order uniform would hand them out.
+
+        Args:
+            n (int): The number of random numbers
+
+        Returns:
+            np.ndarray: The random numbers
+        """
+
+        values = np.empty(n)
+        filled = 0
+        while (filled < n):
+            if (self.position >= len(self.values)):
+                self.values = self.rng.random(self.size)
+                self.position = 0
+
+            taken = min(n - filled, len(self.values) - self.position)
+            values[filled:filled + taken] = self.values[self.position:self.position + taken]
+            (filled, self.position) = (filled + taken, self.position + taken)
+
+        return values
@@ -1,44 +1,63 @@
-from functools import reduce
 import numpy as np
-import random
 
-from ml_models.MABModel import MABModel
+from ml_models.MABModel import MABModel, apply_affine_updates
+from ml_models.RandomBlock import RandomBlock
 
 
 class SoftmaxExplorer(MABModel):
+    # theta is the same array as values
+    STATE_ATTRIBUTES = ('n_updates', 'values')
+
     def __init__(self, **kwargs):
         self.n_arms = kwargs.get('n_arms')
         self.d = kwargs.get('d')
 
-        # Epsilon is the probability with which an arm is selected.
+        # Epsilon is the temperature of the softmax
         self.epsilon = kwargs.get('epsilon')
-        self.counts = [np.zeros(self.d)] * self.n_arms
+        self.rng = kwargs.get('rng') or np.random.default_rng()
+        self.random = RandomBlock(self.rng)
+
+        # The step size of the value updates decays with the number of updates to any arm
+        self.n_updates = 0
 
         # Intially all arms have the same penalties.
-        self.values = [np.ones(self.d)] * self.n_arms
+        self.values = np.ones((self.n_arms, self.d))
         self.theta = self.values
 
     def select_arm(self, **kwargs):
-        variations = kwargs.get('variations')
+        x = np.asarray(kwargs.get('variations'), dtype=float).reshape(self.n_arms, self.d)
 
-        z = np.sum(np.exp([np.dot(x, variations[i]) // self.epsilon for i, x in enumerate(self.values)]))
-        probs = np.exp([np.dot(x, variations[i]) // self.epsilon for i, x in enumerate(self.values)]) / z
+        # Softmax through log-sum-exp: shifting by the largest logit keeps every exponential in (0, 1]
+        logits = np.einsum('ad,ad->a', self.values, x) // self.epsilon
+        cumulative = np.exp(logits - logits.max()).cumsum()
 
-        flattenedArr = []
-        for item in probs:
-            for val in item:
-                flattenedArr.append(val)
-            
-        return np.random.choice(self.n_arms, p=flattenedArr)
+        # Inverse CDF sample with a single uniform
+        arm = cumulative.searchsorted(self.random.uniform() * cumulative[-1], side='right')
+        return min(arm, self.n_arms - 1)
 
     def update(self, **kwargs):
         arm = kwargs.get('arm')
         penalty = kwargs.get('penalty')
 
-        self.counts[arm] += 1
-        n = self.counts[arm]
-        value = self.values[arm]
-        new_value = ((n - 1) / n) * value + (1 / n) * penalty
-        self.values[arm] = new_value
-        
-        self.theta = self.values
+        self.n_updates += 1
+        n = self.n_updates
+        self.values[arm] = ((n - 1) / n) * self.values[arm] + (1 / n) * penalty
+
+    def select_arms(self, contexts):
+        x = np.asarray(contexts, dtype=float).reshape(-1, self.n_arms, self.d)
+
+        logits = np.einsum('ad,bad->ba', self.values, x) // self.epsilon
+        cumulative = np.exp(logits - logits.max(axis=1, keepdims=True)).cumsum(axis=1)
+
+        thresholds = self.random.uniforms(len(x)) * cumulative[:, -1]
+        arms = (cumulative <= thresholds[:, None]).sum(axis=1)
+        return np.minimum(arms, self.n_arms - 1)
+
+    def update_batch(self, arms, x, penalties):
+        penalties = np.asarray(penalties, dtype=float)
+
+        # The step count keeps increasing through the batch, as it would over single updates
+        n = self.n_updates + np.arange(1, len(penalties) + 1)
+        apply_affine_updates(self.values, np.asarray(arms, dtype=int), (n - 1) / n, penalties / n)
+
+        self.n_updates += len(penalties)
@@ -1,35 +1,36 @@
+import math
 import numpy as np
-from ml_models.MABModel import MABModel
+from ml_models.MABModel import MABModel, sum_by_arm
 
 """Seeks to minimize penalty"""
 class UCB1_Normal_Penalized(MABModel):
+    STATE_ATTRIBUTES = ('total_selections', 'total_penalty', 'theta', 'num_selections')
+
     def __init__(self, **kwargs):
         self.n_arms = kwargs.get('n_arms')
         self.d = kwargs.get('d')
         self.ideal_distance = kwargs.get('ideal_distance')
-        
+
+        # Every arm starts with one pseudo-selection of penalty 1
         self.total_selections = 0
-        self.total_penalty = [np.identity(self.d)] * self.n_arms
-        self.theta = [np.identity(self.d)] * self.n_arms
-        self.num_selections = [np.identity(self.d)] * self.n_arms
+        self.total_penalty = np.ones((self.n_arms, self.d))
+        self.theta = np.ones((self.n_arms, self.d))
+        self.num_selections = np.ones(self.n_arms)
 
     def select_arm(self, **kwargs):
         """
         Choose the arm with the highest UCB val based on the current estimates of the mean reward and variance.
         """
-        variations = kwargs.get('variations')
 
         # Try each arm
         if self.total_selections < self.n_arms:
             arm = self.total_selections
         else:
             #  Then calculate UCB value for each arm and choose the arm with the smallest penalty
-            ucb_values = []
-            for i in range(self.n_arms):
-                x = np.array(variations[i]).reshape(-1, 1)
-                ucb_values.append(np.dot(self.theta[i].T, x) - np.sqrt(2 * np.log(self.total_selections) / self.num_selections[i]))
-            arm = np.argmax(ucb_values)
-        
+            x = np.asarray(kwargs.get('variations'), dtype=float).reshape(self.n_arms, self.d)
+            ucb_values = np.einsum('ad,ad->a', self.theta, x) - np.sqrt(2 * math.log(self.total_selections) / self.num_selections)
+            arm = ucb_values.argmax()
+
         self.total_selections += 1
         return arm
 
@@ -40,7 +41,27 @@ class UCB1_Normal_Penalized(MABModel):
         arm = kwargs.get('arm')
         penalty = kwargs.get('penalty')
 
-        self.num_selections[arm] = self.num_selections[arm] + 1
-        self.total_penalty[arm] = self.total_penalty[arm] + penalty
+        self.num_selections[arm] += 1
+        self.total_penalty[arm] += penalty
         self.theta[arm] = self.total_penalty[arm] / self.num_selections[arm]
-        
\ No newline at end of file
+
+    def select_arms(self, contexts):
+        x = np.asarray(contexts, dtype=float).reshape(-1, self.n_arms, self.d)
+        t = self.total_selections + np.arange(len(x))
+
+        # Selections made in order, so the first arms are tried round robin
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ucb_values = np.einsum('ad,bad->ba', self.theta, x) - np.sqrt(2 * np.log(t)[:, None] / self.num_selections)
+
+        arms = np.where(t < self.n_arms, t, ucb_values.argmax(axis=1))
+
+        self.total_selections += len(x)
+        return arms
+
+    def update_batch(self, arms, x, penalties):
+        arms = np.asarray(arms, dtype=int)
+        updated = np.unique(arms)
+
+        self.num_selections += np.bincount(arms, minlength=self.n_arms)
+        self.total_penalty += sum_by_arm(arms, np.asarray(penalties, dtype=float)[:, None], self.n_arms)
+        self.theta[updated] = self.total_penalty[updated] / self.num_selections[updated, None]
@@ -0,0 +1,148 @@
+import json, zipfile
+import numpy as np
+
+from recording.RecordSink import RecordSink, TRAJECTORY_FIELDS
+
+from subject.Fleet import Fleet
+
+class ColumnarFileSink(RecordSink):
+    """
+    Writes the records of a run to an NPZ file column by column. Rows are buffered in preallocated arrays and appended to the file one
+    chunk per column at a time, so memory stays constant however long the run is.
+
+    The file holds one 'column/chunk.npy' entry per column and chunk, plus a 'header.json' entry with the description of the run, its
+    crashes and its final metrics. Read it back with read_columnar_run, or open the chunks directly with np.load.
+
+    Attributes:
+        path (str): The path of the NPZ file
+        chunk_size (int): The number of iterations buffered before a chunk is written
+        compress (bool): Whether chunks are deflate-compressed, trading write speed for file size
+        file (zipfile.ZipFile): The open NPZ file
+        header (dict): The description of the run
+        buffers (dict): The preallocated buffer of each column
+        rows (int): The number of rows in the buffers
+        chunks (int): The number of chunks written
+        crashes (list): The (iteration, ACV index, ACV index) triple of every crash
+    """
+
+    def __init__(self, path: str, chunk_size: int = 4096, compress: bool = False):
+        """
+        Initializes the sink. The file is created when the run starts.
+
+        Args:
+            path (str): The path of the NPZ file
+            chunk_size (int): The number of iterations buffered before a chunk is written
+            compress (bool): Whether chunks are deflate-compressed, trading write speed for file size
+        """
+
+        self.path = path
+        self.chunk_size = chunk_size
+        self.compress = compress
+
+        self.file = None
+        self.header = None
+        self.buffers = None
+        self.rows = 0
+        self.chunks = 0
+        self.crashes = list()
+
+    def open(self, header: dict):
+        """
+        Creates the file and the column buffers.
+
+        Args:
+            header (dict): The description of the run (see RecordSink.open)
+        """
+
+        self.header = header
+        self.file = zipfile.ZipFile(self.path, 'w', zipfile.ZIP_DEFLATED if self.compress else zipfile.ZIP_STORED, allowZip64=True)
+
+        num_acvs = header['num_acvs']
+        self.buffers = {field: np.empty((self.chunk_size, num_acvs)) for field in TRAJECTORY_FIELDS}
+        self.buffers['iteration'] = np.empty(self.chunk_size, dtype=np.int64)
+        self.buffers['ignoring'] = np.empty((self.chunk_size, num_acvs), dtype=bool)
+
+    def record(self, iteration: int, acvs: Fleet, ignoring: list, crashes: list):
+        """
+        Copies the state of the fleet into the next row of the buffers, writing a chunk once they are full.
+
+        Args:
+            iteration (int): The iteration
+            acvs (Fleet): The fleet of ACVs
+            ignoring (list): The indexes of the ACVs ignoring their distance sensor this iteration
+            crashes (list): The (ACV index, ACV index) pairs that crashed this iteration
+        """
+
+        row = self.rows
+        buffers = self.buffers
+
+        buffers['iteration'][row] = iteration
+        for field in TRAJECTORY_FIELDS:
+            buffers[field][row] = getattr(acvs, field)
+
+        buffers['ignoring'][row] = False
+        buffers['ignoring'][row, ignoring] = True
+
+        self.crashes.extend((iteration, first, second) for (first, second) in crashes)
+
+        self.rows += 1
+        if (self.rows == self.chunk_size):
+            self.flush()
+
+    def flush(self):
+        """Appends the buffered rows to the file as one chunk per column."""
+
+        if (self.rows == 0):
+            return
+
+        for (column, buffer) in self.buffers.items():
+            with self.file.open(f'{column}/{self.chunks:06d}.npy', 'w', force_zip64=True) as entry:
+                np.lib.format.write_array(entry, buffer[:self.rows], allow_pickle=False)
+
+        self.chunks += 1
+        self.rows = 0
+
+    def close(self, metrics: dict):
+        """
+        Writes the remaining rows and the header, and closes the file.
+
+        Args:
+            metrics (dict): The final metrics of the run (see Logger.calculate_metrics)
+        """
+
+        self.flush()
+
+        header = dict(self.header)
+        header['faults'] = self.header['faults'].to_list()
+        header['crashes'] = [[int(value) for value in crash] for crash in self.crashes]
+        header['metrics'] = metrics
+        header['chunks'] = self.chunks
+
+        self.file.writestr('header.json', json.dumps(header))
+        self.file.close()
+
+def read_columnar_run(path: str) -> dict:
+    """
+    Reads a run written by ColumnarFileSink.
+
+    Args:
+        path (str): The path of the NPZ file
+
+    Returns:
+        dict: The 'header' of the run (see ColumnarFileSink.close), and the 'iteration', 'ignoring' and TRAJECTORY_FIELDS columns as
+            arrays with one row per recorded iteration
+    """
+
+    with zipfile.ZipFile(path) as file:
+        header = json.loads(file.read('header.json'))
+        run = {'header': header}
+
+        for column in ('iteration', 'ignoring') + TRAJECTORY_FIELDS:
+            chunks = list()
+            for chunk in range(header['chunks']):
+                with file.open(f'{column}/{chunk:06d}.npy') as entry:
+                    chunks.append(np.lib.format.read_array(entry, allow_pickle=False))
+
+            run[column] = np.concatenate(chunks)
+
+    return run
@@ -0,0 +1,176 @@
+import json, threading, zipfile
+import numpy as np
+
+from collections import OrderedDict
+
+from recording.Trajectory import Trajectory, column_dtypes, header_file
+
+class ChunkedColumn:
+    """
+    A column of a run recorded by ColumnarFileSink, read a chunk at a time. Slicing it reads only the chunks the slice covers, and
+    the most recently read chunks are kept so playing through a run reads each chunk once.
+
+    Attributes:
+        file (zipfile.ZipFile): The open NPZ file
+        column (str): The name of the column
+        offsets (np.ndarray): The first row of each chunk, followed by the number of rows
+        shape (tuple): The shape of the whole column
+        dtype (np.dtype): The data type of the column
+        cache_chunks (int): The number of chunks kept in memory
+        cache (OrderedDict): The chunks kept in memory, least recently used first
+        lock (threading.Lock): Guards the cache, since the visualizer serves requests from several threads
+    """
+
+    def __init__(self, file: zipfile.ZipFile, column: str, chunks: int, cache_chunks: int = 4):
+        """
+        Opens a column by reading the header of each of its chunks.
+
+        Args:
+            file (zipfile.ZipFile): The open NPZ file
+            column (str): The name of the column
+            chunks (int): The number of chunks in the file
+            cache_chunks (int): The number of chunks kept in memory
+        """
+
+        self.file = file
+        self.column = column
+        self.cache_chunks = max(1, cache_chunks)
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+        shapes = list()
+        for chunk in range(chunks):
+            with file.open(self.entry(chunk)) as entry:
+                version = np.lib.format.read_magic(entry)
+                read_header = np.lib.format.read_array_header_1_0 if (version == (1, 0)) else np.lib.format.read_array_header_2_0
+                (shape, _, self.dtype) = read_header(entry)
+                shapes.append(shape)
+
+        if (chunks == 0):
+            self.dtype = np.dtype(column_dtypes[column])
+
+        self.offsets = np.cumsum([0] + [shape[0] for shape in shapes])
+        self.shape = (int(self.offsets[-1]),) + (tuple(shapes[0][1:]) if shapes else ())
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, key) -> np.ndarray:
+        """
+        Reads rows of the column.
+
+        Args:
+            key (int or slice): The row or rows
+
+        Returns:
+            np.ndarray: The rows
+        """
+
+        if not isinstance(key, slice):
+            row = int(key) + (len(self) if (key < 0) else 0)
+            if not (0 <= row < len(self)):
+                raise IndexError(f"Row {key} is out of range for a column of {len(self)} rows")
+            return self[row:row + 1][0]
+
+        (start, stop, step) = key.indices(len(self))
+        if (step < 0):
+            return self[:][key]
+        if (start >= stop):
+            return np.empty((0,) + self.shape[1:], dtype=self.dtype)
+
+        # Chunks first to last - 1 cover rows start to stop - 1
+        first = int(np.searchsorted(self.offsets, start, side='right')) - 1
+        last = int(np.searchsorted(self.offsets, stop, side='left'))
+        parts = [self.read_chunk(chunk) for chunk in range(first, last)]
+
+        rows = np.concatenate(parts) if (len(parts) > 1) else parts[0]
+        base = int(self.offsets[first])
+
+        return rows[start - base:stop - base:step]
+
+    def __array__(self, dtype=None) -> np.ndarray:
+        rows = self[:]
+        return rows if (dtype is None) else rows.astype(dtype)
+
+    def entry(self, chunk: int) -> str:
+        """Gets the name of the NPZ entry holding a chunk."""
+
+        return f'{self.column}/{chunk:06d}.npy'
+
+    def read_chunk(self, chunk: int) -> np.ndarray:
+        """
+        Reads a chunk of the column, or takes it from the cache.
+
+        Args:
+            chunk (int): The index of the chunk
+
+        Returns:
+            np.ndarray: The rows of the chunk
+        """
+
+        with self.lock:
+            if chunk in self.cache:
+                self.cache.move_to_end(chunk)
+                return self.cache[chunk]
+
+        with self.file.open(self.entry(chunk)) as entry:
+            rows = np.lib.format.read_array(entry, allow_pickle=False)
+
+        with self.lock:
+            self.cache[chunk] = rows
+            while (len(self.cache) > self.cache_chunks):
+                self.cache.popitem(last=False)
+
+        return rows
+
+class ColumnarRun(Trajectory):
+    """
+    A run recorded by ColumnarFileSink, opened lazily. Opening it reads only the header, and each column is read a chunk at a time as
+    it is sliced, so a run of any length can be browsed without loading it (see Trajectory).
+
+    Attributes:
+        path (str): The path of the NPZ file
+        file (zipfile.ZipFile): The open NPZ file
+        header (dict): The description of the run: model name, config, fault schedule, crashes, final metrics and number of chunks
+        rows (int): The number of recorded iterations
+        columns (dict): The columns opened so far
+    """
+
+    def __init__(self, path: str):
+        """
+        Opens a recorded run.
+
+        Args:
+            path (str): The path of the NPZ file
+        """
+
+        self.path = path
+        self.file = zipfile.ZipFile(path)
+        self.header = json.loads(self.file.read(header_file))
+        self.columns = dict()
+
+        self.rows = len(self['iteration'])
+
+    def __getitem__(self, column: str) -> ChunkedColumn:
+        """
+        Gets a column of the run, read a chunk at a time.
+
+        Args:
+            column (str): 'iteration', 'ignoring' or one of TRAJECTORY_FIELDS
+
+        Returns:
+            ChunkedColumn: The column, one row per recorded iteration
+        """
+
+        if column not in column_dtypes:
+            raise KeyError(f"Unknown column '{column}'. Options are: {', '.join(column_dtypes)}")
+
+        if column not in self.columns:
+            self.columns[column] = ChunkedColumn(self.file, column, self.header['chunks'])
+
+        return self.columns[column]
+
+    def close(self):
+        """Closes the NPZ file."""
+
+        self.file.close()
@@ -0,0 +1,263 @@
+import itertools, colorama
+import numpy as np
+
+from config import Config
+from recording.RecordSink import RecordSink
+
+from subject.Fleet import Fleet
+from subject.FaultSchedule import FaultSchedule, describe_fault
+
+class ConsoleTableSink(RecordSink):
+    """
+    Prints a colorized table of every iteration to the console, and keeps the rounded records in memory for the visualizer.
+
+    Attributes:
+        config (Config): The simulation config
+        num_acvs (int): The number of ACVs
+        faults (FaultSchedule): The schedule of distance sensor faults of the run
+        model_name (str): The name of the MAB model of the run
+        column_width (int): The width of each column
+        iter_col_width (int): The width of the first column used as an interation tally
+        num_acv_columns (int): The number of columns used to represent each ACV (minus the lead ACV)
+        row_template (str): The template used to create a row in the table
+        acvs_ignoring_sensor (list): The ACVs ignoring their distance sensor in the iteration being printed
+        position_records (list): The rounded locations of each ACV for each iteration
+        speed_records (list): The rounded speeds of each ACV for each iteration
+        distance_records (list): The rounded distance sensor readings of each ACV for each iteration
+        ignore_records (list): The ACVs ignoring their distance sensor for each iteration
+        iteration_records (list): The iteration of each record
+        crash_records (list): The (iteration, crashes) pairs of each iteration with a crash
+    """
+
+    MODIFIED_DST_COLOR = colorama.Back.YELLOW
+    IGNORED_DST_COLOR = colorama.Back.GREEN
+    CRASH_COLOR = colorama.Back.RED
+    COLOR_RESET = colorama.Back.RESET
+
+    def __init__(self, config: Config):
+        """
+        Initializes the console table.
+
+        Args:
+            config (Config): The simulation config
+        """
+
+        colorama.init()
+
+        self.config = config
+        self.num_acvs = config.acvs.num_acvs
+        self.faults = FaultSchedule(config.simulation.iterations, [], [], [], [], [])
+        self.model_name = ''
+        self.column_width = 9    # Width of each column
+        self.iter_col_width = 4  # Iteration count column width
+
+        # 3 columns per ACV (distance, speed, location) minus lead ACV columns
+        self.num_acv_columns = (self.num_acvs - 1) * 3
+        self.row_template = self.get_row_template()
+
+        self.acvs_ignoring_sensor = list()
+
+        self.position_records = list()
+        self.speed_records = list()
+        self.distance_records = list()
+        self.crash_records = list()
+        self.ignore_records = list()
+        self.iteration_records = list()
+
+    def open(self, header: dict):
+        """
+        Prints the table header.
+
+        Args:
+            header (dict): The description of the run (see RecordSink.open)
+        """
+
+        self.model_name = header['model']
+        self.faults = header['faults']
+
+        self.print_table_header()
+
+    def record(self, iteration: int, acvs: Fleet, ignoring: list, crashes: list):
+        """
+        Keeps the rounded state of the fleet and prints it as a row of the table.
+
+        Args:
+            iteration (int): The iteration
+            acvs (Fleet): The fleet of ACVs
+            ignoring (list): The indexes of the ACVs ignoring their distance sensor this iteration
+            crashes (list): The (ACV index, ACV index) pairs that crashed this iteration
+        """
+
+        self.acvs_ignoring_sensor = ignoring
+        self.print_acv_locations(iteration, acvs, crashes)
+
+    def trajectory(self) -> tuple:
+        """
+        Gets the records kept in memory for the visualizer.
+
+        Returns:
+            tuple: The location, speed, distance, ignore and crash records and the iteration of each record (see start_visualizer)
+        """
+
+        ignore_masks = np.zeros((len(self.ignore_records), self.num_acvs), dtype=bool)
+        for (frame, ignoring) in enumerate(self.ignore_records):
+            ignore_masks[frame, ignoring] = True
+
+        return (self.position_records, self.speed_records, self.distance_records, ignore_masks, self.crash_records, self.iteration_records)
+
+    def get_row_template(self) -> str:
+        """
+        Creates the string template for a row in the outputted table
+
+        Returns:
+            str: The template for a row in the table
+        """
+
+        # Iteration column is 4 wide, each location/speed column is the same width. Format makes it so each ACV is divided by || and each individual column is divided by |
+        spacings = ['{:>{iter}}'] + ['{:^{width}}' for _ in range(self.num_acv_columns + 2)]    # +2 for lead ACV columns
+
+        table_template = [spacings[0] + "||" + spacings[1] + "|" + spacings[2]]     # Iter + lead ACV columns dividers
+        table_template += ["||" + "|".join(spacings[3*i:3*i+3]) for i in range(1, (self.num_acv_columns // 3) + 1)]  # All other ACV columns
+        table_template = "".join(table_template)
+
+        return table_template
+
+    def find_iteration_flags(self, iteration: int, crash_list: list, locations: list, distances: list) -> str:
+        """
+        Handles the logic necessary for distance modification and crash "flags," such as table cell coloring and text descriptors
+
+        Args:
+            iteration (int): The current iteration
+            crash_list (list): A list of crashes that occurred in the current iteration
+            locations (list): A list of locations for each ACV
+            distances (list): A list of distances for each ACV
+
+        Returns:
+            str: A string containing the flags for the current iteration to be displayed to the left of the table
+        """
+
+        flags = ""
+
+        # Handle distance modification
+        if (iteration in self.faults):
+            active_faults = self.faults.at(iteration)   # (acv_index, model, value) of each active fault
+
+            # Distance is colored green if the ACV is ignoring the distance sensor value, yellow otherwise
+            for acv_index in {fault[0] for fault in active_faults}:
+                distances[acv_index] = self.modify_cell_color(distances[acv_index], ConsoleTableSink.MODIFIED_DST_COLOR)
+
+            flags += ", ".join(["ACV" + str(acv_index) + " Dst " + describe_fault(model, value) for (acv_index, model, value) in active_faults])
+
+        # Handle crashes
+        if (crash_list != []):
+            for crash in crash_list:
+                locations[crash[0]] = self.modify_cell_color(locations[crash[0]], ConsoleTableSink.CRASH_COLOR)
+                locations[crash[1]] = self.modify_cell_color(locations[crash[1]], ConsoleTableSink.CRASH_COLOR)
+
+            separator = " : " if flags != "" else ""
+            flags += separator + "CRASH " + "".join(["(ACV" + str(crash[0]) + ", ACV" + str(crash[1]) + ")" for crash in crash_list])
+
+            self.crash_records.append((iteration, crash_list))
+
+        if (flags != ""):
+            flags = " <-- " + flags
+
+        return flags
+
+    def modify_cell_color(self, value, color) -> str:
+        """
+        Modifies the color of a cell in the table
+
+        Args:
+            value (str): The value to be modified
+            color (any): The color to change the cell to
+
+        Returns:
+            str: The colored cell
+        """
+        return str(ConsoleTableSink.COLOR_RESET + color + '{:^{width}}'.format(value, width=self.column_width) + ConsoleTableSink.COLOR_RESET)
+
+    def print_acv_locations(self, iteration: int, acvs: Fleet, crash_list: list):
+        """
+        Prints the locations of each ACV for a given iteration.
+
+        Args:
+            iteration (int): The current iteration.
+            acvs (Fleet): The fleet of ACVs
+            crash_list (list): A list of crashes that occurred in the current iteration.
+        """
+
+        # Get locations and speeds for each ACV
+        locations = np.round(acvs.locations, 2).tolist()
+        speeds = np.round(acvs.speeds, 2).tolist()
+        distances = np.round(acvs.distances, 2).tolist()
+        distances_copy = distances.copy()
+
+        self.position_records.append(locations.copy())
+        self.speed_records.append(speeds.copy())
+        self.ignore_records.append(self.acvs_ignoring_sensor.copy())
+        self.distance_records.append(distances.copy())
+        self.iteration_records.append(iteration)
+
+        # Get flags before computing the column aggregate so that cell highlighting can be applied
+        flags = self.find_iteration_flags(iteration, crash_list, locations, distances)
+
+        # Stop output if applicable only after data has been updated in records
+        if (not self.config.output.show_output_table):
+            return
+
+        # Color all cells which the ACV is ignoring green
+        for acv_index in self.acvs_ignoring_sensor:
+            distances[acv_index] = self.modify_cell_color(distances_copy[acv_index], ConsoleTableSink.IGNORED_DST_COLOR)
+
+        # Print index and alternating speed/location columns for the respective ACV (// is floor division)
+        lead_acv_col = [speeds[0], locations[0]]
+        trailing_acv_cols = list(itertools.chain.from_iterable([[distances[i], speeds[i], locations[i]] for i in range(1, self.num_acvs)]))
+        column_aggregate = self.row_template.format(iteration, *lead_acv_col, *trailing_acv_cols, iter=self.iter_col_width, width=self.column_width)
+
+        auto_output = self.config.output.automatic_output
+        end = '\n' if auto_output == True else ''
+        print(column_aggregate + flags, end=end)
+
+        if (auto_output == False):
+            input()
+
+    def print_table_header(self):
+        """Prints the table header"""
+
+        if (not self.config.output.show_output_table):
+            return
+
+        ideal_dist = self.config.acvs.ideal_distance
+        num_iterations = self.config.simulation.iterations
+        faults = self.faults
+
+        # Print out ideal distance and which iterations will be modified
+        print(self.config.output.major_divider)
+
+        print("• MAB Model: " + self.model_name)
+        print("• ACV Count: " + str(self.num_acvs))
+        print("• Ideal Distance: " + str(ideal_dist))
+        print("• Total Iterations: " + str(num_iterations))
+        print("• Iterations Being Modified: ",
+            *["\n   > Iter. " + str(start) + ("-" + str(start + duration - 1) if duration > 1 else "") + "\t(ACV" + str(acv) + ", " + describe_fault(model, value) + ")"
+            for (start, duration, acv, model, value) in zip(faults.starts, faults.durations, faults.acvs, faults.models, faults.values)])
+
+        print("\nPress enter to continue...")
+        input()
+
+        # Header for ACV index (ACV1, ACV2, etc.)
+        acv_headers = [''] + ['ACV' + str(index) for index in range(self.num_acvs)]
+
+        # Lead ACV column is 19 wide (2 6-wide columns + 1 1-character divider)
+        # All other ACV columns are 30 wide (3 5-wide columns + 2 1-character dividers)
+        acv_template = "||".join(['{:>{iter}}', '{:^{lead_acv}}'] + ['{:^{acv}}' for _ in range(self.num_acvs - 1)])
+        print(acv_template.format(*acv_headers, iter=self.iter_col_width, lead_acv=(self.column_width * 2 + 1), acv=(self.column_width * 3 + 2)))
+
+        # Headers for iteration index and alternating speed/location columns
+        detail_headers = ['Iter', 'Spd', 'Loc'] + [('Dst' if i % 3 == 0 else ('Spd' if i % 3 == 1 else 'Loc')) for i in range(self.num_acv_columns)]
+        print(self.row_template.format(*detail_headers, iter=self.iter_col_width, width=self.column_width))
+
+        # Print divider
+        print(self.row_template.replace(" ", "-").replace(":", ":-").replace("|", "+")
+            .format(*['', '', ''] + ['' for _ in range(self.num_acv_columns)], iter=self.iter_col_width, width=self.column_width))
@@ -0,0 +1,157 @@
+import numpy as np
+
+from collections import deque
+from types import SimpleNamespace
+
+from recording.RecordSink import RecordSink
+
+from subject.Fleet import Fleet
+
+class EventTriggeredSink(RecordSink):
+    """
+    A recording policy that keeps full resolution only around events and samples the rest of the run, passing the iterations it keeps
+    on to another sink. Events are the faults of the fault schedule, crashes, and iterations where an ACV ignores its sensor. Every
+    iteration within the window before and after an event is kept, as are every k-th iteration and the final iteration.
+
+    The penalty and regret fields of each record are running totals, so they stay exact at every kept iteration and the totals of
+    the run are always kept, however sparsely the rest is sampled.
+
+    Events are only acted on when they happen, so the last window of iterations is kept in a ring buffer and handed on once an event
+    occurs. Crashes outside the kept iterations are not passed on unless crashes are events, but the final metrics always count them.
+
+    Attributes:
+        sink (RecordSink): The sink the kept iterations are passed on to
+        window (int): The number of iterations kept before and after each event
+        every (int): The interval iterations are sampled at outside of event windows
+        events (tuple): The kinds of event that trigger full resolution: 'faults', 'crashes' and/or 'ignores'
+        faults (FaultSchedule): The fault schedule of the run, if faults are events. Tells the iterations with an active fault.
+        last_iteration (int): The final iteration of the run
+        keep_until (int): The last iteration in the window after the latest event
+        buffer (np.ndarray): Ring buffer of the fleet state of the last window iterations, shape (window, len(Fleet.FIELDS), number of ACVs)
+        buffered (deque): The (iteration, ignoring, crashes) of each buffered iteration not yet passed on, oldest first
+        kept (int): The number of iterations passed on
+    """
+
+    def __init__(self, sink: RecordSink, window: int = 10, every: int = 100, events: tuple = ('faults', 'crashes', 'ignores')):
+        """
+        Initializes the recording policy.
+
+        Args:
+            sink (RecordSink): The sink the kept iterations are passed on to
+            window (int): The number of iterations kept before and after each event
+            every (int): The interval iterations are sampled at outside of event windows
+            events (tuple): The kinds of event that trigger full resolution: 'faults', 'crashes' and/or 'ignores'
+        """
+
+        unknown = set(events) - {'faults', 'crashes', 'ignores'}
+        if unknown:
+            raise ValueError(f"Unknown recording events: {', '.join(sorted(unknown))}")
+
+        self.sink = sink
+        self.window = window
+        self.every = max(1, every)
+        self.events = tuple(events)
+
+        self.faults = set()
+        self.last_iteration = None
+        self.keep_until = -1
+        self.buffer = None
+        self.buffered = deque(maxlen=max(1, window))
+        self.kept = 0
+
+    def open(self, header: dict):
+        """
+        Starts recording a run, noting the policy in the header passed on.
+
+        Args:
+            header (dict): The description of the run (see RecordSink.open)
+        """
+
+        if 'faults' in self.events:
+            self.faults = header['faults']
+
+        self.last_iteration = header['iterations']
+        self.buffer = np.empty((max(1, self.window), len(Fleet.FIELDS), header['num_acvs']))
+
+        header = dict(header)
+        header['recording'] = {'policy': 'events', 'window': self.window, 'every': self.every, 'events': list(self.events)}
+        self.sink.open(header)
+
+    def record(self, iteration: int, acvs: Fleet, ignoring: list, crashes: list):
+        """
+        Passes the iteration on if it is kept, along with any buffered iterations in the window before a new event.
+
+        Args:
+            iteration (int): The iteration
+            acvs (Fleet): The fleet of ACVs
+            ignoring (list): The indexes of the ACVs ignoring their distance sensor this iteration
+            crashes (list): The (ACV index, ACV index) pairs that crashed this iteration
+        """
+
+        window = self.window
+        events = self.events
+
+        event = ((iteration in self.faults) or (('crashes' in events) and (len(crashes) > 0))
+            or (('ignores' in events) and (len(ignoring) > 0)))
+
+        if event:
+            self.keep_until = max(self.keep_until, iteration + window)
+
+        if event or (iteration <= self.keep_until) or (iteration % self.every == 0) or (iteration == self.last_iteration):
+            # Only an event pulls in the window before it; samples and iterations after an event are kept alone
+            if event:
+                self.flush_buffer()
+            else:
+                self.buffered.clear()
+
+            self.pass_on(iteration, acvs, ignoring, crashes)
+            return
+
+        # Kept in case an event comes within the window after it
+        if (window > 0):
+            self.buffer[iteration % window] = acvs.state
+            self.buffered.append((iteration, list(ignoring), list(crashes)))
+
+    def flush_buffer(self):
+        """Passes on every buffered iteration, oldest first."""
+
+        for (iteration, ignoring, crashes) in self.buffered:
+            state = self.buffer[iteration % self.window]
+            self.pass_on(iteration, SimpleNamespace(**dict(zip(Fleet.FIELDS, state))), ignoring, crashes)
+
+        self.buffered.clear()
+
+    def pass_on(self, iteration: int, acvs, ignoring: list, crashes: list):
+        """
+        Passes an iteration on to the sink.
+
+        Args:
+            iteration (int): The iteration
+            acvs (Fleet): The fleet of ACVs, or a copy of its fields
+            ignoring (list): The indexes of the ACVs ignoring their distance sensor this iteration
+            crashes (list): The (ACV index, ACV index) pairs that crashed this iteration
+        """
+
+        self.sink.record(iteration, acvs, ignoring, crashes)
+        self.kept += 1
+
+    def close(self, metrics: dict):
+        """
+        Finishes recording the run.
+
+        Args:
+            metrics (dict): The final metrics of the run (see Logger.calculate_metrics)
+        """
+
+        self.buffered.clear()
+        self.sink.close(metrics)
+
+    def trajectory(self):
+        """
+        Gets the kept records from the sink, if it keeps any in memory.
+
+        Returns:
+            tuple: The records of the sink (see RecordSink.trajectory)
+        """
+
+        return self.sink.trajectory()
@@ -0,0 +1,91 @@
+from recording.RecordSink import RecordSink
+from recording.LiveFeed import LiveFeed
+
+from subject.Fleet import Fleet
+
+class LiveDashboardSink(RecordSink):
+    """
+    Publishes each iteration of a run to a live feed as it happens, for the live dashboard to stream to the browser, and passes it on
+    to another sink if given, so a run can be watched and recorded at once. Publishing only copies the new readings and running metrics
+    into the feed's bounded buffer and never waits for the dashboard (see LiveFeed).
+
+    Attributes:
+        feed (LiveFeed): The feed the iterations are published to
+        sink (RecordSink): The sink the iterations are passed on to, if any
+        faults (FaultSchedule): The fault schedule of the run. Tells the iterations with an active fault.
+        num_acvs (int): The number of ACVs
+    """
+
+    def __init__(self, feed: LiveFeed, sink: RecordSink = None):
+        """
+        Initializes the sink.
+
+        Args:
+            feed (LiveFeed): The feed the iterations are published to
+            sink (RecordSink): The sink the iterations are passed on to, if any
+        """
+
+        self.feed = feed
+        self.sink = sink
+        self.faults = set()
+        self.num_acvs = 0
+
+    def open(self, header: dict):
+        """
+        Starts the run on the feed, replacing the previous run on the dashboard.
+
+        Args:
+            header (dict): The description of the run (see RecordSink.open)
+        """
+
+        self.faults = header['faults']
+        self.num_acvs = header['num_acvs']
+
+        self.feed.start_run({'model': header['model'], 'num_acvs': header['num_acvs'], 'iterations': header['iterations']})
+        if (self.sink is not None):
+            self.sink.open(header)
+
+    def record(self, iteration: int, acvs: Fleet, ignoring: list, crashes: list):
+        """
+        Publishes the distance readings and running metrics of the iteration.
+
+        Args:
+            iteration (int): The iteration
+            acvs (Fleet): The fleet of ACVs
+            ignoring (list): The indexes of the ACVs ignoring their distance sensor this iteration
+            crashes (list): The (ACV index, ACV index) pairs that crashed this iteration
+        """
+
+        if (self.sink is not None):
+            self.sink.record(iteration, acvs, ignoring, crashes)
+
+        event = (1 if iteration in self.faults else 0) | (2 if crashes else 0)
+
+        # Skip the sums for iterations the feed would not publish
+        if (not event) and (iteration % self.feed.stride != 0):
+            return
+
+        num_acvs = self.num_acvs
+        metrics = (acvs.total_penalties.sum() / num_acvs, acvs.baseline_penalties.sum() / num_acvs, acvs.total_regrets.sum(), acvs.baseline_regrets.sum())
+        self.feed.publish(iteration, acvs.distances[1:], metrics, event)
+
+    def close(self, metrics: dict):
+        """
+        Finishes the run, passing its final metrics on.
+
+        Args:
+            metrics (dict): The final metrics of the run (see Logger.calculate_metrics)
+        """
+
+        if (self.sink is not None):
+            self.sink.close(metrics)
+
+    def trajectory(self):
+        """
+        Gets the records of the sink passed on to, if it keeps any in memory.
+
+        Returns:
+            tuple: The records of the sink (see RecordSink.trajectory)
+        """
+
+        return self.sink.trajectory() if (self.sink is not None) else None
@@ -0,0 +1,144 @@
+import threading
+import numpy as np
+
+# The running metrics of each published iteration, in column order
+metric_columns = ('avg_penalty', 'avg_baseline_penalty', 'total_regret', 'total_baseline_regret')
+
+class LiveFeed:
+    """
+    A bounded buffer of the iterations of the run in progress, shared between the simulation publishing them and the live dashboard
+    reading them. Publishing never waits: once the dashboard falls a whole buffer behind, only every stride-th iteration is published,
+    with the stride doubling each time the buffer fills and halving as the dashboard catches up. Faults and crashes are always published.
+
+    Points are numbered in publishing order, and each reader asks for the points after the last one it has, so several browsers can
+    watch the same run. A reader that falls behind the buffer skips to its oldest point.
+
+    Attributes:
+        capacity (int): The number of points the buffer holds
+        max_stride (int): The largest stride iterations are published at
+        lock (threading.Lock): Guards the buffer, which is written by the simulation and read by the dashboard's threads
+        run (int): The number of runs started, identifying the run in progress
+        header (dict): The description of the run in progress (see RecordSink.open)
+        stride (int): Only every stride-th iteration is published, besides faults and crashes
+        sequence (int): The number of points published this run
+        consumed (int): The number of points read by the furthest reader
+        iterations (np.ndarray): Ring buffer of the iteration of each point
+        distances (np.ndarray): Ring buffer of the distance sensor reading of each trailing ACV at each point
+        metrics (np.ndarray): Ring buffer of the running metrics at each point, one column per metric_columns entry
+        events (np.ndarray): Ring buffer of whether each point has a fault (1), a crash (2) or both (3)
+    """
+
+    def __init__(self, capacity: int = 4096, max_stride: int = 1024):
+        """
+        Initializes an empty feed.
+
+        Args:
+            capacity (int): The number of points the buffer holds
+            max_stride (int): The largest stride iterations are published at
+        """
+
+        self.capacity = capacity
+        self.max_stride = max_stride
+        self.lock = threading.Lock()
+
+        self.run = 0
+        self.header = None
+        self.empty(num_trailing=0)
+
+    def start_run(self, header: dict):
+        """
+        Empties the buffer for a new run.
+
+        Args:
+            header (dict): The description of the run (see RecordSink.open)
+        """
+
+        with self.lock:
+            self.run += 1
+            self.header = header
+            self.empty(header['num_acvs'] - 1)
+
+    def empty(self, num_trailing: int):
+        """
+        Allocates an empty buffer.
+
+        Args:
+            num_trailing (int): The number of trailing ACVs
+        """
+
+        self.stride = 1
+        self.sequence = 0
+        self.consumed = 0
+
+        self.iterations = np.zeros(self.capacity, dtype=np.int64)
+        self.distances = np.zeros((self.capacity, num_trailing))
+        self.metrics = np.zeros((self.capacity, len(metric_columns)))
+        self.events = np.zeros(self.capacity, dtype=np.int8)
+
+    def publish(self, iteration: int, distances: np.ndarray, metrics: tuple, event: int = 0):
+        """
+        Adds an iteration to the buffer, unless it falls between strides. Never waits for a reader.
+
+        Args:
+            iteration (int): The iteration
+            distances (np.ndarray): The distance sensor reading of each trailing ACV
+            metrics (tuple): The running metrics, in metric_columns order
+            event (int): Whether the iteration has a fault (1), a crash (2) or both (3)
+        """
+
+        if (not event) and (iteration % self.stride != 0):
+            return
+
+        with self.lock:
+            # The readers are a whole buffer behind, so publish less often rather than wait for them. Until they read again, the
+            # stride doubles once more every half buffer.
+            if (self.sequence - self.consumed >= self.capacity):
+                self.stride = min(self.stride * 2, self.max_stride)
+                self.consumed = self.sequence - self.capacity // 2
+                if (not event) and (iteration % self.stride != 0):
+                    return
+
+            slot = self.sequence % self.capacity
+            self.iterations[slot] = iteration
+            self.distances[slot] = distances
+            self.metrics[slot] = metrics
+            self.events[slot] = event
+            self.sequence += 1
+
+    def read(self, run: int, after: int) -> dict:
+        """
+        Reads the points a reader does not have yet.
+
+        Args:
+            run (int): The run the reader has points of
+            after (int): The number of points of the run the reader has
+
+        Returns:
+            dict: The 'run' in progress, its 'header' if the reader must reset, the 'sequence' to ask for the next points after, whether the reader must
+                'reset' because the run changed, the 'stride', and the 'iterations', 'distances' (one list per trailing ACV), 'metrics'
+                (one list per metric) and 'events' of the new points
+        """
+
+        with self.lock:
+            reset = (run != self.run)
+            start = max(0 if reset else after, self.sequence - self.capacity)
+            slots = np.arange(start, self.sequence) % self.capacity
+
+            points = {
+                'run': self.run,
+                'header': self.header if reset else None,
+                'sequence': self.sequence,
+                'reset': reset,
+                'stride': self.stride,
+                'iterations': self.iterations[slots].tolist(),
+                'distances': np.round(self.distances[slots].T, 2).tolist(),
+                'metrics': self.metrics[slots].T.tolist(),
+                'events': self.events[slots].tolist(),
+            }
+
+            # Caught up, so publish more often again
+            self.consumed = max(self.consumed, self.sequence)
+            if (self.stride > 1) and (len(slots) < self.capacity // 4):
+                self.stride //= 2
+
+        return points
@@ -0,0 +1,176 @@
+import json, os
+import numpy as np
+
+from recording.RecordSink import RecordSink, TRAJECTORY_FIELDS
+from recording.Trajectory import Trajectory, header_file, column_dtypes
+
+from subject.Fleet import Fleet
+
+class MemmapSink(RecordSink):
+    """
+    Writes the records of a run into memory-mapped .npy arrays in a run directory, one array per column, alongside a small
+    'header.json' with the description of the run. Rows go straight to the mapped pages, so the run is never held in memory, and the
+    finished run can be opened lazily with Trajectory.
+
+    The arrays are preallocated for every iteration of the run and grow if more rows are recorded. Unwritten rows of a preallocated
+    array take no disk space on file systems with sparse files.
+
+    Attributes:
+        path (str): The run directory
+        capacity (int): The number of rows the arrays hold
+        growth (float): The factor the arrays grow by once they are full
+        header (dict): The description of the run
+        columns (dict): The memory-mapped array of each column
+        rows (int): The number of rows recorded
+        crashes (list): The (iteration, ACV index, ACV index) triple of every crash
+    """
+
+    def __init__(self, path: str, capacity: int = None, growth: float = 2.0):
+        """
+        Initializes the sink. The run directory is created when the run starts.
+
+        Args:
+            path (str): The run directory
+            capacity (int): The number of rows to preallocate. Defaults to one per iteration of the run.
+            growth (float): The factor the arrays grow by once they are full
+        """
+
+        self.path = path
+        self.capacity = capacity
+        self.growth = growth
+
+        self.header = None
+        self.columns = None
+        self.rows = 0
+        self.crashes = list()
+
+    def open(self, header: dict):
+        """
+        Creates the run directory and preallocates the arrays.
+
+        Args:
+            header (dict): The description of the run (see RecordSink.open)
+        """
+
+        os.makedirs(self.path, exist_ok=True)
+
+        self.header = header
+        if (self.capacity is None):
+            self.capacity = header['iterations'] + 1
+
+        self.columns = {column: self.map_column(column, self.capacity) for column in column_dtypes}
+
+        # Written now so an unfinished run can still be identified, and rewritten once the run is finished
+        self.write_header(finished=False)
+
+    def record(self, iteration: int, acvs: Fleet, ignoring: list, crashes: list):
+        """
+        Writes the state of the fleet into the next row of the arrays, growing them if they are full.
+
+        Args:
+            iteration (int): The iteration
+            acvs (Fleet): The fleet of ACVs
+            ignoring (list): The indexes of the ACVs ignoring their distance sensor this iteration
+            crashes (list): The (ACV index, ACV index) pairs that crashed this iteration
+        """
+
+        if (self.rows == self.capacity):
+            self.grow()
+
+        row = self.rows
+        columns = self.columns
+
+        columns['iteration'][row] = iteration
+        for field in TRAJECTORY_FIELDS:
+            columns[field][row] = getattr(acvs, field)
+
+        columns['ignoring'][row] = False
+        columns['ignoring'][row, ignoring] = True
+
+        self.crashes.extend((iteration, first, second) for (first, second) in crashes)
+        self.rows += 1
+
+    def close(self, metrics: dict):
+        """
+        Flushes the arrays to disk and writes the finished header.
+
+        Args:
+            metrics (dict): The final metrics of the run (see Logger.calculate_metrics)
+        """
+
+        for array in self.columns.values():
+            array.flush()
+
+        self.columns = None
+        self.write_header(finished=True, metrics=metrics)
+
+    def trajectory(self) -> tuple:
+        """
+        Opens the finished run lazily for the visualizer.
+
+        Returns:
+            tuple: The location, speed, distance, ignore and crash records and the iteration of each record (see start_visualizer), backed
+                by the run directory
+        """
+
+        if (self.columns is not None):
+            return None
+
+        return Trajectory(self.path).visualizer_records()
+
+    def map_column(self, column: str, rows: int) -> np.memmap:
+        """
+        Creates the memory-mapped array of a column.
+
+        Args:
+            column (str): The name of the column
+            rows (int): The number of rows
+
+        Returns:
+            np.memmap: The writable array
+        """
+
+        shape = (rows,) if column == 'iteration' else (rows, self.header['num_acvs'])
+        return np.lib.format.open_memmap(os.path.join(self.path, column + '.npy'), mode='w+', dtype=column_dtypes[column], shape=shape)
+
+    def grow(self):
+        """Grows every array by the growth factor, copying the rows recorded so far."""
+
+        capacity = max(self.capacity + 1, int(self.capacity * self.growth))
+
+        for (column, array) in self.columns.items():
+            array.flush()
+
+            # The .npy header holds the shape, so the array is rebuilt in a new file and swapped in
+            old_path = os.path.join(self.path, column + '.npy')
+            os.replace(old_path, old_path + '.old')
+            del array
+
+            old = np.load(old_path + '.old', mmap_mode='r')
+            grown = self.map_column(column, capacity)
+            grown[:self.rows] = old[:self.rows]
+
+            del old
+            os.remove(old_path + '.old')
+            self.columns[column] = grown
+
+        self.capacity = capacity
+
+    def write_header(self, finished: bool, metrics: dict = None):
+        """
+        Writes the description of the run, its fault schedule and the progress of the recording to the header file.
+
+        Args:
+            finished (bool): Whether the run has finished
+            metrics (dict): The final metrics of the run, once finished
+        """
+
+        header = dict(self.header)
+        header['faults'] = self.header['faults'].to_list()
+        header['crashes'] = [[int(value) for value in crash] for crash in self.crashes]
+        header['rows'] = self.rows
+        header['finished'] = finished
+        header['metrics'] = metrics
+
+        with open(os.path.join(self.path, header_file), 'w') as file:
+            json.dump(header, file)
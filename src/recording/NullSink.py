@@ -0,0 +1,18 @@
+from recording.RecordSink import RecordSink
+
+from subject.Fleet import Fleet
+
+class NullSink(RecordSink):
+    """A sink that discards every record, for runs where only the final metrics matter."""
+
+    def record(self, iteration: int, acvs: Fleet, ignoring: list, crashes: list):
+        """
+        Discards the state of the fleet after an iteration.
+
+        Args:
+            iteration (int): The iteration
+            acvs (Fleet): The fleet of ACVs
+            ignoring (list): The indexes of the ACVs ignoring their distance sensor this iteration
+            crashes (list): The (ACV index, ACV index) pairs that crashed this iteration
+        """
+        pass
@@ -0,0 +1,63 @@
+from abc import ABC, abstractmethod
+
+from subject.Fleet import Fleet
+
+# The per-ACV fields of the fleet recorded every iteration, in addition to which ACVs ignore their distance sensor
+TRAJECTORY_FIELDS = (
+    'locations',
+    'speeds',
+    'distances',
+    'total_penalties',
+    'total_regrets',
+    'baseline_penalties',
+    'baseline_regrets',
+)
+
+class RecordSink(ABC):
+    """
+    Generic destination for the per-iteration records of a simulation run. The Logger opens the sink with a description of the run,
+    hands it the state of the fleet after every iteration and closes it with the final metrics, so where and how records are kept
+    (nowhere, the console, a file) is up to the sink.
+    """
+
+    def open(self, header: dict):
+        """
+        Starts recording a run.
+
+        Args:
+            header (dict): The description of the run: 'model' name, 'num_acvs', 'ideal_distance', 'iterations', the 'faults' (FaultSchedule)
+                and the 'config' as a dictionary of sections
+        """
+        pass
+
+    @abstractmethod
+    def record(self, iteration: int, acvs: Fleet, ignoring: list, crashes: list):
+        """
+        Records the state of the fleet after an iteration. The fleet is live, so anything kept must be copied.
+
+        Args:
+            iteration (int): The iteration
+            acvs (Fleet): The fleet of ACVs
+            ignoring (list): The indexes of the ACVs ignoring their distance sensor this iteration
+            crashes (list): The (ACV index, ACV index) pairs that crashed this iteration
+        """
+        pass
+
+    def close(self, metrics: dict):
+        """
+        Finishes recording a run.
+
+        Args:
+            metrics (dict): The final metrics of the run (see Logger.calculate_metrics)
+        """
+        pass
+
+    def trajectory(self):
+        """
+        Gets the records kept in memory for the visualizer, if the sink keeps any.
+
+        Returns:
+            tuple: The location, speed, distance, ignore and crash records and the iteration of each record (see start_visualizer), or
+                None if none are kept. Ignore records are boolean masks with one column per ACV.
+        """
+        return None
@@ -0,0 +1,94 @@
+import json, os
+import numpy as np
+
+from itertools import groupby
+
+from recording.RecordSink import TRAJECTORY_FIELDS
+from subject.FaultSchedule import FaultSchedule
+
+header_file = 'header.json'
+
+# The data type of every column of a run directory
+column_dtypes = dict(
+    [('iteration', np.int64), ('ignoring', bool)] +
+    [(field, np.float64) for field in TRAJECTORY_FIELDS]
+)
+
+class Trajectory:
+    """
+    A run recorded by MemmapSink, opened lazily. Columns are memory-mapped read-only on first access, so opening a run of any length
+    is instant and only the rows actually read are loaded from disk.
+
+    Attributes:
+        path (str): The run directory
+        header (dict): The description of the run: model name, config, fault schedule, crashes, final metrics and number of rows
+        rows (int): The number of recorded iterations
+        columns (dict): The columns mapped so far
+    """
+
+    def __init__(self, path: str):
+        """
+        Opens a recorded run.
+
+        Args:
+            path (str): The run directory
+        """
+
+        self.path = path
+
+        with open(os.path.join(path, header_file)) as file:
+            self.header = json.load(file)
+
+        self.rows = self.header['rows']
+        self.columns = dict()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        """
+        Gets a column of the run, mapped read-only.
+
+        Args:
+            column (str): 'iteration', 'ignoring' or one of TRAJECTORY_FIELDS
+
+        Returns:
+            np.ndarray: The column, one row per recorded iteration
+        """
+
+        if column not in column_dtypes:
+            raise KeyError(f"Unknown column '{column}'. Options are: {', '.join(column_dtypes)}")
+
+        if column not in self.columns:
+            self.columns[column] = np.load(os.path.join(self.path, column + '.npy'), mmap_mode='r')[:self.rows]
+
+        return self.columns[column]
+
+    @property
+    def faults(self) -> FaultSchedule:
+        """The fault schedule of the run (see FaultSchedule). Runs recorded before fault models were added had one multiplier per fault."""
+
+        if 'faults' not in self.header:
+            return FaultSchedule.from_list(self.header['iterations'],
+                [[iteration, 1, acv, 'multiply', multiplier] for (iteration, acv, multiplier) in self.header['iterations_to_mod']])
+
+        return FaultSchedule.from_list(self.header['iterations'], self.header['faults'])
+
+    @property
+    def crashes(self) -> list:
+        """The crashes of the run, as (iteration, [(ACV index, ACV index), ...]) pairs in iteration order."""
+
+        return [
+            (iteration, [(first, second) for (_, first, second) in crashes])
+            for (iteration, crashes) in groupby(self.header['crashes'], key=lambda crash: crash[0])
+        ]
+
+    def visualizer_records(self) -> tuple:
+        """
+        Gets the run in the form the visualizer takes, without loading it.
+
+        Returns:
+            tuple: The location, speed, distance and ignore columns, the crashes and the iteration column (see start_visualizer)
+        """
+
+        return (self['locations'], self['speeds'], self['distances'], self['ignoring'], self.crashes, self['iteration'])
@@ -1,11 +1,13 @@
 import subject
 
-from config import get_config
-
 class ACV:
     """Represents an Autonomously Controlled Vehicle (ACV). Travels in one dimension.
-    
+
+    The ACV is a thin view onto one column of a Fleet, which holds the state of every vehicle in contiguous arrays.
+    Reading or assigning an attribute reads or writes the Fleet's arrays directly.
+
     Attributes:
+        fleet (Fleet): The fleet holding the state of this ACV.
         index (int): The index of the ACV.
         location (float): The current location of the ACV.
         speed (float): The current speed of the ACV.
@@ -16,29 +18,45 @@ class ACV:
         baseline_regret (float): The baseline regret of the ACV (no MAB model in place).
     """
 
-    def __init__(self, index: int, start_location: float, start_speed: float):
+    def __init__(self, fleet, index: int):
         """
-        Initializes the ACV with the given index, location, and speed.
-        
+        Initializes the ACV as a view onto the given fleet.
+
         Args:
+            fleet (Fleet): The fleet holding the state of this ACV.
             index (int): The index of the ACV.
-            start_location (float): The starting location of the ACV.
-            start_speed (float): The starting speed of the ACV.
         """
 
+        self.fleet = fleet
         self.index = index
-        self.location = start_location
-        self.target_speed = start_speed  
-        self.speed = start_speed
-        
-        self.distance = 0
-        self.distance_record = list()
-        self.predicted_distance = 0
-
-        self.total_penalty = 0
-        self.total_regret = 0
-        self.baseline_penalty = 0
-        self.baseline_regret = 0
+
+    def _field(name: str):
+        """
+        Creates a property reading and writing one element of the named fleet array.
+
+        Args:
+            name (str): The name of the fleet array backing the property.
+        """
+
+        def get_value(self) -> float:
+            return float(getattr(self.fleet, name)[self.index])
+
+        def set_value(self, value: float):
+            getattr(self.fleet, name)[self.index] = value
+
+        return property(get_value, set_value)
+
+    location = _field('locations')
+    speed = _field('speeds')
+    target_speed = _field('target_speeds')
+    distance = _field('distances')
+    predicted_distance = _field('predicted_distances')
+    total_penalty = _field('total_penalties')
+    total_regret = _field('total_regrets')
+    baseline_penalty = _field('baseline_penalties')
+    baseline_regret = _field('baseline_regrets')
+
+    del _field
 
     def update(self, speed_modifier, penalty=0, regret=0, baseline_penalty=0, baseline_regret=0):
         """
@@ -58,11 +76,11 @@ class ACV:
         self.baseline_penalty += baseline_penalty
         self.baseline_regret += baseline_regret
 
-        max_speed = get_config('acvs', 'max_speed')
-        self.target_speed += speed_modifier
-        self.target_speed = max(min(self.target_speed, max_speed), -max_speed)
+        max_speed = self.fleet.max_speed
+        target_speed = self.target_speed + speed_modifier
+        self.target_speed = max(min(target_speed, max_speed), -max_speed)
 
-        easing = get_config('acvs', 'easing')
+        easing = self.fleet.easing
         self.speed = (self.speed + (self.target_speed - self.speed) * easing)
 
         self.location += self.speed
@@ -70,16 +88,9 @@ class ACV:
     def set_distance(self, new_distance: float):
         """
         Sets the distance between the ACV and the ACV in front of it, then recomputes the predicted distance.
-        
+
         Args:
             new_distance (float): The new distance between the ACV and the ACV in front of it.
         """
-        self.distance = new_distance
-
-        self.distance_record.append(new_distance)
-        if (len(self.distance_record) > 5):
-            self.distance_record.pop(0)
-
-        self.predicted_distance = sum(self.distance_record) / len(self.distance_record)
-
 
+        self.fleet.set_distance(self.index, new_distance)
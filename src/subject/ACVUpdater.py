@@ -1,30 +1,66 @@
-import pandas, subject, random
+import csv, subject
+import numpy as np
 
 from subject.Observable import Observable
-from subject.ACV import ACV
+from subject.Fleet import Fleet
 from subject.Logger import Logger
+from subject.FaultSchedule import FaultSchedule, generate_faults
+from recording.RecordSink import RecordSink
 from mapek.Knowledge import Knowledge
 
-from config import get_config, write_config
+start_data_file = 'data/acv_start.csv'
+
+def read_start_data(path: str = start_data_file) -> np.ndarray:
+    """
+    Reads the starting location and speed of each ACV from the CSV file.
+
+    Args:
+        path (str): The path of the CSV file.
+
+    Returns:
+        np.ndarray: Structured array with one row per ACV and 'start_location' and 'start_speed' fields, lead ACV first.
+    """
+
+    with open(path, newline='') as file:
+        (columns, *rows) = [row for row in csv.reader(file) if row]
+
+    return np.array([tuple(float(value) for value in row) for row in rows], dtype=[(column.strip(), float) for column in columns])
 
 class ACVUpdater(Observable):
     """
     Represents the distance sensor of an ACV. Serves as the intermediary between the ACVs and the speed adaptation MAPE-K loop
     
     Attributes:
-        acvs (list): List of ACVs that the distance sensor is monitoring
+        knowledge (Knowledge): The knowledge of the simulation run
+        start_data (np.ndarray): The starting location and speed of each ACV, lead ACV first
+        sink (RecordSink): Where the record of each iteration goes. None for the Logger's default.
+        config (Config): The simulation config, with num_acvs set from the CSV file
+        rng (np.random.Generator): The random number generator used to draw the fault schedule
+        acvs (Fleet): The fleet of ACVs that the distance sensor is monitoring
         iteration (int): The current iteration of the simulation
-        iterations_to_mod (dict): A dictionary of iterations to modify and the amount to modify them by
+        faults (FaultSchedule): The compiled schedule of distance sensor faults
         total_crashes (int): The total number of crashes that have occurred
         acvs_ignoring_sensor (list): List of ACVs who have ignored their distance sensor reading in favor of the predicted value for the current iteration. Used for visual purposes.
     """
 
-    def __init__(self):
-        """Initialize the ACVUpdater class."""
+    def __init__(self, knowledge: Knowledge, start_data: np.ndarray = None, sink: RecordSink = None):
+        """
+        Initialize the ACVUpdater class.
+
+        Args:
+            knowledge (Knowledge): The knowledge of the simulation run, holding its config and random number generator
+            start_data (np.ndarray): The starting location and speed of each ACV (see read_start_data). Read from the CSV file if not given.
+            sink (RecordSink): Where the record of each iteration goes. The Logger chooses if not given (see Logger).
+        """
 
         super().__init__()
 
-        self.acvs = list()
+        self.knowledge = knowledge
+        self.start_data = start_data if start_data is not None else read_start_data()
+        self.sink = sink
+        self.config = knowledge.config
+        self.rng = knowledge.rng
+        self.acvs = None
         self.acvs_ignoring_sensor = list()
         self.iteration = 0
         self.total_crashes = 0
@@ -32,57 +68,55 @@ class ACVUpdater(Observable):
         self.initialize_acvs()
 
         # Done after ACV initialization
-        self.iterations_to_mod = self.calculate_mod_iterations()
+        self.faults = self.generate_faults()
 
     def initialize_acvs(self):
-        """Reads the starting data from the CSV file, initializes the ACVs, and starts the update loop."""
+        """Initializes the ACVs from the starting data."""
 
-        data = pandas.read_csv('data/acv_start.csv')
+        data = self.start_data
 
         # Initialize ACVs
-        for index, row in data.iterrows():
-            self.acvs.append(ACV(index, float(row['start_location']), float(row['start_speed'])))
+        self.acvs = Fleet(
+            np.asarray(data['start_location'], dtype=float),
+            np.asarray(data['start_speed'], dtype=float),
+            self.config.acvs.max_speed,
+            self.config.acvs.easing)
 
         if (len(self.acvs) <= 1):
             raise Exception('Please initialize 2 or more ACVs with unique indexes from the CSV file.')
-        
-        write_config('acvs', 'num_acvs', len(self.acvs))
 
-    def calculate_mod_iterations(self) -> dict:
+        # In-memory only - the config file on disk is never rewritten
+        self.config = self.config.override('acvs', 'num_acvs', len(self.acvs))
+        self.knowledge.config = self.config
+
+    def generate_faults(self) -> FaultSchedule:
         """
-        Calculates the iterations that will be modified and the amount to modify them by.
-        
+        Draws the fault schedule of the run and compiles it for the update loop.
+
         Returns:
-            dict: A dictionary of iterations to modify as keys and the ACV to modify as well as amount to modify them by as the values.
+            FaultSchedule: The compiled fault schedule (see generate_faults)
         """
 
-        num_iterations = get_config('simulation', 'iterations')
-        mod_percent = get_config('simulation', 'percent_modified')
-        training_iters = get_config('simulation', 'training_iterations')
-        mod_range = get_config('simulation', 'mod_range')
-
-        num_modded = round(num_iterations * mod_percent) # Floors the decimal value for all positive numbers
+        faults = generate_faults(self.config, self.rng)
+        faults.compile(self.rng)
 
+        return faults
 
-        mod_iterations = random.sample(range(training_iters + 1, num_iterations), num_modded)
-        iteration_mod_pair = {
-            iteration:
-            (
-                random.randint(1, get_config('acvs', 'num_acvs') - 1), # ACV index
-                round(random.uniform(mod_range[0], mod_range[1]), 2) # Mod amount
-            )
-            for iteration in mod_iterations
-        }
+    def run_update_loop(self) -> dict:
+        """
+        Runs the update loop for the distance sensor.
 
-        iteration_mod_pair = dict(sorted(iteration_mod_pair.items()))
-        return iteration_mod_pair
+        Returns:
+            dict: The final metrics for the simulation (see Logger.calculate_metrics)
+        """
 
-    def run_update_loop(self):
-        """Runs the update loop for the distance sensor."""
+        logger = Logger(self.acvs, self.faults, self.knowledge, self.sink)
 
-        logger = Logger(self.acvs, self.iterations_to_mod)
+        profiler = self.knowledge.profiler
+        if (profiler is not None):
+            profiler.instrument(logger, 'record_iteration')
 
-        for i in range(get_config('simulation', 'iterations') + 1):
+        for i in range(self.config.simulation.iterations + 1):
             self.iteration = i
 
             # Only update after first iteration so iteration 0 displays the starting values
@@ -90,82 +124,57 @@ class ACVUpdater(Observable):
                 self.update_distances()
             
             logger.acvs_ignoring_sensor = self.acvs_ignoring_sensor
-            logger.print_acv_locations(i, self.detect_crashes())
+            logger.record_iteration(i, self.detect_crashes())
 
-        logger.print_final_metrics(self.total_crashes)
+        return logger.print_final_metrics(self.total_crashes)
 
     def update_distances(self):
         """Updates the distances between the ACVs and sends the data to the MAPE-K loop to determine speed adaptation."""
 
-        knowledge = Knowledge()
-        actual_distances = list()
-        speeds = list()
-        locations = list()
+        knowledge = self.knowledge
+        knowledge.target_speed = float(self.acvs.speeds[0])
 
         # Get distances between ACVs
-        for (index, acv) in enumerate(self.acvs):
-            # Collect locations of all ACVs, including ACV0
-            locations.append(acv.location)
+        actual_distances = self.acvs.actual_distances()
 
-            if index == 0:
-                knowledge.target_speed = acv.speed
-                continue
+        # Represents bad sensor reading modification
+        modded_distances = self.mod_distances(actual_distances)
 
-            actual_distance = self.acvs[index - 1].location - acv.location
+        self.acvs.set_distances(modded_distances)
 
-            # Represents bad sensor reading modification
-            modded_distance = self.mod_distance(actual_distance, index) 
-            
-            acv.set_distance(modded_distance)
-
-            actual_distances.append(actual_distance)
-            speeds.append(acv.speed)
-        
-        # Send distance and speed data for all ACVs except lead to MAPE-K loop
-        self.notify(self.acvs, actual_distances)
+        # Send a read-only view of the ACVs and their actual distances to the MAPE-K loop
+        self.notify(self.acvs.snapshot(actual_distances))
     
-    def mod_distance(self, distance, index) -> float:
+    def mod_distances(self, distances):
         """
-        Determines if a distance should be modified based on the current iteration and returns the modified distance.
-        Does nothing if the distance should not be modified.
+        Applies the faults scheduled for the current iteration to the distances and returns the modified distances.
+        Returns the distances unchanged if no fault is active.
 
         Args:
-            distance (float): The distance to be modified.
-            index (int): The index of the ACV that the distance is for.
+            distances (np.ndarray): The distance for each trailing ACV (index 0 is ACV1).
 
         Returns:
-            float: The modified distance.
+            np.ndarray: The modified distances.
         """
 
-        modded_distance = distance
-        if self.iteration in self.iterations_to_mod.keys() and self.iterations_to_mod[self.iteration][0] == index:
-            modded_distance = distance * self.iterations_to_mod[self.iteration][1]
-        
-        return modded_distance
+        modded_distances = distances.copy()
+        self.faults.apply(self.iteration, modded_distances)
+
+        return modded_distances
 
-    def recieve_speed_modifications(self, speed_modifiers: list, penalties: list, regrets: list, baseline_penalties: list, baseline_regrets: list, acvs_ignoring_sensor: list):
+    def recieve_speed_modifications(self, decisions: np.ndarray):
         """
         Updates each ACV with a speed modification, penalty, and regret
-        
+
         Args:
-            speed_modifiers (list): A list of speed modifiers to apply to each ACV.
-            penalties (list): A list of penalties for each ACV in this iteration.
-            regrets (list): A list of regrets for each ACV in this iteration.
-            baseline_penalties (list): A list of baseline penalties for each ACV in this iteration.
-            baseline_regrets (list): A list of baseline regrets for each ACV in this iteration.
-            acvs_ignoring_sensor (list): List of ACVs who have ignored their distance sensor reading in favor of the predicted value. Used for visual purposes.
+            decisions (np.ndarray): Structured array of DECISION_DTYPE with one record per trailing ACV in this iteration.
         """
 
-        self.acvs_ignoring_sensor = acvs_ignoring_sensor.copy()
-
-        for (index, acv) in enumerate(self.acvs):
-            # Don't modify speed of lead ACV - speed is always constant
-            if index == 0:
-                acv.update(0)
-                continue
+        # ACV0 not counted, so add 1 to index. Used for visual purposes.
+        self.acvs_ignoring_sensor = (np.flatnonzero(decisions['ignoring_sensor']) + 1).tolist()
 
-            i = index - 1
-            acv.update(speed_modifiers[i], penalties[i], regrets[i], baseline_penalties[i], baseline_regrets[i])
+        # Lead ACV is never modified - speed is always constant
+        self.acvs.apply_decisions(decisions)
 
     def detect_crashes(self) -> list:
         """
@@ -175,14 +184,8 @@ class ACVUpdater(Observable):
             list(): A list of tuples containing the two crashed ACVs.
         """
 
-        crash_list = list()
-        for (index, acv) in enumerate(self.acvs):
-            if index == 0:
-                continue
+        crash_list = self.acvs.detect_crashes()
 
-            if acv.location >= self.acvs[index - 1].location:
-                crash_list.append((index - 1, index))
-        
         self.total_crashes += len(crash_list)
         return crash_list
 
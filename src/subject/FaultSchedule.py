@@ -0,0 +1,261 @@
+import numpy as np
+
+from config import Config
+
+# The fault models a sensor can suffer, by model index. Every model maps a reading to reading * scale + shift:
+#   multiply - the reading is multiplied by the value
+#   stuck    - the reading is stuck at the value
+#   drift    - the reading drifts by the value every iteration the fault lasts
+#   dropout  - no reading arrives, so the sensor reads 0
+#   noise    - Gaussian noise with the value as standard deviation is added to the reading
+fault_models = ('multiply', 'stuck', 'drift', 'dropout', 'noise')
+
+(MULTIPLY, STUCK, DRIFT, DROPOUT, NOISE) = range(len(fault_models))
+
+def describe_fault(model: int, value: float) -> str:
+    """
+    Describes a fault for the console table and the visualizer.
+
+    Args:
+        model (int): The index of the fault model in fault_models
+        value (float): The parameter of the fault
+
+    Returns:
+        str: The description
+    """
+
+    return [f'x{value:g}', f'stuck at {value:g}', f'drift {value:+g}/iter', 'dropout', f'noise sd {value:g}'][model]
+
+def generate_faults(config: Config, rng: np.random.Generator) -> 'FaultSchedule':
+    """
+    Draws the fault schedule of a run. A percent_modified fraction of the iterations after training starts a fault on a random trailing
+    ACV, with a model drawn from fault_models, a duration drawn from fault_duration and a parameter drawn from the range of its model
+    (mod_range, stuck_range, drift_range or noise_range). Faults that outlast the next fault's start overlap it. Every draw is vectorized,
+    so schedules of any length are cheap.
+
+    Args:
+        config (Config): The simulation config, with num_acvs set from the CSV file
+        rng (np.random.Generator): The random number generator used to draw the faults
+
+    Returns:
+        FaultSchedule: The fault schedule
+    """
+
+    simulation = config.simulation
+    num_iterations = simulation.iterations
+    num_faults = round(num_iterations * simulation.percent_modified)    # Floors the decimal value for all positive numbers
+
+    starts = np.sort(rng.choice(np.arange(simulation.training_iterations + 1, num_iterations), num_faults, replace=False))
+    acvs = rng.integers(1, config.acvs.num_acvs, num_faults)
+
+    models = np.array([fault_models.index(model) for model in simulation.fault_models])
+    models = models[rng.integers(0, len(models), num_faults)] if (len(models) > 1) else np.full(num_faults, models[0])
+
+    (shortest, longest) = simulation.fault_duration
+    durations = rng.integers(shortest, longest + 1, num_faults) if (longest > shortest) else np.full(num_faults, shortest)
+
+    # Parameters are drawn uniformly from the range of each fault's model
+    ranges = np.array([simulation.mod_range, simulation.stuck_range, simulation.drift_range, (0, 0), simulation.noise_range], dtype=float)
+    (low, high) = ranges[models].T
+    values = np.round(rng.uniform(low, high), 2)
+
+    return FaultSchedule(num_iterations, starts, durations, acvs, models, values)
+
+class FaultSchedule:
+    """
+    The sensor faults of a run as compact arrays, one entry per fault. A fault hits the distance sensor of one trailing ACV for a
+    number of iterations, and any number of faults may be active at once, even on the same ACV.
+
+    Compiling the schedule flattens it into one affine map (reading * scale + shift) per faulted ACV per iteration, with simultaneous
+    faults on an ACV composed in schedule order, and groups the maps by iteration. Applying the faults of an iteration is then a single
+    vectorized operation on the distance vector, and iterations without a fault cost one comparison.
+
+    Attributes:
+        iterations (int): The number of iterations of the run
+        starts (np.ndarray): The first iteration of each fault, in order
+        durations (np.ndarray): The number of iterations each fault lasts
+        acvs (np.ndarray): The index of the ACV hit by each fault
+        models (np.ndarray): The index of each fault's model in fault_models
+        values (np.ndarray): The parameter of each fault (see fault_models)
+        active (np.ndarray): Boolean mask of the iterations with an active fault, one per iteration including iteration 0
+        bounds (list): The compiled maps of iteration i are rows bounds[i] to bounds[i + 1]. None until compiled.
+        indexes (np.ndarray): The index of the faulted reading in the distance vector (the ACV index - 1) of each compiled map
+        scales (np.ndarray): The scale of each compiled map
+        shifts (np.ndarray): The shift of each compiled map
+    """
+
+    def __init__(self, iterations: int, starts, durations, acvs, models, values):
+        """
+        Initializes the schedule. Faults are ordered by start iteration, and cut short at the end of the run.
+
+        Args:
+            iterations (int): The number of iterations of the run
+            starts (array_like): The first iteration of each fault
+            durations (array_like): The number of iterations each fault lasts
+            acvs (array_like): The index of the ACV hit by each fault
+            models (array_like): The index of each fault's model in fault_models
+            values (array_like): The parameter of each fault
+        """
+
+        starts = np.asarray(starts, dtype=np.int64)
+        order = np.argsort(starts, kind='stable')
+
+        self.iterations = iterations
+        self.starts = starts[order]
+        self.durations = np.minimum(np.asarray(durations, dtype=np.int64)[order], iterations + 1 - self.starts)
+        self.acvs = np.asarray(acvs, dtype=np.int64)[order]
+        self.models = np.asarray(models, dtype=np.int64)[order]
+        self.values = np.asarray(values, dtype=float)[order]
+
+        self.active = np.zeros(iterations + 1, dtype=bool)
+        self.active[self.expand()[1]] = True
+
+        self.bounds = None
+        self.indexes = None
+        self.scales = None
+        self.shifts = None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __contains__(self, iteration: int) -> bool:
+        """Whether any fault is active at the iteration."""
+
+        return (0 <= iteration <= self.iterations) and bool(self.active[iteration])
+
+    def expand(self) -> tuple:
+        """
+        Lists every iteration of every fault.
+
+        Returns:
+            tuple: The index of the fault and the iteration of each (fault, iteration) pair, and the number of iterations the fault
+                has lasted before it, in fault order
+        """
+
+        faults = np.repeat(np.arange(len(self)), self.durations)
+        elapsed = np.arange(len(faults)) - np.repeat(np.cumsum(self.durations) - self.durations, self.durations)
+
+        return (faults, self.starts[faults] + elapsed, elapsed)
+
+    def at(self, iteration: int) -> list:
+        """
+        Gets the faults active at an iteration.
+
+        Args:
+            iteration (int): The iteration
+
+        Returns:
+            list: The (ACV index, model index, value) of each active fault, in schedule order
+        """
+
+        if iteration not in self:
+            return list()
+
+        # Only faults that started at most the longest duration ago can still be active
+        first = np.searchsorted(self.starts, iteration - self.durations.max(), side='right')
+        last = np.searchsorted(self.starts, iteration, side='right')
+        faults = first + np.flatnonzero(self.starts[first:last] + self.durations[first:last] > iteration)
+
+        return [(int(self.acvs[fault]), int(self.models[fault]), float(self.values[fault])) for fault in faults]
+
+    def compile(self, rng: np.random.Generator = None):
+        """
+        Flattens the schedule into one affine map per faulted ACV per iteration, grouped by iteration, so apply is one operation.
+
+        Args:
+            rng (np.random.Generator): The random number generator noise is drawn from. Only needed if the schedule has noise faults.
+        """
+
+        (faults, iterations, elapsed) = self.expand()
+        models = self.models[faults]
+        values = self.values[faults]
+
+        scales = np.ones(len(faults))
+        shifts = np.zeros(len(faults))
+
+        scales[models == MULTIPLY] = values[models == MULTIPLY]
+        scales[(models == STUCK) | (models == DROPOUT)] = 0
+        shifts[models == STUCK] = values[models == STUCK]
+        shifts[models == DRIFT] = values[models == DRIFT] * (elapsed[models == DRIFT] + 1)
+
+        noisy = np.flatnonzero(models == NOISE)
+        if (len(noisy) > 0):
+            shifts[noisy] = rng.normal(0, values[noisy])
+
+        # Order by iteration then reading, keeping schedule order among faults on the same reading
+        indexes = self.acvs[faults] - 1
+        order = np.lexsort((indexes, iterations))
+        (iterations, indexes, scales, shifts) = (iterations[order], indexes[order], scales[order], shifts[order])
+
+        # Compose simultaneous faults on the same reading, the later fault applied to the result of the earlier one
+        keys = iterations * (indexes.max(initial=0) + 1) + indexes
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        groups = np.cumsum(first) - 1
+        ranks = np.arange(len(keys)) - np.flatnonzero(first)[groups]
+
+        (composed_scales, composed_shifts) = (scales[first], shifts[first])
+        for rank in range(1, ranks.max(initial=0) + 1):
+            rows = np.flatnonzero(ranks == rank)
+            group = groups[rows]
+            composed_scales[group] *= scales[rows]
+            composed_shifts[group] = composed_shifts[group] * scales[rows] + shifts[rows]
+
+        iterations = iterations[first]
+        self.indexes = indexes[first]
+        self.scales = composed_scales
+        self.shifts = composed_shifts
+
+        # A list, since the bounds are read one at a time on every iteration
+        self.bounds = np.searchsorted(iterations, np.arange(self.iterations + 2)).tolist()
+
+    def apply(self, iteration: int, distances: np.ndarray):
+        """
+        Applies the faults of an iteration to the distance sensor readings in place. The schedule must be compiled.
+
+        Args:
+            iteration (int): The iteration
+            distances (np.ndarray): The distance sensor reading of each trailing ACV (index 0 is ACV1)
+        """
+
+        start = self.bounds[iteration]
+        stop = self.bounds[iteration + 1]
+
+        # Most faulted iterations have a single map, which is cheaper to apply with scalars than with an indexed array operation
+        if (stop - start == 1):
+            index = self.indexes.item(start)
+            distances[index] = distances[index] * self.scales.item(start) + self.shifts.item(start)
+        elif (start < stop):
+            index = self.indexes[start:stop]
+            distances[index] = distances[index] * self.scales[start:stop] + self.shifts[start:stop]
+
+    def to_list(self) -> list:
+        """
+        Converts the schedule to plain lists for a JSON header.
+
+        Returns:
+            list: The [start, duration, ACV index, model name, value] of each fault
+        """
+
+        return [
+            [int(start), int(duration), int(acv), fault_models[model], float(value)]
+            for (start, duration, acv, model, value) in zip(self.starts, self.durations, self.acvs, self.models, self.values)
+        ]
+
+    @staticmethod
+    def from_list(iterations: int, faults: list) -> 'FaultSchedule':
+        """
+        Reads a schedule back from the lists of a JSON header (see to_list).
+
+        Args:
+            iterations (int): The number of iterations of the run
+            faults (list): The [start, duration, ACV index, model name, value] of each fault
+
+        Returns:
+            FaultSchedule: The schedule
+        """
+
+        columns = list(zip(*faults)) if faults else [[]] * 5
+        (starts, durations, acvs, models, values) = columns
+
+        return FaultSchedule(iterations, starts, durations, acvs, [fault_models.index(model) for model in models], values)
@@ -0,0 +1,225 @@
+import numpy as np
+
+from subject.ACV import ACV
+from subject.FleetSnapshot import FleetSnapshot
+
+class Fleet:
+    """
+    Holds the state of every ACV in the platoon as contiguous NumPy arrays (one row per field, one column per ACV) so that
+    each iteration is a handful of vectorized operations instead of a loop over ACV objects.
+
+    The fleet may also hold many independent platoons at once: given starting arrays of shape (..., number of ACVs), every field
+    carries the same leading dimensions and every method acts on all platoons together.
+
+    Attributes:
+        state (np.ndarray): Array of shape (len(FIELDS), ..., number of ACVs) holding every field. Each field attribute is a view of one row.
+        locations (np.ndarray): The current location of each ACV
+        speeds (np.ndarray): The current speed of each ACV
+        target_speeds (np.ndarray): The speed each ACV is easing towards
+        distances (np.ndarray): The (possibly modified) distance sensor reading of each ACV. Always 0 for the lead ACV.
+        predicted_distances (np.ndarray): The average of the last DISTANCE_HISTORY distance readings of each ACV
+        total_penalties (np.ndarray): The total penalty incurred by each ACV
+        total_regrets (np.ndarray): The total regret of each ACV
+        baseline_penalties (np.ndarray): The baseline penalty of each ACV (no MAB model in place)
+        baseline_regrets (np.ndarray): The baseline regret of each ACV (no MAB model in place)
+        distance_history (np.ndarray): The last DISTANCE_HISTORY distance readings of each ACV, used as a ring buffer
+        distance_counts (np.ndarray): The number of distance readings each ACV has received
+        max_speed (float): The maximum speed (in either direction) of any ACV
+        easing (float): The fraction of the gap to its target speed an ACV closes each iteration
+        acvs (list): ACV views onto each column of the fleet
+    """
+
+    FIELDS = (
+        'locations',
+        'speeds',
+        'target_speeds',
+        'distances',
+        'predicted_distances',
+        'total_penalties',
+        'total_regrets',
+        'baseline_penalties',
+        'baseline_regrets',
+    )
+
+    DISTANCE_HISTORY = 5
+
+    def __init__(self, start_locations, start_speeds, max_speed: float, easing: float):
+        """
+        Initializes the fleet with the given starting locations and speeds.
+
+        Args:
+            start_locations (array_like): The starting location of each ACV, lead ACV first. Shape (..., number of ACVs).
+            start_speeds (array_like): The starting speed of each ACV, lead ACV first. Same shape as start_locations.
+            max_speed (float): The maximum speed (in either direction) of any ACV
+            easing (float): The fraction of the gap to its target speed an ACV closes each iteration
+        """
+
+        start_locations = np.asarray(start_locations, dtype=float)
+        start_speeds = np.asarray(start_speeds, dtype=float)
+        shape = start_locations.shape
+
+        self.max_speed = max_speed
+        self.easing = easing
+
+        self.state = np.zeros((len(Fleet.FIELDS),) + shape)
+        self.distance_history = np.zeros(shape + (Fleet.DISTANCE_HISTORY,))
+        self.distance_counts = np.zeros(shape, dtype=int)
+        self.bind_views()
+
+        self.locations[:] = start_locations
+        self.speeds[:] = start_speeds
+        self.target_speeds[:] = start_speeds
+
+    def bind_views(self):
+        """Points each field attribute at its row of the state array and rebuilds the ACV views."""
+
+        for (row, field) in enumerate(Fleet.FIELDS):
+            setattr(self, field, self.state[row])
+
+        self.acvs = [ACV(self, index) for index in range(self.state.shape[-1])]
+
+    def __deepcopy__(self, memo: dict):
+        """Copies the underlying arrays once and rebinds the field views onto the copy."""
+
+        fleet = Fleet.__new__(Fleet)
+        memo[id(self)] = fleet
+
+        fleet.max_speed = self.max_speed
+        fleet.easing = self.easing
+
+        fleet.state = self.state.copy()
+        fleet.distance_history = self.distance_history.copy()
+        fleet.distance_counts = self.distance_counts.copy()
+        fleet.bind_views()
+
+        return fleet
+
+    def __len__(self) -> int:
+        return len(self.acvs)
+
+    def __iter__(self):
+        return iter(self.acvs)
+
+    def __getitem__(self, index):
+        return self.acvs[index]
+
+    def actual_distances(self) -> np.ndarray:
+        """
+        Calculates the true distance between each trailing ACV and the ACV in front of it.
+
+        Returns:
+            np.ndarray: The distance for each trailing ACV (index 0 is ACV1)
+        """
+
+        return self.locations[..., :-1] - self.locations[..., 1:]
+
+    def snapshot(self, actual_distances: np.ndarray) -> FleetSnapshot:
+        """
+        Creates a read-only view of the fleet for the current iteration without copying any state.
+
+        Args:
+            actual_distances (np.ndarray): The unmodified distance of each trailing ACV
+
+        Returns:
+            FleetSnapshot: The view of the fleet
+        """
+
+        return FleetSnapshot(Fleet.FIELDS, self.state, actual_distances)
+
+    def set_distances(self, distances, indices=slice(1, None)):
+        """
+        Sets the distance sensor readings of the given ACVs and recomputes their predicted distances.
+
+        Args:
+            distances (array_like): The new distance readings
+            indices (slice or array_like): The ACVs receiving the readings. Defaults to every trailing ACV.
+        """
+
+        indices = np.arange(len(self))[indices]
+        distances = np.broadcast_to(distances, self.distances[..., indices].shape)
+
+        self.distances[..., indices] = distances
+
+        # Write each reading into the next slot of its ACV's ring buffer
+        history = self.distance_history[..., indices, :]
+        slots = self.distance_counts[..., indices] % Fleet.DISTANCE_HISTORY
+        np.put_along_axis(history, slots[..., None], distances[..., None], axis=-1)
+        self.distance_history[..., indices, :] = history
+        self.distance_counts[..., indices] += 1
+
+        # Unfilled history slots are zero, so the row sum is the sum of the readings received so far
+        filled = np.minimum(self.distance_counts[..., indices], Fleet.DISTANCE_HISTORY)
+        self.predicted_distances[..., indices] = history.sum(axis=-1) / filled
+
+    def set_distance(self, index: int, distance: float):
+        """
+        Sets the distance sensor reading of a single ACV and recomputes its predicted distance.
+
+        Args:
+            index (int): The index of the ACV
+            distance (float): The new distance reading
+        """
+
+        self.set_distances(distance, [index])
+
+    def apply_decisions(self, decisions: np.ndarray):
+        """
+        Applies one iteration to every ACV using the decision record of the MAPE-K loop.
+
+        Args:
+            decisions (np.ndarray): Structured array of DECISION_DTYPE with one record per trailing ACV
+        """
+
+        self.update(
+            decisions['speed_modifier'],
+            decisions['penalty'],
+            decisions['regret'],
+            decisions['baseline_penalty'],
+            decisions['baseline_regret'])
+
+    def update(self, speed_modifiers, penalties, regrets, baseline_penalties, baseline_regrets):
+        """
+        Applies one iteration to every ACV: adds the speed modifiers to the target speeds, clamps them to the maximum speed,
+        eases each speed towards its target, and moves each ACV. The lead ACV is never modified.
+
+        Args:
+            speed_modifiers (array_like): The speed modifier for each trailing ACV
+            penalties (array_like): The penalty incurred by each trailing ACV in this iteration
+            regrets (array_like): The regret incurred by each trailing ACV in this iteration
+            baseline_penalties (array_like): The baseline penalty incurred by each trailing ACV in this iteration
+            baseline_regrets (array_like): The baseline regret incurred by each trailing ACV in this iteration
+        """
+
+        self.total_penalties[..., 1:] += penalties
+        self.total_regrets[..., 1:] += regrets
+
+        self.baseline_penalties[..., 1:] += baseline_penalties
+        self.baseline_regrets[..., 1:] += baseline_regrets
+
+        self.target_speeds[..., 1:] += speed_modifiers
+        np.clip(self.target_speeds, -self.max_speed, self.max_speed, out=self.target_speeds)
+
+        self.speeds += (self.target_speeds - self.speeds) * self.easing
+
+        self.locations += self.speeds
+
+    def crash_mask(self) -> np.ndarray:
+        """
+        Checks which trailing ACVs have reached or passed the ACV in front of them.
+
+        Returns:
+            np.ndarray: Boolean array of shape (..., number of ACVs - 1), true for each crashed trailing ACV (index 0 is ACV1)
+        """
+
+        return self.locations[..., 1:] >= self.locations[..., :-1]
+
+    def detect_crashes(self) -> list:
+        """
+        Checks which ACVs have reached or passed the ACV in front of them. Only for a fleet of a single platoon.
+
+        Returns:
+            list: A list of tuples containing the indexes of the two crashed ACVs.
+        """
+
+        crashed = np.flatnonzero(self.crash_mask()) + 1
+        return [(int(index) - 1, int(index)) for index in crashed]
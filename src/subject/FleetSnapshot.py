@@ -0,0 +1,52 @@
+import numpy as np
+
+class FleetSnapshot:
+    """
+    An immutable, zero-copy view of a Fleet's state for one iteration, sent through the MAPE-K loop in place of a copy of every ACV.
+    Every array is a read-only view onto the fleet, so it is only valid until the fleet is next updated, which happens once the
+    loop has sent its decisions back for the iteration.
+
+    Attributes:
+        state (np.ndarray): Read-only view of the fleet's state array, one row per field in Fleet.FIELDS
+        locations (np.ndarray): The location of each ACV
+        speeds (np.ndarray): The speed of each ACV
+        target_speeds (np.ndarray): The target speed of each ACV
+        distances (np.ndarray): The (possibly modified) distance sensor reading of each ACV. Always 0 for the lead ACV.
+        predicted_distances (np.ndarray): The average of the last few distance readings of each ACV
+        total_penalties (np.ndarray): The total penalty incurred by each ACV
+        total_regrets (np.ndarray): The total regret of each ACV
+        baseline_penalties (np.ndarray): The baseline penalty of each ACV
+        baseline_regrets (np.ndarray): The baseline regret of each ACV
+        actual_distances (np.ndarray): The unmodified distance of each trailing ACV (index 0 is ACV1)
+        lead_speed (float or np.ndarray): The speed of the lead ACV, one per platoon if the fleet holds many
+    """
+
+    def __init__(self, fields: tuple, state: np.ndarray, actual_distances: np.ndarray):
+        """
+        Creates read-only views of the given fleet state.
+
+        Args:
+            fields (tuple): The name of each row of the state array
+            state (np.ndarray): The fleet's state array
+            actual_distances (np.ndarray): The unmodified distance of each trailing ACV
+        """
+
+        state = state.view()
+        state.flags.writeable = False
+
+        actual_distances = actual_distances.view()
+        actual_distances.flags.writeable = False
+
+        object.__setattr__(self, 'state', state)
+        object.__setattr__(self, 'actual_distances', actual_distances)
+        lead_speed = state[fields.index('speeds'), ..., 0]
+        object.__setattr__(self, 'lead_speed', float(lead_speed) if lead_speed.ndim == 0 else lead_speed)
+
+        for (row, field) in enumerate(fields):
+            object.__setattr__(self, field, state[row])
+
+    def __setattr__(self, name, value):
+        raise AttributeError('FleetSnapshot is immutable')
+
+    def __len__(self) -> int:
+        return self.state.shape[-1]
@@ -0,0 +1,171 @@
+from dash import dash, dcc, html, no_update
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+import plotly.graph_objects as go
+from threading import Thread, Timer
+from werkzeug.serving import make_server
+
+import logging
+
+from recording.LiveFeed import LiveFeed, metric_columns
+from subject.Visualization import open_browser, mod_color, crash_color
+
+poll_interval = 500
+window_points = 20000
+
+metric_names = ['Avg. penalty', 'Avg. baseline penalty', 'Total regret', 'Total baseline regret']
+
+def create_live_figures(points: dict) -> tuple:
+    """
+    Creates the figures of a new run, holding the points read so far. Later points are appended to them in the browser.
+
+    Args:
+        points (dict): The first points of the run (see LiveFeed.read)
+
+    Returns:
+        tuple: The distance reading figure, with one trace per trailing ACV followed by the faults and crashes, and the running
+            metrics figure, with one trace per metric
+    """
+
+    (distance_data, metric_data) = live_extension(points)
+
+    distances = go.Figure(
+        data=[
+            go.Scattergl(name='ACV ' + str(acv + 1), mode='lines', line=dict(width=1))
+            for acv in range(len(points['distances']))
+        ] + [
+            go.Scattergl(name='Faults', mode='markers', marker=dict(color=mod_color, symbol='triangle-up', size=8, line=dict(width=1, color='black'))),
+            go.Scattergl(name='Crashes', mode='markers', marker=dict(color=crash_color, symbol='x', size=8)),
+        ],
+        layout=go.Layout(height=400, margin=dict(t=30), xaxis=dict(title='Iteration'), yaxis=dict(title='Dist Sensor'),
+            legend=dict(orientation='h'), uirevision=points['run'])
+    )
+
+    metrics = go.Figure(
+        data=[go.Scattergl(name=name, mode='lines') for name in metric_names],
+        layout=go.Layout(height=300, margin=dict(t=30), xaxis=dict(title='Iteration'), legend=dict(orientation='h'), uirevision=points['run'])
+    )
+
+    for (figure, (data, traces)) in ((distances, distance_data), (metrics, metric_data)):
+        for (trace, x, y) in zip(traces, data['x'], data['y']):
+            figure.data[trace].x = x
+            figure.data[trace].y = y
+
+    return (distances, metrics)
+
+def live_extension(points: dict) -> tuple:
+    """
+    Arranges new points as extensions of the traces of the live figures.
+
+    Args:
+        points (dict): The new points (see LiveFeed.read)
+
+    Returns:
+        tuple: The (data, trace indexes) extension of the distance reading figure and of the running metrics figure
+    """
+
+    iterations = points['iterations']
+    distances = points['distances']
+    events = points['events']
+
+    faults = [iteration for (iteration, event) in zip(iterations, events) if event & 1]
+    crashes = [iteration for (iteration, event) in zip(iterations, events) if event & 2]
+
+    num_trailing = len(distances)
+    distance_data = {
+        'x': [iterations] * num_trailing + [faults, crashes],
+        'y': distances + [[0] * len(faults), [0] * len(crashes)],
+    }
+
+    metric_data = {'x': [iterations] * len(metric_columns), 'y': points['metrics']}
+
+    return ((distance_data, list(range(num_trailing + 2))), (metric_data, list(range(len(metric_columns)))))
+
+def live_title(points: dict) -> str:
+    """Describes the run being watched."""
+
+    header = points['header']
+    title = f"MABEL Live - {header['model']} (run {points['run']}, {header['num_acvs']} ACVs, {header['iterations']} iterations)"
+    if (points['stride'] > 1):
+        title += f" - showing every {points['stride']}th iteration to keep up"
+
+    return title
+
+def create_live_app(feed: LiveFeed) -> dash.Dash:
+    """
+    Creates the Dash app of the live dashboard. The browser polls the feed, and only the points published since its last poll are
+    sent and appended to its figures with extendData. Whole figures are only sent when a new run starts.
+
+    Args:
+        feed (LiveFeed): The feed the simulation publishes to
+
+    Returns:
+        dash.Dash: The app, ready to run
+    """
+
+    external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
+    app = dash.Dash(__name__, external_stylesheets=external_stylesheets, update_title=None)
+
+    app.layout = html.Div([
+        dcc.Store(id='cursor', data={'run': 0, 'sequence': 0, 'header': None}),
+        html.H5(id='live-title', children='Waiting for a run to start...'),
+        dcc.Graph(id='live-distances'),
+        dcc.Graph(id='live-metrics'),
+        dcc.Interval(id='live-poll', interval=poll_interval),
+    ], style={'textAlign': 'center'})
+
+    @app.callback(
+        Output('live-distances', 'figure'),
+        Output('live-distances', 'extendData'),
+        Output('live-metrics', 'figure'),
+        Output('live-metrics', 'extendData'),
+        Output('cursor', 'data'),
+        Output('live-title', 'children'),
+        Input('live-poll', 'n_intervals'),
+        State('cursor', 'data'),
+    )
+    def poll(ticks, cursor):
+        points = feed.read(cursor['run'], cursor['sequence'])
+        if (points['run'] == 0) or ((not points['reset']) and (not points['iterations'])):
+            raise PreventUpdate
+
+        header = points['header'] if points['reset'] else cursor['header']
+        cursor = {'run': points['run'], 'sequence': points['sequence'], 'header': header}
+        title = live_title(dict(points, header=header))
+
+        if points['reset']:
+            (distances, metrics) = create_live_figures(points)
+            return (distances, no_update, metrics, no_update, cursor, title)
+
+        ((distance_data, distance_traces), (metric_data, metric_traces)) = live_extension(points)
+        return (no_update, [distance_data, distance_traces, window_points], no_update, [metric_data, metric_traces, window_points], cursor, title)
+
+    return app
+
+def serve_live_dashboard(feed: LiveFeed, host: str = '127.0.0.1', port: int = 8050, open_in_browser: bool = True) -> Thread:
+    """
+    Serves the live dashboard from a background thread, so the simulation keeps running in this one.
+
+    Args:
+        feed (LiveFeed): The feed the simulation publishes to
+        host (str): The address to serve the dashboard on
+        port (int): The port to serve the dashboard on
+        open_in_browser (bool): Whether to open the dashboard in the browser once it is served
+
+    Returns:
+        Thread: The thread serving the dashboard. It is a daemon thread, so it stops when the program does.
+    """
+
+    app = create_live_app(feed)
+
+    # Served without Dash's banner or a log line per poll, since the simulation writes its results to the console
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server(host, port, app.server, threaded=True)
+
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    if open_in_browser:
+        Timer(1, open_browser, args=(f'http://{host}:{port}/',)).start()
+
+    return thread
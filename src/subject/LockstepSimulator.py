@@ -0,0 +1,197 @@
+import numpy as np
+
+from subject.Fleet import Fleet
+from subject.ACVUpdater import read_start_data
+from subject.FaultSchedule import generate_faults
+from subject.Logger import calculate_metrics
+from mapek.Knowledge import Knowledge
+from mapek.Planner import Planner
+from mapek.PenaltyEvaluator import PenaltyEvaluator
+
+class LockstepSimulator:
+    """
+    Simulates many independent platoons in lockstep. Every platoon has its own fault schedule, but all of them are held in one fleet of
+    shape (platoons, number of ACVs) and advanced together, so an iteration of every platoon costs a handful of array operations and a
+    single batched select/update of the MAB model.
+
+    Each iteration follows the same steps as ACVUpdater and the MAPE-K loop (sense, analyze, plan, execute), with the same penalty,
+    regret and crash semantics. The platoons share one model, which sees every platoon's context each iteration, so it learns from all
+    of them at once.
+
+    Attributes:
+        knowledge (Knowledge): The knowledge shared by every platoon, holding the config and the MAB model
+        config (Config): The simulation config, with num_acvs set from the CSV file
+        num_platoons (int): The number of platoons simulated
+        acvs (Fleet): The fleet holding every platoon, with fields of shape (num_platoons, num_acvs)
+        penalty_evaluator (PenaltyEvaluator): Computes the counterfactual penalties of every platoon at once
+        faults (list): The compiled fault schedule of each platoon (see FaultSchedule)
+        fault_bounds (list): The faults of every platoon merged by iteration: the maps of iteration i are rows fault_bounds[i] to fault_bounds[i + 1]
+        fault_indexes (np.ndarray): The index of the faulted reading in the flattened distances of every platoon, for each merged map
+        fault_scales (np.ndarray): The scale of each merged map
+        fault_shifts (np.ndarray): The shift of each merged map
+        total_crashes (np.ndarray): The number of crashes in each platoon
+    """
+
+    def __init__(self, knowledge: Knowledge, rngs: list):
+        """
+        Initializes every platoon from the starting data and draws a fault schedule for each.
+
+        Args:
+            knowledge (Knowledge): The knowledge shared by every platoon, holding the config and the MAB model
+            rngs (list): One np.random.Generator per platoon, used for its fault schedule and fault noise. The model draws from its own generator.
+        """
+
+        data = read_start_data()
+
+        self.knowledge = knowledge
+        self.config = knowledge.config.override('acvs', 'num_acvs', len(data))
+        self.knowledge.config = self.config
+        self.num_platoons = len(rngs)
+
+        shape = (self.num_platoons, len(data))
+        self.acvs = Fleet(
+            np.broadcast_to(np.asarray(data['start_location'], dtype=float), shape),
+            np.broadcast_to(np.asarray(data['start_speed'], dtype=float), shape),
+            self.config.acvs.max_speed,
+            self.config.acvs.easing)
+
+        self.penalty_evaluator = PenaltyEvaluator(self.config)
+        self.total_crashes = np.zeros(self.num_platoons, dtype=int)
+
+        self.faults = [generate_faults(self.config, rng) for rng in rngs]
+        for (faults, rng) in zip(self.faults, rngs):
+            faults.compile(rng)
+
+        # The compiled faults of every platoon merged by iteration, so each iteration's faults are applied to every platoon at once
+        iterations = self.config.simulation.iterations
+        width = len(data) - 1
+        fault_iterations = np.concatenate([np.repeat(np.arange(iterations + 1), np.diff(faults.bounds)) for faults in self.faults])
+        order = np.argsort(fault_iterations, kind='stable')
+
+        self.fault_bounds = np.searchsorted(fault_iterations[order], np.arange(iterations + 2)).tolist()
+        self.fault_indexes = np.concatenate([platoon * width + faults.indexes for (platoon, faults) in enumerate(self.faults)])[order]
+        self.fault_scales = np.concatenate([faults.scales for faults in self.faults])[order]
+        self.fault_shifts = np.concatenate([faults.shifts for faults in self.faults])[order]
+
+    def run_update_loop(self) -> list:
+        """
+        Runs every platoon through all iterations.
+
+        Returns:
+            list: The final metrics of each platoon (see Logger.calculate_metrics)
+        """
+
+        for i in range(self.config.simulation.iterations + 1):
+            # Only update after first iteration so iteration 0 checks the starting values
+            if (i > 0):
+                self.update_distances(i)
+
+            self.total_crashes += self.acvs.crash_mask().sum(axis=-1)
+
+        return [
+            calculate_metrics(
+                self.total_crashes[platoon],
+                self.acvs.total_penalties[platoon],
+                self.acvs.baseline_penalties[platoon],
+                self.acvs.total_regrets[platoon],
+                self.acvs.baseline_regrets[platoon])
+            for platoon in range(self.num_platoons)
+        ]
+
+    def update_distances(self, iteration: int):
+        """
+        Senses the distances of every platoon, applies the faults scheduled for this iteration, and runs the rest of the loop.
+
+        Args:
+            iteration (int): The current iteration
+        """
+
+        self.knowledge.target_speed = self.acvs.speeds[:, 0].copy()
+
+        actual_distances = self.acvs.actual_distances()
+        self.knowledge.actual_distances = actual_distances
+
+        # Represents bad sensor reading modification
+        modded_distances = actual_distances.copy()
+
+        start = self.fault_bounds[iteration]
+        stop = self.fault_bounds[iteration + 1]
+        if (start < stop):
+            readings = modded_distances.reshape(-1)
+            index = self.fault_indexes[start:stop]
+            readings[index] = readings[index] * self.fault_scales[start:stop] + self.fault_shifts[start:stop]
+
+        self.acvs.set_distances(modded_distances)
+
+        self.analyze(modded_distances, actual_distances)
+
+    def analyze(self, sensor_distances: np.ndarray, actual_distances: np.ndarray):
+        """
+        The batched counterpart of the analyzer: calculates the penalties of every platoon, finds bad sensor readings with the MAB model,
+        then plans and applies the speed modifications.
+
+        Args:
+            sensor_distances (np.ndarray): The distance sensor reading of each trailing ACV, shape (num_platoons, n - 1)
+            actual_distances (np.ndarray): The unmodified distance of each trailing ACV, shape (num_platoons, n - 1)
+        """
+
+        acvs = self.acvs
+        ideal_distance = self.knowledge.ideal_distance
+        lead_speeds = self.knowledge.target_speed
+
+        # Columns of distances (sensor reading, ground truth)
+        distances = np.stack([sensor_distances, actual_distances], axis=-1)
+
+        penalties = self.penalty_evaluator.penalty_matrix(
+            acvs.locations, acvs.speeds, acvs.target_speeds, lead_speeds, sensor_distances, actual_distances)
+
+        ignoring = self.handle_bad_sensor_detection(distances, penalties)
+
+        # Speed (S) = target speed (T) + (distance (D) - ideal distance (I)) → S = T + (D - I)
+        new_speeds = lead_speeds[:, None, None] + (distances - ideal_distance)
+
+        acvs.apply_decisions(Planner.decide(new_speeds, penalties, ignoring, acvs.target_speeds[:, 1:]))
+
+    def handle_bad_sensor_detection(self, distances: np.ndarray, penalties: np.ndarray) -> np.ndarray:
+        """
+        Finds the bad sensor reading of every platoon with one batched model selection and update. Penalties of ACVs found to have a
+        bad sensor are re-evaluated in place.
+
+        Args:
+            distances (np.ndarray): Array of shape (num_platoons, n - 1, 2) of (sensor reading, ground truth) distances
+            penalties (np.ndarray): Array of shape (num_platoons, n - 1, 2) of (sensor penalty, ground truth penalty)
+
+        Returns:
+            np.ndarray: Boolean array of shape (num_platoons, n - 1), true for each trailing ACV ignoring its sensor
+        """
+
+        acvs = self.acvs
+        model = self.knowledge.mab_model
+        platoons = np.arange(self.num_platoons)
+
+        variations = np.abs(self.knowledge.ideal_distance - distances[..., 0])
+        arms = np.asarray(model.select_arms(variations), dtype=int)
+
+        # Calculate the residual between the predicted penalty and the actual penalty
+        penalty = penalties[platoons, arms, 0]
+        predicted_penalty = np.asarray(model.theta, dtype=float)[arms].reshape(self.num_platoons)
+        bad_sensor = np.abs(penalty - predicted_penalty) > self.config.mab.residual_threshold
+
+        ignoring = np.zeros(distances.shape[:-1], dtype=bool)
+        ignoring[platoons, arms] = bad_sensor
+
+        # Only the ignored ACV's row of penalties is re-evaluated, with every ACV in it steered by that ACV's actual distance
+        bad = np.flatnonzero(bad_sensor)
+        if (len(bad) > 0):
+            bad_arms = arms[bad]
+            penalties[bad, bad_arms] = self.penalty_evaluator.evaluate(
+                acvs.locations[bad], acvs.speeds[bad], acvs.target_speeds[bad], self.knowledge.target_speed[bad],
+                distances[bad, :, 0], distances[bad, :, 1],
+                np.stack([bad_arms, bad_arms], axis=-1), distances[bad, bad_arms], np.ones((len(bad), 2), dtype=bool))
+
+            # New penalty with actual, unmodified distance to reward model for selecting correctly
+            penalty[bad] = penalties[bad, bad_arms, 1]
+
+        model.update_batch(arms, variations[platoons, arms], penalty)
+
+        return ignoring
@@ -32,15 +32,13 @@ class Observable:
 
         self.subscribers.remove(component)
 
-    def notify(self, acvs: list, actual_distances: list):
+    def notify(self, snapshot):
         """
         Notify all subscribers of changes to distances and speeds in the observable
 
         Args:
-            distances (list): The distances between the ACV and the one in front
-            speeds (list): The current speeds of the ACV
-            locations (list): The current locations of the ACV
+            snapshot (FleetSnapshot): Read-only view of all ACVs and their unmodified distances for this iteration
         """
 
         for subscriber in self.subscribers:
-            subscriber.update(acvs, actual_distances)
\ No newline at end of file
+            subscriber.update(snapshot)
\ No newline at end of file
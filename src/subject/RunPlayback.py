@@ -0,0 +1,223 @@
+import numpy as np
+
+from subject.FaultSchedule import FaultSchedule, describe_fault
+
+class RunPlayback:
+    """
+    Serves a recorded run to the visualizer. The faults, crashes and ignored sensors of the run are indexed by frame once, so
+    frames are served in chunks without searching the run, and long runs are summarized by min/max-decimated overviews that keep
+    every spike however many iterations fall into a point.
+
+    Columns may be lists, arrays or memory-mapped arrays of a recorded run. They are only ever read a slice at a time.
+
+    Attributes:
+        locations (array_like): The location of each ACV for each frame
+        speeds (array_like): The speed of each ACV for each frame
+        distances (array_like): The distance sensor reading of each ACV for each frame
+        ignores (array_like): Boolean mask of the ACVs ignoring their distance sensor for each frame
+        num_frames (int): The number of frames
+        num_acvs (int): The number of ACVs
+        iterations (np.ndarray): The iteration of each frame
+        chunk_frames (int): The number of frames served at a time
+        overview_points (int): The largest number of points in an overview series
+        read_rows (int): The number of rows read at a time when scanning the whole run
+        mod_frames (np.ndarray): The frames with an active fault, in order
+        mods (dict): The (ACV index, fault description, whether the ACV ignored its sensor) of each active fault, by frame
+        crashes (dict): The indexes of the crashed ACVs of each frame with a crash
+        ignore_frames (np.ndarray): The frames where any ACV ignored its sensor, in order
+    """
+
+    def __init__(self, locations, speeds, distances, ignores, faults: FaultSchedule, crashes: list, iterations=None, chunk_frames: int = 1000,
+            overview_points: int = 2000, read_rows: int = 65536):
+        """
+        Indexes a recorded run.
+
+        Args:
+            locations (array_like): The location of each ACV for each frame
+            speeds (array_like): The speed of each ACV for each frame
+            distances (array_like): The distance sensor reading of each ACV for each frame
+            ignores (array_like): Boolean mask of the ACVs ignoring their distance sensor for each frame
+            faults (FaultSchedule): The fault schedule of the run
+            crashes (list): The (iteration, [(ACV index, ACV index), ...]) pairs of each iteration with a crash
+            iterations (array_like): The iteration of each frame. Defaults to one frame per iteration.
+            chunk_frames (int): The number of frames served at a time
+            overview_points (int): The largest number of points in an overview series
+            read_rows (int): The number of rows read at a time when scanning the whole run
+        """
+
+        # Records kept in memory as lists are converted once; recorded columns stay on disk
+        (self.locations, self.speeds, self.distances, self.ignores) = [
+            np.asarray(column) if isinstance(column, list) else column for column in (locations, speeds, distances, ignores)
+        ]
+
+        self.num_frames = len(self.locations)
+        self.num_acvs = len(self.locations[0])
+        self.iterations = np.arange(self.num_frames) if iterations is None else np.asarray(iterations)
+        self.chunk_frames = chunk_frames
+        self.overview_points = overview_points
+        self.read_rows = read_rows
+
+        # Every iteration of every fault that was recorded, by frame, keeping schedule order within a frame
+        (fault_rows, fault_iterations, _) = faults.expand()
+        order = np.argsort(fault_iterations, kind='stable')
+        (fault_rows, fault_iterations) = (fault_rows[order], fault_iterations[order])
+
+        frames = np.searchsorted(self.iterations, fault_iterations).clip(max=max(self.num_frames - 1, 0))
+        recorded = self.iterations[frames] == fault_iterations
+        (fault_rows, fault_frames) = (fault_rows[recorded], frames[recorded])
+        fault_acvs = faults.acvs[fault_rows]
+
+        # The ignore flags of the faulted ACVs are read in the same scan that finds the frames with an ignored sensor
+        fault_ignored = np.zeros(len(fault_frames), dtype=bool)
+        ignore_frames = list()
+        for start in range(0, self.num_frames, read_rows):
+            block = np.asarray(self.ignores[start:start + read_rows])
+            ignore_frames.append(start + np.flatnonzero(block.any(axis=-1)))
+
+            (first, last) = np.searchsorted(fault_frames, [start, start + read_rows])
+            fault_ignored[first:last] = block[fault_frames[first:last] - start, fault_acvs[first:last]]
+
+        self.ignore_frames = np.concatenate(ignore_frames)
+
+        descriptions = [describe_fault(model, value) for (model, value) in zip(faults.models.tolist(), faults.values.tolist())]
+
+        self.mod_frames = np.unique(fault_frames)
+        self.mods = dict()
+        for (frame, acv, fault, ignored) in zip(fault_frames.tolist(), fault_acvs.tolist(), fault_rows.tolist(), fault_ignored.tolist()):
+            self.mods.setdefault(frame, list()).append([acv, descriptions[fault], ignored])
+
+        self.crashes = dict()
+        for (iteration, crash_list) in crashes:
+            frame = int(np.searchsorted(self.iterations, iteration))
+            if (frame < self.num_frames) and (self.iterations[frame] == iteration):
+                self.crashes.setdefault(frame, set()).update(int(acv) for pair in crash_list for acv in pair)
+
+        self.crashes = {frame: sorted(acvs) for (frame, acvs) in self.crashes.items()}
+
+    def chunk(self, frame: int) -> dict:
+        """
+        Gets the chunk of frames containing a frame, for the browser to render.
+
+        Args:
+            frame (int): The frame
+
+        Returns:
+            dict: The 'start' frame of the chunk, the rounded 'x', 'speed' and 'distance' and the 'iterations' of each of its frames,
+                and the 'mod' ([ACV index, fault, ignored] of each fault) and 'crash' (ACV indexes) of its frames that have them, by chunk-relative frame
+        """
+
+        start = (min(max(int(frame), 0), self.num_frames - 1) // self.chunk_frames) * self.chunk_frames
+        stop = min(start + self.chunk_frames, self.num_frames)
+
+        def frames_in_chunk(index: dict) -> dict:
+            return {frame - start: value for (frame, value) in index.items() if start <= frame < stop}
+
+        return {
+            'start': start,
+            'x': np.round(np.asarray(self.locations[start:stop], dtype=float), 2).tolist(),
+            'speed': np.round(np.asarray(self.speeds[start:stop], dtype=float), 2).tolist(),
+            'distance': np.round(np.asarray(self.distances[start:stop], dtype=float), 2).tolist(),
+            'iterations': self.iterations[start:stop].tolist(),
+            'mod': frames_in_chunk(self.mods),
+            'crash': frames_in_chunk(self.crashes),
+        }
+
+    def index(self) -> dict:
+        """
+        Gets what the browser needs to navigate the whole run.
+
+        Returns:
+            dict: The number of 'frames', the number of ACVs and the frames with an active fault ('modFrames')
+        """
+
+        return {'frames': self.num_frames, 'acvs': self.num_acvs, 'modFrames': self.mod_frames.tolist()}
+
+    def overview(self, start_frame: int = 0, stop_frame: int = None) -> dict:
+        """
+        Summarizes the distance sensor reading of every trailing ACV over a range of frames. Ranges with more frames than overview_points
+        are cut into buckets, each represented by its minimum and maximum reading, so spikes from faults are never smoothed away.
+
+        Args:
+            start_frame (int): The first frame of the range
+            stop_frame (int): The frame after the last frame of the range. Defaults to the end of the run.
+
+        Returns:
+            dict: The 'x' (iterations), 'y' (readings) and 'frames' of each trailing ACV's series, and the 'iterations' and 'frames' of the
+                faults, crashes and ignored sensors ('mods', 'crashes', 'ignores') in the range, each thinned to overview_points
+        """
+
+        start = max(int(start_frame), 0)
+        stop = self.num_frames if stop_frame is None else min(int(stop_frame), self.num_frames)
+        stop = max(stop, start + 1)
+
+        # Buckets of whole frames, at most half as many as points since each gives a minimum and a maximum
+        bucket = max(1, -(-(stop - start) // max(1, self.overview_points // 2)))
+
+        series_frames = [list() for _ in range(self.num_acvs - 1)]
+
+        # Read whole buckets at a time so no bucket spans two reads
+        read_rows = max(bucket, (self.read_rows // bucket) * bucket)
+        for block in range(start, stop, read_rows):
+            values = np.asarray(self.distances[block:min(block + read_rows, stop)], dtype=float)[:, 1:]
+            count = len(values)
+
+            if (bucket == 1):
+                frames = np.broadcast_to((block + np.arange(count))[:, None], values.shape)
+                for acv in range(self.num_acvs - 1):
+                    series_frames[acv].append(frames[:, acv])
+                continue
+
+            # Pad the last bucket so every bucket has the same size, with values that are never a minimum or maximum
+            buckets = -(-count // bucket)
+            padded = np.full((buckets * bucket, values.shape[1]), np.nan)
+            padded[:count] = values
+            padded = padded.reshape(buckets, bucket, -1)
+
+            first = block + bucket * np.arange(buckets)[:, None]
+            low = first + np.nanargmin(padded, axis=1)
+            high = first + np.nanargmax(padded, axis=1)
+
+            for acv in range(self.num_acvs - 1):
+                series_frames[acv].append(np.sort(np.stack([low[:, acv], high[:, acv]], axis=-1), axis=-1).ravel())
+
+        series = list()
+        for (acv, frames) in enumerate(series_frames):
+            frames = np.unique(np.concatenate(frames))
+            readings = self.read_rows_at(frames, acv + 1)
+            series.append({'x': self.iterations[frames].tolist(), 'y': np.round(readings, 2).tolist(), 'frames': frames.tolist()})
+
+        def events_in_range(frames: np.ndarray) -> dict:
+            frames = frames[(frames >= start) & (frames < stop)]
+            frames = frames[::max(1, -(-len(frames) // self.overview_points))]
+            return {'iterations': self.iterations[frames].tolist(), 'frames': frames.tolist()}
+
+        return {
+            'series': series,
+            'mods': events_in_range(self.mod_frames),
+            'crashes': events_in_range(np.array(sorted(self.crashes), dtype=int)),
+            'ignores': events_in_range(self.ignore_frames),
+        }
+
+    def read_rows_at(self, frames: np.ndarray, acv: int) -> np.ndarray:
+        """
+        Reads the distance sensor reading of one ACV at the given frames.
+
+        Args:
+            frames (np.ndarray): The frames, in order
+            acv (int): The index of the ACV
+
+        Returns:
+            np.ndarray: The readings
+        """
+
+        readings = np.empty(len(frames))
+        for start in range(0, len(frames), self.read_rows):
+            rows = frames[start:start + self.read_rows]
+            if (len(rows) == 0):
+                continue
+
+            # One contiguous read covering the rows, so chunked and memory-mapped columns are read sequentially
+            block = np.asarray(self.distances[rows[0]:rows[-1] + 1], dtype=float)
+            readings[start:start + len(rows)] = block[rows - rows[0], acv]
+
+        return readings
@@ -4,62 +4,174 @@ import plotly.graph_objects as go
 from threading import Timer
 
 import numpy as np
-import os, webbrowser, time
+import os, webbrowser
 
-import random
-
-external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
-app = dash.Dash(__name__, external_stylesheets=external_stylesheets, update_title='Loading...')
-
-locations = []
-speeds = []
-distances = []
-ignores = []
-modifications = []
-crashes = []
+from subject.RunPlayback import RunPlayback
+from subject.FaultSchedule import FaultSchedule
 
 time_interval = 1000
-fig = None
 range_padding = 15
 tick_interval = 5
+row_height = 60
 
-normal_colors = ['lightSkyBlue']
+normal_color = 'lightSkyBlue'
 mod_color = 'yellow'
 crash_color = 'red'
 ignore_color = 'green'
 marker_stroke = 3
-    
-def start_visualizer(loc_list: list, speed_list: dict, dist_list: dict, ignore_list: dict, mod_dict: dict, crash_list: list, model_name: str):
-    global locations, speeds, distances, ignores, modifications, crashes
-
-    locations = loc_list
-    speeds = speed_list
-    distances = dist_list
-    ignores = ignore_list
-    modifications = mod_dict
-    crashes = crash_list
-
-    create_graph(model_name)
-    Timer(1, open_browser).start()
-    app.run_server()
-    
-
-def create_graph(model_name: str):
-    global app, locations, time_interval, fig, normal_colors
-    
-    acv_count = len(locations[0])
-    total_iterations = len(locations)
-    normal_colors *= acv_count
-    y = [(acv_count - 1) - i for i in range(acv_count)]
+
+# Renders one frame of the loaded chunk into the figure, entirely in the browser
+render_frame = """
+function(frame, chunk, run, figure) {
+    const local = chunk ? frame - chunk.start : -1;
+    if (!figure || local < 0 || local >= chunk.x.length) {
+        // The chunk holding the frame is on its way; this runs again once it arrives
+        return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+    }
+
+    const style = run.style;
+    const x = chunk.x[local];
+    const speeds = chunk.speed[local];
+    const distances = chunk.distance[local].slice();
+    const n = x.length;
+    distances[0] = 'N/A';
+
+    const colors = Array(n).fill(style.normal);
+    const widths = Array(n).fill(0);
+    const mods = Array(n).fill('Unmodified');
+    const ignored = Array(n).fill('');
+
+    const faults = chunk.mod[local];
+    if (faults) {
+        // Simultaneous faults on one ACV are listed together
+        faults.forEach(function([acv, fault, ignoring]) {
+            colors[acv] = ignoring ? style.ignore : style.mod;
+            mods[acv] = (mods[acv] === 'Unmodified' ? '' : mods[acv] + '<br>') + '<b>Sensor fault</b> (' + fault + ')';
+            ignored[acv] = ignoring ? '<b>Sensor value ignored</b>' : '';
+        });
+    }
+
+    const crash = chunk.crash[local];
+    if (crash) {
+        crash.forEach(function(acv) { widths[acv] = style.stroke; });
+    }
+
+    const trace = Object.assign({}, figure.data[0], {
+        x: x,
+        customdata: x.map(function(_, i) { return [speeds[i], distances[i], mods[i], ignored[i], i]; }),
+        marker: Object.assign({}, figure.data[0].marker, {
+            color: colors,
+            line: Object.assign({}, figure.data[0].marker.line, {width: widths})
+        })
+    });
+
+    const xaxis = Object.assign({}, figure.layout.xaxis, {
+        range: [Math.min.apply(null, x) - style.padding, Math.max.apply(null, x) + style.padding]
+    });
+
+    return [
+        {data: [trace], layout: Object.assign({}, figure.layout, {xaxis: xaxis})},
+        'Iteration: ' + chunk.iterations[local]
+    ];
+}
+"""
+
+# Asks the server for the chunk holding the frame, only when the frame is outside the loaded chunk
+request_chunk = """
+function(frame, chunk) {
+    if (chunk && frame >= chunk.start && frame < chunk.start + chunk.x.length) {
+        return window.dash_clientside.no_update;
+    }
+    return frame;
+}
+"""
+
+# Moves the slider on each playback tick, button press or click on the overview, entirely in the browser
+navigate = """
+function(ticks, forward, backward, skip, click, frame, run) {
+    const triggered = window.dash_clientside.callback_context.triggered.map(function(t) { return t.prop_id; });
+    const last = run.frames - 1;
+
+    if (triggered.includes('overview.clickData')) {
+        return click && click.points.length ? click.points[0].customdata : window.dash_clientside.no_update;
+    }
+    if (triggered.includes('skip.n_clicks')) {
+        // First modified frame after the current one, by binary search over the sorted modified frames
+        const frames = run.modFrames;
+        let low = 0, high = frames.length;
+        while (low < high) {
+            const middle = (low + high) >> 1;
+            if (frames[middle] <= frame) { low = middle + 1; } else { high = middle; }
+        }
+        return low < frames.length ? frames[low] : window.dash_clientside.no_update;
+    }
+    if (triggered.includes('backward.n_clicks')) {
+        return Math.max(frame - 1, 0);
+    }
+
+    return Math.min(frame + 1, last);
+}
+"""
+
+# Starts and pauses playback
+toggle_play = """
+function(clicks, paused) {
+    const pausing = !paused;
+    return [pausing, pausing ? 'Play' : 'Pause'];
+}
+"""
+
+def start_visualizer(loc_list: list, speed_list: list, dist_list: list, ignore_list: list, faults: FaultSchedule, crash_list: list, model_name: str,
+        iterations=None, host: str = '127.0.0.1', port: int = 8050, open_in_browser: bool = True):
+    """
+    Serves the playback of a run and opens it in the browser.
+
+    Args:
+        loc_list (array_like): The location of each ACV for each recorded iteration
+        speed_list (array_like): The speed of each ACV for each recorded iteration
+        dist_list (array_like): The distance sensor reading of each ACV for each recorded iteration
+        ignore_list (array_like): Boolean mask of the ACVs ignoring their distance sensor for each recorded iteration
+        faults (FaultSchedule): The fault schedule of the run
+        crash_list (list): The (iteration, [(ACV index, ACV index), ...]) pairs of each iteration with a crash
+        model_name (str): The name of the MAB model of the run
+        iterations (array_like): The iteration of each record. Defaults to every iteration being recorded.
+        host (str): The address to serve the playback on
+        port (int): The port to serve the playback on
+        open_in_browser (bool): Whether to open the playback in the browser once it is served
+    """
+
+    app = create_app(RunPlayback(loc_list, speed_list, dist_list, ignore_list, faults, crash_list, iterations), model_name)
+
+    if open_in_browser:
+        Timer(1, open_browser, args=(f'http://{host}:{port}/',)).start()
+    app.run(host=host, port=port)
+
+def create_graph(chunk: dict, num_acvs: int, model_name: str) -> go.Figure:
+    """
+    Creates the figure of the first frame, with an axis row for every ACV. Later frames are rendered in the browser from the chunk
+    they are in.
+
+    Args:
+        chunk (dict): The first chunk of frames of the run (see RunPlayback.chunk)
+        num_acvs (int): The number of ACVs
+        model_name (str): The name of the MAB model of the run
+
+    Returns:
+        go.Figure: The figure
+    """
+
+    y = [(num_acvs - 1) - i for i in range(num_acvs)]
+    labels = ['ACV ' + str(i) for i in range(num_acvs)]
+    x = chunk['x'][0]
 
     trace = go.Scatter(
         name="acvs",
-        x=locations[0], 
-        y=y, mode='markers', 
-        customdata=[[speeds[0][i], distances[0][i], "Unmodified", ""] for i in range(acv_count)],
+        x=x,
+        y=y, mode='markers',
+        customdata=[[chunk['speed'][0][i], chunk['distance'][0][i], "Unmodified", "", i] for i in range(num_acvs)],
         marker=dict(
-            size=25, 
-            color='lightSkyBlue',
+            size=25,
+            color=normal_color,
             symbol="arrow-right",
             line=dict(
                 width=0,
@@ -67,7 +179,7 @@ def create_graph(model_name: str):
             )
         ),
         hovertemplate=
-        '<b>%{y}</b>' +
+        '<b>ACV %{customdata[4]}</b>' +
         '<br>Position: %{x}' +
         '<br>Speed: %{customdata[0]}' +
         '<br>Dist Sensor: %{customdata[1]}' +
@@ -81,18 +193,20 @@ def create_graph(model_name: str):
             text='MABEL Simulation - ' + model_name,
             font=dict(size=20)
         ),
+        height=max(400, row_height * num_acvs + 200),
         xaxis=dict(
-            title='Position', 
+            title='Position',
             tickmode = 'linear',
-            dtick = tick_interval
+            dtick = tick_interval,
+            range=[min(x) - range_padding, max(x) + range_padding]
         ),
         yaxis=dict(
             title='ACVs',
-            type='category',
-            categoryorder='total descending',
+            range=[-0.5, num_acvs - 0.5],
             tickmode='array',
             tickvals=y,
-            ticktext=['ACV 0', 'ACV 1', 'ACV 2', 'ACV 3'],
+            ticktext=labels,
+            fixedrange=True,
         ),
         transition={
             'duration': time_interval / 3,
@@ -100,25 +214,111 @@ def create_graph(model_name: str):
         },
     )
 
-    fig = go.Figure(data=[trace], layout=layout)
+    return go.Figure(data=[trace], layout=layout)
+
+def create_overview(overview: dict, num_acvs: int, x_range: list = None) -> go.Figure:
+    """
+    Creates the overview of the whole run, or of the range zoomed into: the distance sensor reading of every trailing ACV, with the
+    faults, crashes and ignored sensors marked along the bottom. Clicking a point jumps to its frame.
+
+    Args:
+        overview (dict): The overview of the range (see RunPlayback.overview)
+        num_acvs (int): The number of ACVs
+        x_range (list): The iterations zoomed into, if any
+
+    Returns:
+        go.Figure: The figure
+    """
+
+    traces = [
+        go.Scattergl(
+            name='ACV ' + str(acv + 1),
+            x=series['x'], y=series['y'], customdata=series['frames'],
+            mode='lines', line=dict(width=1),
+            hovertemplate='Iteration: %{x}<br>Dist Sensor: %{y}<extra>ACV ' + str(acv + 1) + '</extra>'
+        )
+        for (acv, series) in enumerate(overview['series'])
+    ]
+
+    events = [('mods', 'Faults', mod_color, 'triangle-up'), ('crashes', 'Crashes', crash_color, 'x'), ('ignores', 'Ignored sensors', ignore_color, 'line-ns-open')]
+    traces += [
+        go.Scattergl(
+            name=name,
+            x=overview[key]['iterations'], y=[0] * len(overview[key]['frames']), customdata=overview[key]['frames'],
+            mode='markers', marker=dict(color=color, symbol=symbol, size=8, line=dict(width=1, color=color)),
+            hovertemplate='Iteration: %{x}<extra>' + name + '</extra>'
+        )
+        for (key, name, color, symbol) in events
+    ]
+
+    layout = go.Layout(
+        height=300,
+        margin=dict(t=30, b=40),
+        xaxis=dict(title='Iteration', range=x_range, autorange=(x_range is None)),
+        yaxis=dict(title='Dist Sensor', fixedrange=True),
+        legend=dict(orientation='h'),
+        uirevision=num_acvs,
+    )
+
+    return go.Figure(data=traces, layout=layout)
+
+def overview_range(playback: RunPlayback, relayout: dict) -> tuple:
+    """
+    Finds the frames and iterations zoomed into on the overview.
+
+    Args:
+        playback (RunPlayback): The run
+        relayout (dict): The relayout data of the overview
+
+    Returns:
+        tuple: The first frame and the frame after the last, and the iterations zoomed into, or None if zoomed out
+    """
+
+    if (not relayout) or ('xaxis.range[0]' not in relayout):
+        return (0, playback.num_frames, None)
+
+    x_range = [relayout['xaxis.range[0]'], relayout['xaxis.range[1]']]
+    (start, stop) = np.searchsorted(playback.iterations, [np.floor(x_range[0]), np.ceil(x_range[1])], side='left')
+
+    return (int(start), int(stop) + 1, x_range)
+
+def create_app(playback: RunPlayback, model_name: str) -> dash.Dash:
+    """
+    Creates the Dash app of a run. The browser holds one chunk of frames at a time, and playback, the slider and skipping to the next
+    modification run there. The server only serves a new chunk when playback leaves the loaded one, and a new overview when it is
+    zoomed, so its work does not grow with the number of frames played.
+
+    Args:
+        playback (RunPlayback): The run
+        model_name (str): The name of the MAB model of the run
+
+    Returns:
+        dash.Dash: The app, ready to run
+    """
+
+    external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
+    app = dash.Dash(__name__, external_stylesheets=external_stylesheets, update_title='Loading...')
+
+    run = playback.index()
+    run['style'] = {'normal': normal_color, 'mod': mod_color, 'ignore': ignore_color, 'stroke': marker_stroke, 'padding': range_padding}
+    first_chunk = playback.chunk(0)
 
     app.layout = html.Div([
-        dcc.Graph(id='graph', figure=fig, style={'height': '70vh'}),
+        dcc.Store(id='run', data=run),
+        dcc.Store(id='frames', data=first_chunk),
+        dcc.Store(id='chunk-request'),
+        dcc.Graph(id='graph', figure=create_graph(first_chunk, playback.num_acvs, model_name)),
         html.Div(id='iteration', style={'font-size': '15px'}),
         dcc.Interval(
             id='data-update',
             interval=time_interval,  # in milliseconds
             disabled=True
         ),
-        dcc.Interval(
-            id='range-update',
-            interval=time_interval,  # in milliseconds
-            disabled=True
-        ),
         dcc.Slider(
             id="year-slider",
             min=0,
-            max=total_iterations,
+            max=playback.num_frames - 1,
+            step=1,
             value=0,
             marks=None,
             tooltip={"placement": "bottom", "always_visible": False}
@@ -128,167 +328,60 @@ def create_graph(model_name: str):
         html.Button('>>', id='forward', style={'width': '5%', 'margin-top': '5px'}),
         html.Br(),
         html.Button('Skip to Next Modification', id='skip', style={'width': '15%', 'margin-top': '25px', 'text-align': 'center'}),
-    ], style={'textAlign': 'center'})    
-
-@app.callback(
-    Output('graph', 'figure', allow_duplicate=True), 
-    Output('year-slider', 'value'),
-    Output('iteration', 'children'),
-    Input('data-update', 'n_intervals'),
-    State('year-slider', 'value'),
-    prevent_initial_call=True
-)
-def data_update(n, value):
-    index = value + 1
-
-    if (index >= len(locations)):
-        return dash.no_update, dash.no_update, dash.no_update
-
-    new_iteration_data_update(index)
-
-    return fig, index, "Iteration: " + str(index)
-
-
-@app.callback(
-    Output('graph', 'figure', allow_duplicate=True), 
-    Input('range-update', 'n_intervals'),
-    Input('year-slider', 'value'),
-    prevent_initial_call='initial_duplicate'
-)
-def update_range(n, value):
-    time.sleep(time_interval / 3000)
-    x = np.copy(fig['data'][0]['x'])
-
-    range = (min(x) - range_padding, max(x) + range_padding)
-
-    fig['layout']['xaxis']['range'] = range
-
-    return fig
-
-
-@app.callback(
-    Output('graph', 'figure', allow_duplicate=True), 
-    Output('iteration', 'children', allow_duplicate=True),
-    Input('year-slider', 'value'),
-    State('iteration', 'children'),
-    prevent_initial_call='initial_duplicate'
-)
-def slider_update(value, iteration):
-    if (iteration != None):
-        iteration = int(iteration.split(" ")[1])
-        if (iteration == value):
-            return dash.no_update, dash.no_update
-
-    index = value
-    new_iteration_data_update(index)
-
-    return fig, "Iteration: " + str(index)
-
-
-@app.callback(
-    Output("data-update", "disabled"),
-    Output("range-update", "disabled"),
-    Output("play", "children"),
-    Input("play", "n_clicks"),
-    State("data-update", "disabled"),
-    prevent_initial_call=True
-)
-def toggle_play(n, playing):
-    if n:
-        paused = not playing
-        text = "Play" if paused else "Pause" 
-
-        return paused, paused, text
-    else:
-        return dash.no_update, dash.no_update, dash.no_update
-
-@app.callback(
-    Output('year-slider', 'value', allow_duplicate=True),
-    Input("forward", "n_clicks"),
-    State('year-slider', 'value'),
-    prevent_initial_call=True
-)
-def forward(n, value):
-    if (n):
-        return value + 1
-    else:
-        return dash.no_update
-
-@app.callback(
-    Output('year-slider', 'value', allow_duplicate=True),
-    Input("backward", "n_clicks"),
-    State('year-slider', 'value'),
-    prevent_initial_call=True
-)
-def backward(n, value):
-    if (n):
-        return value - 1
-    else:
-        return dash.no_update
-
-@app.callback(
-    Output('year-slider', 'value', allow_duplicate=True),
-    Input("skip", "n_clicks"),
-    State('year-slider', 'value'),
-    prevent_initial_call=True
-)
-def skip(n, value):
-    if (n):
-        greater_mods = filter(lambda k: k > value, modifications.keys())
-        next_mod = next(greater_mods, None)
-
-        result = next_mod if next_mod is not None else dash.no_update
-        return result
-    else:
-        return dash.no_update
-
-def new_iteration_data_update(index: int):
-    x = locations[index]
-    spd = speeds[index]
-    dist = distances[index]
-    mods = ["Unmodified"] * len(spd)
-    ignr = [""] * len(spd)
-
-    fig.update_yaxes(categoryorder='array', categoryarray= ['ACV 0', 'ACV 1', 'ACV 2', 'ACV 3'])
-
-    colors = normal_colors.copy()
-    line_widths = [0] * len(x)
-    
-    # Dist Modifications
-    if (index in modifications):
-        change_index = modifications[index][0]
-
-        mod_text = "<b>Sensor modified</b> (x" + str(modifications[index][1]) + ")"
-        ignore_text = ""
-        new_color = mod_color
-
-        ignored = True if change_index in ignores[index] else False 
-        if (ignored):
-            new_color = ignore_color
-            ignore_text = "<b>Sensor value ignored</b>"
-            
-        colors[change_index] = new_color
-        mods[change_index] = mod_text
-        ignr[change_index] = ignore_text
-
-    # Crashes
-    crash = [c for c in crashes if c[0] == index]
-    if (crash != []):
-        change_indices = crash[0][1][0]
-        line_widths[change_indices[0]] = marker_stroke
-        line_widths[change_indices[1]] = marker_stroke
-
-    dist[0] = 'N/A'
-
-    fig['data'][0]['customdata'] = [[spd[i], dist[i], mods[i], ignr[i]] for i in range(len(spd))]
-    fig['data'][0]['marker']['color'] = colors
-    fig['data'][0]['marker']['line']['width'] = line_widths
-    fig['data'][0]['x'] = x
-
-def open_browser():
-    if not os.environ.get("WERKZEUG_RUN_MAIN"):
-        webbrowser.open_new('http://127.0.0.1:8050/')
+        dcc.Graph(id='overview', figure=create_overview(playback.overview(), playback.num_acvs)),
+    ], style={'textAlign': 'center'})
+
+    app.clientside_callback(
+        render_frame,
+        Output('graph', 'figure'),
+        Output('iteration', 'children'),
+        Input('year-slider', 'value'),
+        Input('frames', 'data'),
+        State('run', 'data'),
+        State('graph', 'figure'),
+    )
 
-if __name__ == '__main__':
-    acv_vals = [[col_idx + row_idx for col_idx in range(5)] for row_idx in range(100)]
-    start_visualizer(acv_vals, None, None, "TEST")
\ No newline at end of file
+    app.clientside_callback(
+        request_chunk,
+        Output('chunk-request', 'data'),
+        Input('year-slider', 'value'),
+        State('frames', 'data'),
+        prevent_initial_call=True
+    )
+
+    @app.callback(Output('frames', 'data'), Input('chunk-request', 'data'), prevent_initial_call=True)
+    def load_chunk(frame):
+        return playback.chunk(frame)
+
+    @app.callback(Output('overview', 'figure'), Input('overview', 'relayoutData'), prevent_initial_call=True)
+    def zoom_overview(relayout):
+        (start, stop, x_range) = overview_range(playback, relayout)
+        return create_overview(playback.overview(start, stop), playback.num_acvs, x_range)
+
+    app.clientside_callback(
+        navigate,
+        Output('year-slider', 'value'),
+        Input('data-update', 'n_intervals'),
+        Input('forward', 'n_clicks'),
+        Input('backward', 'n_clicks'),
+        Input('skip', 'n_clicks'),
+        Input('overview', 'clickData'),
+        State('year-slider', 'value'),
+        State('run', 'data'),
+        prevent_initial_call=True
+    )
+
+    app.clientside_callback(
+        toggle_play,
+        Output('data-update', 'disabled'),
+        Output('play', 'children'),
+        Input('play', 'n_clicks'),
+        State('data-update', 'disabled'),
+        prevent_initial_call=True
+    )
+
+    return app
+
+def open_browser(url: str = 'http://127.0.0.1:8050/'):
+    if not os.environ.get("WERKZEUG_RUN_MAIN"):
+        webbrowser.open_new(url)